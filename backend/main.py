@@ -9,7 +9,7 @@ load_dotenv()
 from modules.database import init_db
 
 # Import Routers
-from routers import system, analysis, reports
+from routers import system, analysis, reports, jobs
 
 app = FastAPI(title="BioGraph Enterprise API", version="2.0")
 
@@ -27,11 +27,13 @@ app.add_middleware(
 def on_startup():
     print("🚀 BioGraph Enterprise Starting...")
     init_db()
+    analysis.warm_up()
 
 # Include Routers
 app.include_router(system.router)
 app.include_router(analysis.router)
 app.include_router(reports.router)
+app.include_router(jobs.router)
 
 # Health Check (Direct)
 @app.get("/")
@@ -1,7 +1,77 @@
 # File: backend/modules/admet.py
 
+import numpy as np
+from rdkit import Chem
 from rdkit.Chem import Descriptors, Lipinski, QED
 
+from modules.database import get_descriptors
+
+# Descriptor table (drugs.db) ke columns isi order mein; violations / is_safe lipinski_flags() se
+DESCRIPTOR_COLUMNS = ["mw", "logp", "hbd", "hba", "tpsa", "rotatable_bonds", "qed"]
+
+def compute_descriptors(mol):
+    """Raw (unrounded) descriptors, DESCRIPTOR_COLUMNS order mein."""
+    return [
+        Descriptors.MolWt(mol),
+        Descriptors.MolLogP(mol),
+        Lipinski.NumHDonors(mol),
+        Lipinski.NumHAcceptors(mol),
+        Descriptors.TPSA(mol),
+        Lipinski.NumRotatableBonds(mol),
+        QED.qed(mol),       # Sab se slow step (per-molecule)
+    ]
+
+def lipinski_flags(mw, logp, hbd, hba, qed):
+    """
+    Vectorized Rule of 5 + safety verdict. Scalars ya poore NumPy columns dono chalte hain.
+    Returns (violations, is_safe).
+    """
+    violations = ((np.asarray(mw) > 500).astype(np.int64) + (np.asarray(logp) > 5)
+                  + (np.asarray(hbd) > 5) + (np.asarray(hba) > 10))
+    # Agar QED < 0.4 hai ya Violations > 1 hain, to Drug risky hai
+    is_safe = (violations <= 1) & (np.asarray(qed) > 0.4)
+    return violations, is_safe
+
+def descriptor_chunk(smiles_list):
+    """
+    Worker function (process pool): SMILES list -> (n, 7) float array, invalid rows NaN.
+    Top-level taake pickle ho sake.
+    """
+    out = np.full((len(smiles_list), len(DESCRIPTOR_COLUMNS)), np.nan)
+    for i, smi in enumerate(smiles_list):
+        try:
+            mol = Chem.MolFromSmiles(str(smi)) if smi else None
+            if mol: out[i] = compute_descriptors(mol)
+        except Exception:
+            pass
+    return out
+
+def descriptor_table_rows(keys, values):
+    """(keys, descriptor matrix) -> drugs.db rows; Lipinski/safety ek hi vectorized pass mein."""
+    valid = ~np.isnan(values).any(axis=1)
+    keys = [k for k, ok in zip(keys, valid) if ok]
+    values = values[valid]
+    mw, logp, hbd, hba, tpsa, rot, qed = values.T
+    violations, is_safe = lipinski_flags(mw, logp, hbd, hba, qed)
+    return [
+        (key, float(v[0]), float(v[1]), int(v[2]), int(v[3]), float(v[4]), int(v[5]), float(v[6]), int(vio), int(safe))
+        for key, v, vio, safe in zip(keys, values, violations, is_safe)
+    ]
+
+def format_admet(values):
+    """Descriptor dict (table row ya fresh) -> API response shape."""
+    return {
+        "mw": round(values["mw"], 2),             # Molecular Weight
+        "logp": round(values["logp"], 2),         # Solubility
+        "hbd": int(values["hbd"]),                # Hydrogen Bond Donors
+        "hba": int(values["hba"]),                # Hydrogen Bond Acceptors
+        "tpsa": round(values["tpsa"], 2),         # Surface Area
+        "rotatable_bonds": int(values["rotatable_bonds"]), # Flexibility
+        "violations": int(values["violations"]),  # Rule of 5 Failures
+        "qed": round(values["qed"], 2),           # Quality Score
+        "is_safe": bool(values["is_safe"])        # Final Safety Verdict
+    }
+
 def calculate_admet_properties(mol):
     """
     Calculates advanced physicochemical properties and safety metrics.
@@ -10,36 +80,17 @@ def calculate_admet_properties(mol):
     if not mol:
         return None
 
-    # 1. Basic Properties
-    mw = Descriptors.MolWt(mol)
-    logp = Descriptors.MolLogP(mol)
-    hbd = Lipinski.NumHDonors(mol)
-    hba = Lipinski.NumHAcceptors(mol)
-    tpsa = Descriptors.TPSA(mol)
-    rotatable_bonds = Lipinski.NumRotatableBonds(mol)
-
-    # 2. Lipinski Rule of 5 Validation
-    violations = 0
-    if mw > 500: violations += 1
-    if logp > 5: violations += 1
-    if hbd > 5: violations += 1
-    if hba > 10: violations += 1
-
-    # 3. Drug Likeness (QED Score: 0 to 1)
-    qed_score = QED.qed(mol)
-
-    # 4. Toxicity / Safety Verdict
-    # Agar QED < 0.4 hai ya Violations > 1 hain, to Drug risky hai
-    is_safe = violations <= 1 and qed_score > 0.4
+    values = dict(zip(DESCRIPTOR_COLUMNS, compute_descriptors(mol)))
+    violations, is_safe = lipinski_flags(values["mw"], values["logp"], values["hbd"], values["hba"], values["qed"])
+    values["violations"] = violations
+    values["is_safe"] = is_safe
+    return format_admet(values)
 
-    return {
-        "mw": round(mw, 2),             # Molecular Weight
-        "logp": round(logp, 2),         # Solubility
-        "hbd": hbd,                     # Hydrogen Bond Donors
-        "hba": hba,                     # Hydrogen Bond Acceptors
-        "tpsa": round(tpsa, 2),         # Surface Area
-        "rotatable_bonds": rotatable_bonds, # Flexibility
-        "violations": violations,       # Rule of 5 Failures
-        "qed": round(qed_score, 2),     # Quality Score
-        "is_safe": is_safe              # Final Safety Verdict
-    }
\ No newline at end of file
+def lookup_admet_properties(canonical_smiles_list, mols):
+    """
+    Library molecules ka ADMET seedha drugs.db descriptor table se (ek row read);
+    table mein na ho to RDKit fallback. Lists same order/length mein.
+    """
+    table = get_descriptors([key for key in canonical_smiles_list if key])
+    return [format_admet(table[key]) if key in table else calculate_admet_properties(mol)
+            for key, mol in zip(canonical_smiles_list, mols)]
@@ -3,6 +3,7 @@ import torch.nn as nn
 import torch.nn.functional as F
 from torch_geometric.nn import GATConv, global_mean_pool
 import os
+import hashlib
 
 # ✅ FIX: Auto-detect GPU
 DEVICE = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
@@ -33,31 +34,63 @@ class DeepDrugNet_V4(torch.nn.Module):
         self.fc_bn2 = nn.BatchNorm1d(64)
         self.out = nn.Linear(64, 1)
 
-    def forward(self, data):
-        # Drug
-        x, edge_index = data.x, data.edge_index
+    # --- Two-tower API: drug aur protein branches sirf fc1 par milte hain ---
+    def encode_drug(self, x, edge_index, batch):
         x = self.drug_embedding(x)
         x = F.elu(self.conv1(x, edge_index))
         x = F.elu(self.conv2(x, edge_index))
         x = F.elu(self.conv3(x, edge_index))
-        drug_vec = self.bn3(global_mean_pool(x, data.batch))
-        
-        # Protein (Batch Safe Reshape)
-        batch_size = data.batch.max().item() + 1
-        p = data.protein.view(batch_size, -1)
-        
+        return self.bn3(global_mean_pool(x, batch))
+
+    def encode_protein(self, p):
+        # p: (batch, seq_len) token ids
         p = self.prot_embedding(p).permute(0, 2, 1)
         p = F.relu(self.prot_bn1(self.prot_conv1(p)))
         p = F.relu(self.prot_bn2(self.prot_conv2(p)))
         p = F.relu(self.prot_bn3(self.prot_conv3(p)))
-        prot_vec = F.max_pool1d(p, p.size(2)).squeeze(2)
-        
-        # Combined
+        return F.max_pool1d(p, p.size(2)).squeeze(2)
+
+    def head(self, drug_vec, prot_vec):
+        # prot_vec (1, 128) ho to poore drug batch par broadcast hota hai
+        if prot_vec.size(0) != drug_vec.size(0):
+            prot_vec = prot_vec.expand(drug_vec.size(0), -1)
         combined = torch.cat((drug_vec, prot_vec), dim=1)
         z = F.dropout(F.relu(self.fc_bn1(self.fc1(combined))), p=0.3, training=self.training)
         z = F.relu(self.fc_bn2(self.fc2(z)))
         return self.out(z)
 
+    def head_panel(self, drug_vec, prot_vecs):
+        """
+        Drug x target score matrix (N, T). fc1 linear hai: W [d; p] + b = W_d d + (W_p p + b),
+        isliye drug aur target projections alag alag ek dafa, phir sirf broadcast add.
+        """
+        if not isinstance(self.fc1, nn.Linear):
+            # int8 backend: quantized fc1 ko split nahi kar sakte, har target alag head call
+            return torch.cat([self.head(drug_vec, prot_vecs[t:t + 1]) for t in range(prot_vecs.size(0))], dim=1)
+        dim = drug_vec.size(1)
+        zd = F.linear(drug_vec, self.fc1.weight[:, :dim])
+        zp = F.linear(prot_vecs, self.fc1.weight[:, dim:], self.fc1.bias)
+        z = (zd.unsqueeze(1) + zp.unsqueeze(0)).reshape(-1, zd.size(1))
+        z = F.dropout(F.relu(self.fc_bn1(z)), p=0.3, training=self.training)
+        z = F.relu(self.fc_bn2(self.fc2(z)))
+        return self.out(z).view(drug_vec.size(0), prot_vecs.size(0))
+
+    def forward(self, data):
+        drug_vec = self.encode_drug(data.x, data.edge_index, data.batch)
+        
+        # Protein (Batch Safe Reshape)
+        batch_size = data.batch.max().item() + 1
+        prot_vec = self.encode_protein(data.protein.view(batch_size, -1))
+        return self.head(drug_vec, prot_vec)
+
+def model_file_hash(model_path):
+    """SHA-256 of the weights file; cached embeddings/scores isi se tag hote hain."""
+    h = hashlib.sha256()
+    with open(model_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
 def load_ai_model(model_filename):
     # ✅ FIX: Path Resolution
     BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -73,6 +106,7 @@ def load_ai_model(model_filename):
         model.load_state_dict(torch.load(model_path, map_location=map_loc))
         model.to(DEVICE)
         model.eval()
+        model.model_hash = model_file_hash(model_path)
         print(f"✅ AI Model Loaded on {DEVICE}!")
         return model
     except Exception as e:
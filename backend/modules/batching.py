@@ -0,0 +1,109 @@
+# File: backend/modules/batching.py
+
+import numpy as np
+import torch
+
+from modules.config import BATCH_MAX_NODES, BATCH_MAX_EDGES, BATCH_MAX_GRAPHS
+
+class GraphCSR:
+    """
+    Many molecule graphs packed CSR-style (graph store, featurizer chunks, uploads sab isi shape mein):
+    graph i ke atoms = atoms[atom_ptr[i]:atom_ptr[i+1]], bonds (local atom indices) = bonds[bond_ptr[i]:bond_ptr[i+1]].
+    """
+
+    def __init__(self, atoms, bonds, atom_ptr, bond_ptr):
+        self.atoms = atoms
+        self.bonds = bonds
+        self.atom_ptr = atom_ptr
+        self.bond_ptr = bond_ptr
+
+    def __len__(self):
+        return len(self.atom_ptr) - 1
+
+    @classmethod
+    def from_graphs(cls, graphs):
+        """List of (atoms, bonds) -> GraphCSR."""
+        atom_counts = [len(a) for a, _ in graphs]
+        bond_counts = [len(b) for _, b in graphs]
+        return cls(
+            np.concatenate([a for a, _ in graphs]) if graphs else np.zeros(0, dtype=np.uint8),
+            np.concatenate([b for _, b in graphs]).reshape(-1, 2) if graphs else np.zeros((0, 2), dtype=np.uint16),
+            np.concatenate([[0], np.cumsum(atom_counts, dtype=np.int64)]).astype(np.int64),
+            np.concatenate([[0], np.cumsum(bond_counts, dtype=np.int64)]).astype(np.int64),
+        )
+
+    def slice(self, lo, hi):
+        """Contiguous graphs [lo, hi) - memmap se sirf ek read, koi copy loop nahi."""
+        a0, a1 = self.atom_ptr[lo], self.atom_ptr[hi]
+        b0, b1 = self.bond_ptr[lo], self.bond_ptr[hi]
+        return GraphCSR(np.asarray(self.atoms[a0:a1]), np.asarray(self.bonds[b0:b1]),
+                        np.asarray(self.atom_ptr[lo:hi + 1]) - a0, np.asarray(self.bond_ptr[lo:hi + 1]) - b0)
+
+    def take(self, rows):
+        """Arbitrary graph rows (vectorized gather)."""
+        rows = np.asarray(rows, dtype=np.int64)
+        atoms, atom_ptr = _gather(self.atoms, np.asarray(self.atom_ptr), rows)
+        bonds, bond_ptr = _gather(self.bonds, np.asarray(self.bond_ptr), rows)
+        return GraphCSR(atoms, bonds, atom_ptr, bond_ptr)
+
+    def atom_counts(self):
+        return np.diff(self.atom_ptr)
+
+    def bond_counts(self):
+        return np.diff(self.bond_ptr)
+
+def _gather(values, ptr, rows):
+    starts = ptr[rows]
+    counts = ptr[rows + 1] - starts
+    new_ptr = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    # Har output element ka source index: uske segment ka start + segment ke andar offset
+    idx = np.repeat(starts - new_ptr[:-1], counts) + np.arange(new_ptr[-1], dtype=np.int64)
+    return np.asarray(values[idx]), new_ptr
+
+class GraphBatch:
+    """Model ke drug tower ka input (x, edge_index, batch) - torch_geometric Batch jaisa, bina per-graph objects."""
+
+    def __init__(self, x, edge_index, batch, num_graphs):
+        self.x = x
+        self.edge_index = edge_index
+        self.batch = batch
+        self.num_graphs = num_graphs
+
+    def to(self, device):
+        return GraphBatch(self.x.to(device), self.edge_index.to(device), self.batch.to(device), self.num_graphs)
+
+def collate(csr):
+    """
+    GraphCSR -> GraphBatch, poora vectorized. Edge order PyG collation jaisa hi hai
+    (har bond i->j, j->i, graph by graph), isliye scores DataLoader wale path ke barabar hain.
+    """
+    atom_counts = csr.atom_counts()
+    bond_counts = csr.bond_counts()
+    num_graphs = len(atom_counts)
+
+    offsets = np.repeat(csr.atom_ptr[:-1], bond_counts)
+    pairs = csr.bonds.astype(np.int64) + offsets[:, None]
+    src = pairs.reshape(-1)
+    dst = pairs[:, ::-1].reshape(-1)
+
+    x = torch.from_numpy(csr.atoms.astype(np.int64))
+    edge_index = torch.from_numpy(np.stack([src, dst]))
+    batch = torch.from_numpy(np.repeat(np.arange(num_graphs, dtype=np.int64), atom_counts))
+    return GraphBatch(x, edge_index, batch, num_graphs)
+
+def budget_ranges(csr, max_nodes=BATCH_MAX_NODES, max_edges=BATCH_MAX_EDGES, max_graphs=BATCH_MAX_GRAPHS):
+    """
+    Contiguous [lo, hi) graph ranges jo node / edge / graph budget mein fit hon (fixed batch size ki jagah).
+    Chhote molecules bade batches mein, bade molecules chhote batches mein; budget se bada
+    single graph apne akele batch mein jata hai.
+    """
+    atom_ptr = np.asarray(csr.atom_ptr)
+    bond_ptr = np.asarray(csr.bond_ptr)
+    total, lo = len(csr), 0
+    while lo < total:
+        # Har bond do directed edges banta hai
+        hi_nodes = np.searchsorted(atom_ptr, atom_ptr[lo] + max_nodes, side='right') - 1
+        hi_edges = np.searchsorted(bond_ptr, bond_ptr[lo] + max_edges // 2, side='right') - 1
+        hi = max(lo + 1, min(hi_nodes, hi_edges, lo + max_graphs, total))
+        yield lo, hi
+        lo = hi
@@ -1,11 +1,13 @@
 import torch
+import numpy as np
 import requests
 import pubchempy as pcp
 from rdkit import Chem
 from rdkit.Chem import ChemicalFeatures
 from rdkit import RDConfig
 import os
-from torch_geometric.data import Data
+from modules.protein_store import get_sequence
+from modules.resolver import resolve_name
 
 ATOM_DICT = {'C':0, 'N':1, 'O':2, 'S':3, 'F':4, 'Cl':5, 'Br':6, 'I':7, 'P':8, 'Unknown':9} 
 AMINO_DICT = {aa: i for i, aa in enumerate("ACDEFGHIKLMNPQRSTVWY")}
@@ -13,6 +15,12 @@ AMINO_DICT = {aa: i for i, aa in enumerate("ACDEFGHIKLMNPQRSTVWY")}
 fdefName = os.path.join(RDConfig.RDDataDir, 'BaseFeatures.fdef')
 featFactory = ChemicalFeatures.BuildFeatureFactory(fdefName)
 
+def fetch_smiles_from_pubchem(name):
+    """PubChem name search. Not-found par None, network failure par exception."""
+    print(f"🌍 Searching PubChem for Name: {name}")
+    compounds = pcp.get_compounds(name, 'name')
+    return compounds[0].isomeric_smiles if compounds else None
+
 def get_smiles_from_input(input_str):
     if not input_str: return None, None
     input_str = input_str.strip()
@@ -21,32 +29,27 @@ def get_smiles_from_input(input_str):
     mol = Chem.MolFromSmiles(input_str)
     if mol: return input_str, mol 
 
-    # 2. Try Name Search
-    print(f"🌍 Searching PubChem for Name: {input_str}")
-    try:
-        compounds = pcp.get_compounds(input_str, 'name')
-        if compounds:
-            found_smiles = compounds[0].isomeric_smiles
-            mol = Chem.MolFromSmiles(found_smiles)
-            if mol: return found_smiles, mol
-    except Exception as e:
-        print(f"❌ PubChem Lookup Failed: {e}")
+    # 2. Try Name Search (library + cache pehle, PubChem sirf true miss par)
+    found_smiles = resolve_name(input_str, fetch_smiles_from_pubchem)
+    if found_smiles:
+        mol = Chem.MolFromSmiles(found_smiles)
+        if mol: return found_smiles, mol
     
     return None, None
 
+def fetch_protein_sequence(pdb_id):
+    """PDBe API call. Not-found par None, network failure par exception."""
+    url = f"https://www.ebi.ac.uk/pdbe/api/pdb/entry/molecules/{pdb_id}"
+    resp = requests.get(url, timeout=5)
+    if resp.status_code == 404:
+        return None
+    resp.raise_for_status()
+    entries = resp.json().get(pdb_id) or []
+    return entries[0].get('sequence') if entries else None
+
 def get_protein_sequence(pdb_id):
-    pdb_id = pdb_id.lower().strip()
-    # ✅ FIX: Added Timeout and Error Handling
-    try:
-        url = f"https://www.ebi.ac.uk/pdbe/api/pdb/entry/molecules/{pdb_id}"
-        resp = requests.get(url, timeout=5)
-        if resp.status_code != 200:
-            return None
-        data = resp.json()
-        return data[pdb_id][0]['sequence']
-    except Exception as e:
-        print(f"⚠️ Protein Fetch Error ({pdb_id}): {e}")
-        return None 
+    # ✅ Local store pehle (seqres import + cache), network sirf true miss par
+    return get_sequence(pdb_id, fetch_protein_sequence)
 
 def get_pharmacophore_data(mol):
     if not mol: return []
@@ -65,26 +68,35 @@ def get_pharmacophore_data(mol):
     except:
         return []
 
-def process_data_object(smiles, protein_seq, max_len=1000):
+def canonicalize_smiles(smiles):
+    """Returns RDKit canonical SMILES (store keys isi form mein hain), ya None."""
+    mol = Chem.MolFromSmiles(smiles) if smiles else None
+    return Chem.MolToSmiles(mol) if mol else None
+
+def featurize_mol(mol):
+    """
+    Compact graph arrays for a molecule:
+    atoms -> uint8 atom-type ids, bonds -> uint16 (num_bonds, 2) atom index pairs.
+    """
+    atoms = np.fromiter(
+        (ATOM_DICT.get(atom.GetSymbol(), 9) for atom in mol.GetAtoms()),
+        dtype=np.uint8, count=mol.GetNumAtoms()
+    )
+    bonds = np.array(
+        [(b.GetBeginAtomIdx(), b.GetEndAtomIdx()) for b in mol.GetBonds()],
+        dtype=np.uint16
+    ).reshape(-1, 2)
+    return atoms, bonds
+
+def featurize_smiles(smiles):
     try:
         mol = Chem.MolFromSmiles(smiles)
-        if not mol: return None
-        
-        x = [ATOM_DICT.get(atom.GetSymbol(), 9) for atom in mol.GetAtoms()]
-        x = torch.tensor(x, dtype=torch.long)
-        
-        src, dst = [], []
-        for bond in mol.GetBonds():
-            i, j = bond.GetBeginAtomIdx(), bond.GetEndAtomIdx()
-            src += [i, j]; dst += [j, i]
-        edge_index = torch.tensor([src, dst], dtype=torch.long)
-        
-        seq_indices = [AMINO_DICT.get(aa, 21) for aa in protein_seq]
-        if len(seq_indices) > max_len: seq_indices = seq_indices[:max_len]
-        else: seq_indices += [21] * (max_len - len(seq_indices))
-        prot_tensor = torch.tensor(seq_indices, dtype=torch.long).unsqueeze(0)
-        
-        data = Data(x=x, edge_index=edge_index)
-        data.protein = prot_tensor
-        return data
-    except: return None
\ No newline at end of file
+        if not mol or not 0 < mol.GetNumAtoms() <= np.iinfo(np.uint16).max: return None
+        return featurize_mol(mol)
+    except: return None
+
+def encode_protein(protein_seq, max_len=1000):
+    seq_indices = [AMINO_DICT.get(aa, 21) for aa in protein_seq]
+    if len(seq_indices) > max_len: seq_indices = seq_indices[:max_len]
+    else: seq_indices += [21] * (max_len - len(seq_indices))
+    return torch.tensor(seq_indices, dtype=torch.long).unsqueeze(0)
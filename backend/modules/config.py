@@ -0,0 +1,105 @@
+# File: backend/modules/config.py
+
+import os
+
+# ✅ Backend folder (drugs.db, model file waghaira yahin hain)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Drug library
+DB_NAME = "drugs.db"
+TXT_FILE = "drugs.txt"
+DB_PATH = os.path.join(BASE_DIR, DB_NAME)
+TXT_PATH = os.path.join(BASE_DIR, TXT_FILE)
+
+# Derived artifacts (graph store, caches) - delete karne se sab dobara ban jata hai
+CACHE_DIR = os.getenv("BIOGRAPH_CACHE_DIR", os.path.join(BASE_DIR, "cache"))
+GRAPH_STORE_DIR = os.path.join(CACHE_DIR, "graph_store")
+EMBEDDING_DIR = os.path.join(CACHE_DIR, "embeddings")
+
+# ✅ Offline mode: network lookups (PDBe, PubChem) band - sirf local stores use honge
+OFFLINE_MODE = os.getenv("BIOGRAPH_OFFLINE", "0").lower() in ("1", "true", "yes")
+
+# Protein sequence store (PDB seqres import + PDBe read-through cache)
+PROTEIN_DB_PATH = os.getenv("BIOGRAPH_PROTEIN_DB", os.path.join(CACHE_DIR, "proteins.db"))
+PROTEIN_CACHE_TTL = int(os.getenv("BIOGRAPH_PROTEIN_TTL", 30 * 24 * 3600))
+PROTEIN_MISS_TTL = int(os.getenv("BIOGRAPH_PROTEIN_MISS_TTL", 24 * 3600))
+
+# Name -> structure resolver (PubChem answers cache)
+RESOLVER_DB_PATH = os.path.join(CACHE_DIR, "resolver.db")
+NAME_MISS_TTL = int(os.getenv("BIOGRAPH_NAME_MISS_TTL", 24 * 3600))
+
+# Score cache (model hash + PDB ID + canonical SMILES)
+SCORE_DIR = os.path.join(CACHE_DIR, "scores")
+SCORE_DB_PATH = os.path.join(CACHE_DIR, "scores.db")
+
+# Background scan jobs
+SCAN_WORKERS = int(os.getenv("BIOGRAPH_SCAN_WORKERS", 2))
+MAX_PENDING_JOBS = int(os.getenv("BIOGRAPH_MAX_PENDING_JOBS", 16))
+# Manual /analyze, /similar, /substructure: apna pool (scans ke peeche wait nahi, pending limit mein nahi)
+INTERACTIVE_WORKERS = int(os.getenv("BIOGRAPH_INTERACTIVE_WORKERS", 4))
+JOB_RETENTION = int(os.getenv("BIOGRAPH_JOB_RETENTION", 3600))
+# Manual analysis ke independent stages (sequence fetch, name resolution, ADMET, pharmacophores) parallel
+STAGE_WORKERS = int(os.getenv("BIOGRAPH_STAGE_WORKERS", 4))
+
+# Multi-core RDKit featurization (process pool)
+FEATURIZE_WORKERS = int(os.getenv("BIOGRAPH_FEATURIZE_WORKERS", os.cpu_count() or 1))
+FEATURIZE_CHUNK = int(os.getenv("BIOGRAPH_FEATURIZE_CHUNK", 512))
+
+# GNN batch budget (fixed batch size ki jagah): total atoms / directed edges / graphs per batch
+BATCH_MAX_NODES = int(os.getenv("BIOGRAPH_BATCH_MAX_NODES", 16384))
+BATCH_MAX_EDGES = int(os.getenv("BIOGRAPH_BATCH_MAX_EDGES", 2 * 16384))
+BATCH_MAX_GRAPHS = int(os.getenv("BIOGRAPH_BATCH_MAX_GRAPHS", 1024))
+
+# Inference backend: eager | fused (BatchNorm folding) | int8 (fused + quantized head) | compile (fused + torch.compile)
+INFERENCE_BACKEND = os.getenv("BIOGRAPH_INFERENCE_BACKEND", "fused").lower()
+PARITY_TOLERANCE = float(os.getenv("BIOGRAPH_PARITY_TOLERANCE", 0.05))  # max allowed score drift (pKd)
+
+# LLM engine (Groq ya koi bhi Groq/OpenAI-compatible server, e.g. local stub)
+LLM_MODEL = os.getenv("BIOGRAPH_LLM_MODEL", "llama-3.3-70b-versatile")
+LLM_BASE_URL = os.getenv("BIOGRAPH_LLM_BASE_URL") or None
+LLM_CONCURRENCY = int(os.getenv("BIOGRAPH_LLM_CONCURRENCY", 4))
+LLM_TIMEOUT = float(os.getenv("BIOGRAPH_LLM_TIMEOUT", 60))
+LLM_MAX_CONNECTIONS = int(os.getenv("BIOGRAPH_LLM_MAX_CONNECTIONS", 20))
+LLM_CACHE_PATH = os.path.join(CACHE_DIR, "llm_cache.db")
+LLM_CACHE_TTL = int(os.getenv("BIOGRAPH_LLM_CACHE_TTL", 7 * 24 * 3600))
+
+# Molecule depictions (/molecule_image): SVG cache keyed by canonical SMILES + render options
+RENDER_CACHE_PATH = os.path.join(CACHE_DIR, "depictions.db")
+RENDER_MEMORY_ITEMS = int(os.getenv("BIOGRAPH_RENDER_MEMORY_ITEMS", 2048))
+RENDER_DISK_ITEMS = int(os.getenv("BIOGRAPH_RENDER_DISK_ITEMS", 100000))
+RENDER_MAX_AGE = int(os.getenv("BIOGRAPH_RENDER_MAX_AGE", 7 * 24 * 3600))  # browser Cache-Control
+RENDER_BATCH_LIMIT = int(os.getenv("BIOGRAPH_RENDER_BATCH_LIMIT", 1000))
+# ✅ Ingest time par poori library pre-render (default off - ~10 KB per molecule disk par)
+RENDER_PRERENDER = os.getenv("BIOGRAPH_PRERENDER_IMAGES", "0").lower() in ("1", "true", "yes")
+
+# Bulk PDF reports (top-N hits -> ZIP / combined PDF)
+REPORT_MAX = int(os.getenv("BIOGRAPH_REPORT_MAX", 500))
+REPORT_CHUNK = int(os.getenv("BIOGRAPH_REPORT_CHUNK", 8))  # reports per process-pool task
+
+# drugs.db access layer: thread-local connections, WAL, keyset-paginated streaming reads
+DB_FETCH_CHUNK = int(os.getenv("BIOGRAPH_DB_FETCH_CHUNK", 1024))
+DB_CACHE_MB = int(os.getenv("BIOGRAPH_DB_CACHE_MB", 16))     # per connection page cache
+DB_MMAP_MB = int(os.getenv("BIOGRAPH_DB_MMAP_MB", 256))
+
+# Library ingestion (python -m modules.ingest): records per chunk / transaction
+INGEST_CHUNK = int(os.getenv("BIOGRAPH_INGEST_CHUNK", 2000))
+
+# /upload: rows per parsed chunk (file disk par spool hoti hai, chunks mein parse)
+UPLOAD_CHUNK = int(os.getenv("BIOGRAPH_UPLOAD_CHUNK", 5000))
+
+# Similarity search: Morgan fingerprints (bit-packed memmap, graph store rows ke sath aligned)
+FINGERPRINT_DIR = os.path.join(CACHE_DIR, "fingerprints")
+FP_RADIUS = int(os.getenv("BIOGRAPH_FP_RADIUS", 2))
+FP_BITS = int(os.getenv("BIOGRAPH_FP_BITS", 2048))  # 64 ka multiple
+FP_BLOCK = int(os.getenv("BIOGRAPH_FP_BLOCK", 8192))  # rows per Tanimoto block (temp memory bounded)
+FP_WORKERS = int(os.getenv("BIOGRAPH_FP_WORKERS", os.cpu_count() or 1))  # search threads (library segments)
+
+# Substructure search: PatternFingerprint prefilter index, exact match sirf survivors par
+PATTERN_FP_DIR = os.path.join(CACHE_DIR, "pattern_fingerprints")
+PATTERN_FP_BITS = int(os.getenv("BIOGRAPH_PATTERN_FP_BITS", 2048))
+SUBSTRUCTURE_MAX_RESULTS = int(os.getenv("BIOGRAPH_SUBSTRUCTURE_MAX", 1000))
+SIMILAR_MAX_K = int(os.getenv("BIOGRAPH_SIMILAR_MAX_K", 1000))
+
+# Hit enrichment (ADMET + pharmacophores on demand, per page): memo size (canonical SMILES) / page size limit
+ENRICH_MEMORY_ITEMS = int(os.getenv("BIOGRAPH_ENRICH_MEMORY_ITEMS", 4096))
+ENRICH_PAGE_MAX = int(os.getenv("BIOGRAPH_ENRICH_PAGE_MAX", 200))
@@ -1,29 +1,63 @@
 import sqlite3
 import os
+import threading
 import pandas as pd
+# ✅ FIX: Robust Path Handling (paths ab config.py mein hain)
+from modules.config import (DB_NAME, TXT_FILE, DB_PATH, TXT_PATH, RENDER_PRERENDER,
+                            DB_FETCH_CHUNK, DB_CACHE_MB, DB_MMAP_MB)
 
-DB_NAME = "drugs.db"
-TXT_FILE = "drugs.txt"
+# ✅ Data access layer: har thread ka apna long-lived connection (har call par connect/close nahi).
+# WAL mode: scan threads ke reads ingest writes ko block nahi karte (aur ulta bhi).
+_local = threading.local()
 
-# ✅ FIX: Robust Path Handling (Backend folder ko sahi point karega)
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DB_PATH = os.path.join(BASE_DIR, DB_NAME)
-TXT_PATH = os.path.join(BASE_DIR, TXT_FILE)
+PRAGMAS = [
+    "PRAGMA synchronous = NORMAL",              # WAL ke sath safe, har commit par fsync nahi
+    f"PRAGMA cache_size = -{DB_CACHE_MB * 1024}",
+    "PRAGMA temp_store = MEMORY",
+    f"PRAGMA mmap_size = {DB_MMAP_MB * 1024 * 1024}",
+    "PRAGMA busy_timeout = 5000",
+]
+
+def get_connection():
+    """Thread-local drugs.db connection (tuned pragmas ke sath). Close mat karein - thread ke sath rehta hai."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(DB_PATH, timeout=5)
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")   # DB file mein persist hota hai
+        except sqlite3.OperationalError as e:
+            print(f"⚠️ WAL mode unavailable ({e}), default journal use ho raha hai.")
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        _local.conn = conn
+    return conn
+
+def close_connection():
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
 
 def init_db():
     # 1. Check agar DB pehle se exist karta hai to reset na karein
     if os.path.exists(DB_PATH):
         print(f"✅ Database '{DB_NAME}' already exists. Skipping reset.")
+        ensure_name_index()
+        refresh_library_cache()
+        refresh_descriptor_table()
+        prerender_depictions()
         return
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
     
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS drugs (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name TEXT NOT NULL,
-            smiles TEXT NOT NULL
+            smiles TEXT NOT NULL,
+            canonical_smiles TEXT,
+            inchikey TEXT
         )
     ''')
     
@@ -32,39 +66,334 @@ def init_db():
         return
 
     print(f"📂 Reading Samples File '{TXT_FILE}'...")
-    
+    # ✅ Streaming ingest (chunks, InChIKey dedup, batched transactions) - poori file memory mein nahi
+    from modules.ingest import ingest_file
     try:
-        df = pd.read_csv(TXT_PATH, sep='\t', comment='!', on_bad_lines='skip', encoding='latin1')
-        
-        if 'smiles' in df.columns:
-            name_col = 'pert_iname' if 'pert_iname' in df.columns else 'sample_id'
-            df_clean = df[[name_col, 'smiles']].dropna()
-            df_clean = df_clean.drop_duplicates(subset=[name_col])
-            
-            drugs_data = df_clean.values.tolist()
-            
-            print(f"✅ SMILES MIL GAYE! Total {len(drugs_data)} drugs.")
-            print("⏳ Inserting into Database...")
-            
-            cursor.executemany('INSERT INTO drugs (name, smiles) VALUES (?, ?)', drugs_data)
-            conn.commit()
-            print(f"🎉 Database ready with {len(drugs_data)} drugs.")
-            
-        else:
-            print("❌ Ab bhi SMILES nahi mile? Columns check karein.")
-
+        stats = ingest_file(TXT_PATH, "table", refresh=False)
+        print(f"🎉 Database ready with {stats['inserted']} drugs.")
     except Exception as e:
         print(f"❌ Database Init Error: {e}")
 
-    conn.close()
+    ensure_name_index()
+    refresh_library_cache()
+    refresh_descriptor_table()
+    prerender_depictions()
+
+def prerender_depictions():
+    # ✅ Optional (BIOGRAPH_PRERENDER_IMAGES=1): library ki SVG depictions ingest par hi cache mein
+    if not RENDER_PRERENDER: return 0
+    from modules.rendering import prerender_library
+    return prerender_library()
+
+def refresh_library_cache():
+    # ✅ Pre-featurized graphs: sirf naye SMILES ke liye RDKit chalega
+    # (lazy import: graph_store -> chemistry -> resolver -> database cycle se bachne ke liye)
+    from modules.graph_store import refresh_graph_store
+    try:
+        refresh_graph_store(iter_library_smiles())
+        refresh_canonical_column()
+    except Exception as e:
+        print(f"⚠️ Graph Store Refresh Error: {e}")
+    refresh_fingerprints()
+
+def refresh_fingerprints():
+    # Similarity search ke Morgan fingerprints (graph store ki nayi rows ke liye hi compute)
+    from modules.similarity import refresh_fingerprint_index
+    return refresh_fingerprint_index()
+
+def refresh_canonical_column():
+    """
+    drugs.canonical_smiles graph store ki keys se bharta hai (RDKit dobara nahi) - indexed joins
+    (descriptor filters) isi column par hote hain. Invalid SMILES = '' taake dobara try na hon.
+    """
+    from modules.graph_store import get_graph_store
+    store = get_graph_store()
+    conn = get_connection()
+    filled = 0
+    while True:
+        rows = conn.execute("SELECT id, smiles FROM drugs WHERE canonical_smiles IS NULL LIMIT ?", (DB_FETCH_CHUNK,)).fetchall()
+        if not rows: break
+        updates = []
+        for drug_id, smiles in rows:
+            row = store.lookup(smiles, canonicalize=False)
+            updates.append((store.keys[row] if row is not None else "", drug_id))
+        with conn:
+            conn.executemany("UPDATE drugs SET canonical_smiles = ? WHERE id = ?", updates)
+        filled += len(updates)
+    if filled: print(f"🔑 Canonical SMILES indexed for {filled} drugs.")
+    return filled
+
+DESCRIPTOR_INDEX_COLUMNS = ["mw", "logp", "tpsa", "qed", "violations", "is_safe"]
+
+# Allowed scan filters -> SQL predicate (column names whitelist, values hamesha bound parameters)
+DESCRIPTOR_PREDICATES = {
+    "mw_min": "mw >= ?", "mw_max": "mw <= ?",
+    "logp_min": "logp >= ?", "logp_max": "logp <= ?",
+    "tpsa_min": "tpsa >= ?", "tpsa_max": "tpsa <= ?",
+    "qed_min": "qed >= ?", "qed_max": "qed <= ?",
+    "max_violations": "violations <= ?",
+    "is_safe": "is_safe = ?",
+}
+
+def ensure_descriptor_table():
+    conn = get_connection()
+    with conn:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS drug_descriptors (
+                canonical_smiles TEXT PRIMARY KEY,
+                mw REAL NOT NULL,
+                logp REAL NOT NULL,
+                hbd INTEGER NOT NULL,
+                hba INTEGER NOT NULL,
+                tpsa REAL NOT NULL,
+                rotatable_bonds INTEGER NOT NULL,
+                qed REAL NOT NULL,
+                violations INTEGER NOT NULL,
+                is_safe INTEGER NOT NULL
+            )
+        ''')
+        # Property-filtered scans (iter_drugs(filters=...) ka descriptor join) ke liye
+        for col in DESCRIPTOR_INDEX_COLUMNS:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_descriptors_{col} ON drug_descriptors({col})")
+
+def refresh_descriptor_table():
+    """
+    ✅ ADMET descriptors ingest time par ek dafa (batched, process pool) - hits par RDKit/QED dobara nahi.
+    Key = canonical SMILES (graph store wala). Missing keys SQL mein (LEFT JOIN) pages mein nikalti hain -
+    library ka poora key set kabhi memory mein nahi.
+    """
+    from modules.admet import descriptor_chunk, descriptor_table_rows
+    from modules.featurizer import iter_chunk_results
+    try:
+        ensure_descriptor_table()
+        conn = get_connection()
+        todo = count_canonical_keys(without_descriptors=True)
+        if not todo:
+            print(f"✅ Descriptor table up to date ({count_canonical_keys()} molecules).")
+            return 0
+
+        print(f"⏳ Computing ADMET descriptors for {todo} molecules...")
+        added = 0
+        for keys in iter_canonical_keys(without_descriptors=True):
+            for chunk, values in iter_chunk_results(descriptor_chunk, keys):
+                batch = descriptor_table_rows(chunk, values)
+                with conn:  # ek transaction per chunk
+                    conn.executemany("INSERT OR REPLACE INTO drug_descriptors VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+                added += len(batch)
+        print(f"🧪 Descriptor table updated: +{added} molecules.")
+        return added
+    except Exception as e:
+        print(f"⚠️ Descriptor Table Error: {e}")
+        return 0
+
+def _canonical_keys_source(without_descriptors):
+    # drugs.canonical_smiles (refresh_canonical_column se bhara) - '' (invalid) aur NULL "> ''" se bahar
+    if not without_descriptors: return "FROM drugs d WHERE d.canonical_smiles > ?"
+    return ("FROM drugs d LEFT JOIN drug_descriptors x ON x.canonical_smiles = d.canonical_smiles "
+            "WHERE d.canonical_smiles > ? AND x.canonical_smiles IS NULL")
+
+def iter_canonical_keys(chunk_size=DB_FETCH_CHUNK, without_descriptors=False):
+    """
+    Library ke distinct canonical SMILES (graph store keys) pages mein, keyset order (idx_drugs_canonical) -
+    memory sirf ek page. without_descriptors=True: sirf woh jin ki drug_descriptors row nahi.
+    """
+    source = _canonical_keys_source(without_descriptors)
+    after = ""
+    conn = get_connection()
+    while True:
+        rows = conn.execute(f"SELECT DISTINCT d.canonical_smiles {source} ORDER BY d.canonical_smiles LIMIT ?",
+                            (after, chunk_size)).fetchall()
+        if not rows: return
+        yield [r[0] for r in rows]
+        after = rows[-1][0]
+
+def count_canonical_keys(without_descriptors=False):
+    source = _canonical_keys_source(without_descriptors)
+    return get_connection().execute(f"SELECT COUNT(DISTINCT d.canonical_smiles) {source}", ("",)).fetchone()[0]
+
+def get_descriptors(canonical_smiles_list):
+    """canonical SMILES -> descriptor dict (sirf jo table mein hain). Ek indexed read per 500 keys."""
+    found = {}
+    keys = list(dict.fromkeys(canonical_smiles_list))
+    if not keys: return found
+    cursor = get_connection().cursor()
+    cursor.row_factory = sqlite3.Row
+    try:
+        for lo in range(0, len(keys), 500):
+            chunk = keys[lo:lo + 500]
+            marks = ",".join("?" * len(chunk))
+            for row in cursor.execute(f"SELECT * FROM drug_descriptors WHERE canonical_smiles IN ({marks})", chunk):
+                found[row["canonical_smiles"]] = dict(row)
+    except sqlite3.OperationalError:
+        pass
+    return found
+
+def filter_clause(filters):
+    """filters -> (SQL WHERE clause, params). Unknown key par ValueError (scan shuru hone se pehle)."""
+    clauses, params = [], []
+    for key, value in (filters or {}).items():
+        if value is None: continue
+        if key not in DESCRIPTOR_PREDICATES: raise ValueError(f"Unknown filter '{key}'")
+        clauses.append(DESCRIPTOR_PREDICATES[key])
+        params.append(int(value) if isinstance(value, bool) else value)
+    return (" AND ".join(clauses) if clauses else "1"), params
+
+def name_key(name):
+    # Case-folded, whitespace-normalized lookup key
+    return " ".join(str(name).split()).casefold()
+
+def ensure_name_index():
+    """drugs schema upgrade (canonical_smiles, inchikey) + indexes + synonyms table (alias -> library name). Idempotent."""
+    conn = get_connection()
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(drugs)")}
+    with conn:
+        if "canonical_smiles" not in columns:
+            # Purani drugs.db: column add, refresh_canonical_column() graph store se bharega
+            conn.execute("ALTER TABLE drugs ADD COLUMN canonical_smiles TEXT")
+        if "inchikey" not in columns:
+            # Ingest dedup key (modules/ingest.py pehli ingest par backfill karta hai)
+            conn.execute("ALTER TABLE drugs ADD COLUMN inchikey TEXT")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_drugs_name_nocase ON drugs(name COLLATE NOCASE)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_drugs_canonical ON drugs(canonical_smiles)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_drugs_inchikey ON drugs(inchikey)")
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS synonyms (
+                alias_key TEXT PRIMARY KEY,
+                name TEXT NOT NULL
+            )
+        ''')
+    seeded = conn.execute("SELECT 1 FROM synonyms LIMIT 1").fetchone()
+    if not seeded: seed_vendor_synonyms()
+
+def seed_vendor_synonyms():
+    # drugs.txt ke vendor_name (e.g. 'Ambroxol hydrochloride', 'RVX-208') ko synonyms bana do
+    if not os.path.exists(TXT_PATH): return
+    try:
+        df = pd.read_csv(TXT_PATH, sep='\t', comment='!', on_bad_lines='skip', encoding='latin1')
+        if 'pert_iname' not in df.columns or 'vendor_name' not in df.columns: return
+        pairs = df[['vendor_name', 'pert_iname']].dropna().values.tolist()
+        added = add_synonyms(pairs)
+        print(f"📖 Synonym table seeded with {added} vendor names.")
+    except Exception as e:
+        print(f"⚠️ Synonym Seed Error: {e}")
+
+def add_synonyms(pairs):
+    """pairs: (alias, library_name). Existing aliases overwrite nahi hote."""
+    rows = [(name_key(alias), name) for alias, name in pairs if name_key(alias) != name_key(name)]
+    conn = get_connection()
+    with conn:
+        before = conn.total_changes
+        conn.executemany("INSERT OR IGNORE INTO synonyms (alias_key, name) VALUES (?, ?)", rows)
+        added = conn.total_changes - before
+    return added
+
+def find_smiles_by_name(name):
+    """Library lookup: exact name (case-insensitive, indexed), phir synonyms table."""
+    key = name_key(name)
+    conn = get_connection()
+    try:
+        row = conn.execute("SELECT smiles FROM drugs WHERE name = ? COLLATE NOCASE LIMIT 1", (key,)).fetchone()
+        if not row:
+            row = conn.execute('''
+                SELECT d.smiles FROM synonyms s
+                JOIN drugs d ON d.name = s.name COLLATE NOCASE
+                WHERE s.alias_key = ? LIMIT 1
+            ''', (key,)).fetchone()
+        return row[0] if row else None
+    except sqlite3.OperationalError:
+        return None
+
+def _drug_source(filters):
+    """filters -> (FROM ... WHERE d.id > ? ..., params). Property filters descriptor table join se."""
+    where, params = filter_clause(filters)
+    if not filters: return "FROM drugs d WHERE d.id > ?", params
+    # ✅ drugs.canonical_smiles -> drug_descriptors (PK lookup), filter SQL mein hi. CROSS JOIN = drugs outer
+    # loop (id order), taake har page ek range read rahe, poore filtered set ka sort nahi
+    return ("FROM drugs d CROSS JOIN drug_descriptors x ON x.canonical_smiles = d.canonical_smiles "
+            f"WHERE d.id > ? AND {where}"), params
+
+def get_drugs_page(after_id=0, limit=100, filters=None):
+    """
+    Keyset pagination (id > after_id, ORDER BY id): har page ek indexed range read, OFFSET ki tarah
+    pichli rows skip nahi karni padti. Returns (drugs, next_after_id ya None agar aakhri page).
+    """
+    source, params = _drug_source(filters)
+    rows = get_connection().execute(f"SELECT d.id, d.name, d.smiles {source} ORDER BY d.id LIMIT ?",
+                                    [after_id, *params, limit]).fetchall()
+    drugs = [{"id": r[0], "name": r[1], "smiles": r[2]} for r in rows]
+    return drugs, (drugs[-1]["id"] if len(drugs) == limit else None)
+
+def iter_drugs(chunk_size=DB_FETCH_CHUNK, filters=None):
+    """
+    ✅ Streaming library read: chunks of {'id', 'name', 'smiles'} (id order). Memory sirf ek chunk,
+    scan pehle chunk ke baad hi kaam shuru kar deta hai. Unknown filter par ValueError foran.
+    """
+    filter_clause(filters)  # validate abhi, pehle next() par nahi
+    def chunks():
+        after_id = 0
+        while after_id is not None:
+            drugs, after_id = get_drugs_page(after_id, chunk_size, filters)
+            if drugs: yield drugs
+    return chunks()
+
+def _canonical_source(keys, filters):
+    """Sirf in canonical SMILES wale drugs (idx_drugs_canonical lookups) + optional property filters."""
+    where, params = filter_clause(filters)
+    join = "CROSS JOIN drug_descriptors x ON x.canonical_smiles = d.canonical_smiles " if filters else ""
+    marks = ",".join("?" * len(keys))
+    return f"FROM drugs d {join}WHERE d.canonical_smiles IN ({marks}) AND {where}", [*keys, *params]
+
+def iter_drugs_by_canonical(keys, chunk_size=DB_FETCH_CHUNK, filters=None):
+    """
+    iter_drugs() jaisa, lekin sirf given canonical SMILES (e.g. substructure matches) ke drugs - cost matches
+    ke barabar, library size ke nahi. Unknown filter par ValueError foran.
+    """
+    filter_clause(filters)
+    keys = list(keys)
+    def chunks():
+        conn = get_connection()
+        for lo in range(0, len(keys), chunk_size):
+            drugs = []
+            for k in range(lo, min(lo + chunk_size, len(keys)), 500):
+                source, params = _canonical_source(keys[k:min(k + 500, lo + chunk_size)], filters)
+                drugs.extend({"id": r[0], "name": r[1], "smiles": r[2]}
+                             for r in conn.execute(f"SELECT d.id, d.name, d.smiles {source} ORDER BY d.id", params))
+            if drugs: yield drugs
+    return chunks()
+
+def count_drugs_by_canonical(keys, filters=None):
+    keys = list(keys)
+    total = 0
+    for lo in range(0, len(keys), 500):
+        source, params = _canonical_source(keys[lo:lo + 500], filters)
+        total += get_connection().execute(f"SELECT COUNT(*) {source}", params).fetchone()[0]
+    return total
+
+def iter_library_smiles():
+    for drugs in iter_drugs():
+        for drug in drugs:
+            yield drug["smiles"]
+
+def count_drugs(filters=None):
+    source, params = _drug_source(filters)
+    return get_connection().execute(f"SELECT COUNT(*) {source}", [0, *params]).fetchone()[0]
+
+def get_drugs_by_canonical(keys):
+    """canonical SMILES list -> {canonical: {'id', 'name', 'smiles'}} (duplicates mein pehli id). Indexed IN reads."""
+    conn = get_connection()
+    found = {}
+    keys = list(dict.fromkeys(keys))
+    for lo in range(0, len(keys), 500):
+        chunk = keys[lo:lo + 500]
+        marks = ",".join("?" * len(chunk))
+        for drug_id, name, smiles, canonical in conn.execute(
+                f"SELECT id, name, smiles, canonical_smiles FROM drugs WHERE canonical_smiles IN ({marks}) ORDER BY id", chunk):
+            found.setdefault(canonical, {"id": drug_id, "name": name, "smiles": smiles})
+    return found
 
 def get_all_drugs():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT name, smiles FROM drugs") 
-    drugs = [{"name": row[0], "smiles": row[1]} for row in cursor.fetchall()]
-    conn.close()
-    return drugs
+    # Purana API (poori list memory mein) - naye code mein iter_drugs() use karein
+    return [{"name": d["name"], "smiles": d["smiles"]} for drugs in iter_drugs() for d in drugs]
 
 if __name__ == "__main__":
     init_db()
\ No newline at end of file
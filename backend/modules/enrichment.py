@@ -0,0 +1,65 @@
+# File: backend/modules/enrichment.py
+
+import threading
+from collections import OrderedDict
+from rdkit import Chem
+
+from modules.config import ENRICH_MEMORY_ITEMS
+from modules.graph_store import get_graph_store
+from modules.admet import lookup_admet_properties
+from modules.chemistry import get_pharmacophore_data
+
+# Scan hits ka ADMET + pharmacophores scan ke dauran nahi, jab user rows dekhe (page by page).
+# Memo key = canonical SMILES, taake same molecule (dusra page / dusra scan / dusra naam) dobara compute na ho.
+
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+
+def _canonical(smiles, store):
+    """SMILES -> (canonical, mol ya None). Library molecules ka canonical graph store se (RDKit nahi)."""
+    row = store.lookup(smiles, canonicalize=False)
+    if row is not None: return store.keys[row], None
+    mol = Chem.MolFromSmiles(smiles)
+    return (Chem.MolToSmiles(mol), mol) if mol else (None, None)
+
+def enrich_smiles(smiles_list):
+    """SMILES list -> [{'admet', 'active_sites'}] same order mein (invalid SMILES par admet None)."""
+    store = get_graph_store()
+    canon = [_canonical(str(smi), store) for smi in smiles_list]
+
+    found = {}
+    with _memo_lock:
+        for key, _ in canon:
+            if key in _memo:
+                _memo.move_to_end(key)
+                found[key] = _memo[key]
+
+    todo = {}
+    for key, mol in canon:
+        if key and key not in found and key not in todo: todo[key] = mol
+    if todo:
+        keys = list(todo)
+        mols = [todo[key] or Chem.MolFromSmiles(key) for key in keys]
+        # ✅ Descriptor table hits ek read mein, baqi RDKit; pharmacophores sirf isi page ke liye
+        for key, mol, admet in zip(keys, mols, lookup_admet_properties(keys, mols)):
+            found[key] = {"admet": admet, "active_sites": get_pharmacophore_data(mol)}
+        with _memo_lock:
+            for key in keys:
+                _memo[key] = found[key]
+                _memo.move_to_end(key)
+            while len(_memo) > ENRICH_MEMORY_ITEMS:
+                _memo.popitem(last=False)
+
+    return [found.get(key, {"admet": None, "active_sites": []}) for key, _ in canon]
+
+def enrich_page(rows, page=0, page_size=20):
+    """
+    Result rows (score ke hisaab se sorted) ka ek page, ADMET + active_sites ke sath (copies, asli rows nahi badalte).
+    Returns {"results", "page", "page_size", "total", "next_page"}.
+    """
+    start = page * page_size
+    chunk = rows[start:start + page_size]
+    details = enrich_smiles([row.get("smiles", "") for row in chunk])
+    results = [{**row, **detail} for row, detail in zip(chunk, details)]
+    next_page = page + 1 if start + page_size < len(rows) else None
+    return {"results": results, "page": page, "page_size": page_size, "total": len(rows), "next_page": next_page}
@@ -0,0 +1,91 @@
+# File: backend/modules/explanations.py
+
+import time
+import uuid
+import threading
+
+from modules.config import JOB_RETENTION
+from modules.llm_engine import llm_bot
+
+class Explanation:
+    """
+    Deferred AI explanation handle. LLM engine loop par generate hoti hai; events (tokens, sections)
+    record hote hain taake /explanations/{id}/stream baad mein connect ho kar bhi sab replay kar sake.
+    """
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.events = []
+        self.sections = {}
+        self.result = None
+        self.done = False
+        self.created_at = time.time()
+        self.finished_at = None
+        self.future = None
+        self._cond = threading.Condition()
+
+    def add(self, event):
+        with self._cond:
+            self.events.append(event)
+            if event["type"] == "section": self.sections[event["key"]] = event["value"]
+            self._cond.notify_all()
+
+    def finish(self, ai_explanation):
+        with self._cond:
+            self.result = ai_explanation
+            self.done = True
+            self.finished_at = time.time()
+            self._cond.notify_all()
+
+    def wait(self, timeout=None):
+        with self._cond:
+            self._cond.wait_for(lambda: self.done, timeout=timeout)
+        return self.result
+
+    def iter_events(self, timeout=0.5):
+        """Recorded + live events (blocking), aakhir mein {"type": "done", "ai_explanation"}."""
+        sent = 0
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self.done or len(self.events) > sent, timeout=timeout)
+                pending, done = self.events[sent:], self.done
+            sent += len(pending)
+            yield from pending
+            if done and sent == len(self.events):
+                yield {"type": "done", "ai_explanation": self.result}
+                return
+
+    def status(self):
+        if self.done: return {"explanation_id": self.id, "status": "done", "ai_explanation": self.result}
+        return {"explanation_id": self.id, "status": "pending", "sections": dict(self.sections)}
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+async def _produce(explanation, drug_data, target_id):
+    result = None
+    try:
+        async for event in llm_bot.analyze_drug_stream_async(drug_data, target_id):
+            if event["type"] == "explanation": result = event["ai_explanation"]
+            else: explanation.add(event)
+    finally:
+        explanation.finish(result)
+
+def start_explanation(drug_data, target_id):
+    """AI explanation background mein shuru karo; handle turant return hota hai."""
+    _cleanup()
+    explanation = Explanation()
+    with _registry_lock:
+        _registry[explanation.id] = explanation
+    explanation.future = llm_bot.spawn(_produce(explanation, drug_data, target_id))
+    return explanation
+
+def get_explanation(explanation_id):
+    return _registry.get(explanation_id)
+
+def _cleanup():
+    now = time.time()
+    with _registry_lock:
+        expired = [eid for eid, e in _registry.items() if e.done and now - e.finished_at > JOB_RETENTION]
+        for eid in expired:
+            del _registry[eid]
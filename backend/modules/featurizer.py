@@ -0,0 +1,126 @@
+# File: backend/modules/featurizer.py
+
+import itertools
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from rdkit import Chem
+
+from modules.config import FEATURIZE_WORKERS, FEATURIZE_CHUNK
+from modules.chemistry import featurize_mol
+from modules.batching import GraphCSR
+
+MAX_ATOMS = np.iinfo(np.uint16).max
+
+class FeaturizedChunk:
+    """
+    Ek chunk ka compact result (worker -> parent sirf ye chand arrays pickle hote hain, Data objects nahi).
+    Molecule i: atoms[atom_ptr[i]:atom_ptr[i+1]], bonds[bond_ptr[i]:bond_ptr[i+1]]; valid[i] False = parse fail.
+    """
+
+    def __init__(self, atoms, bonds, atom_ptr, bond_ptr, valid, canonical):
+        self.atoms = atoms
+        self.bonds = bonds
+        self.atom_ptr = atom_ptr
+        self.bond_ptr = bond_ptr
+        self.valid = valid
+        self.canonical = canonical
+
+    def __len__(self):
+        return len(self.valid)
+
+    def valid_rows(self):
+        return np.flatnonzero(self.valid)
+
+    def valid_csr(self):
+        """Sirf valid molecules, GraphCSR form mein (seedha modules.batching.collate ke liye)."""
+        return GraphCSR(self.atoms, self.bonds, self.atom_ptr, self.bond_ptr).take(self.valid_rows())
+
+    def graph(self, i):
+        if not self.valid[i]: return None
+        return (self.atoms[self.atom_ptr[i]:self.atom_ptr[i + 1]],
+                self.bonds[self.bond_ptr[i]:self.bond_ptr[i + 1]])
+
+def featurize_chunk(smiles_list):
+    """Worker function: SMILES list -> FeaturizedChunk (top-level taake pickle ho sake)."""
+    atoms, bonds, atom_counts, bond_counts, valid, canonical = [], [], [], [], [], []
+    for smi in smiles_list:
+        try: mol = Chem.MolFromSmiles(str(smi)) if smi else None
+        except: mol = None
+        if mol is None or not 0 < mol.GetNumAtoms() <= MAX_ATOMS:
+            atom_counts.append(0); bond_counts.append(0)
+            valid.append(False); canonical.append(None)
+            continue
+        a, b = featurize_mol(mol)
+        atoms.append(a); bonds.append(b)
+        atom_counts.append(len(a)); bond_counts.append(len(b))
+        valid.append(True); canonical.append(Chem.MolToSmiles(mol))
+
+    return FeaturizedChunk(
+        np.concatenate(atoms) if atoms else np.zeros(0, dtype=np.uint8),
+        np.concatenate(bonds) if bonds else np.zeros((0, 2), dtype=np.uint16),
+        np.concatenate([[0], np.cumsum(atom_counts, dtype=np.int64)]),
+        np.concatenate([[0], np.cumsum(bond_counts, dtype=np.int64)]),
+        np.array(valid, dtype=bool),
+        canonical,
+    )
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: server threads (uvicorn/torch) ke sath fork safe nahi
+            _pool = ProcessPoolExecutor(max_workers=FEATURIZE_WORKERS,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+def _chunks(iterable, size):
+    it = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk: return
+        yield chunk
+
+def iter_chunk_results(fn, items, chunk_size=FEATURIZE_CHUNK, workers=FEATURIZE_WORKERS):
+    """
+    Yields (chunk, fn(chunk)) input order mein. fn top-level worker function hona chahiye
+    (featurize_chunk, admet.descriptor_chunk). Chunks process pool mein parallel chalte hain
+    jab tak caller pichle chunk par kaam kar raha ho; zyada se zyada workers*2 chunks in-flight.
+    """
+    chunks = _chunks(items, chunk_size)
+    if workers <= 1:
+        for chunk in chunks:
+            yield chunk, fn(chunk)
+        return
+
+    first = next(chunks, None)
+    if first is None: return
+    second = next(chunks, None)
+    if second is None:
+        # Chhota input: process pool ka overhead bekaar hai
+        yield first, fn(first)
+        return
+
+    pool = get_pool()
+    pending = deque()
+    try:
+        for chunk in itertools.chain([first, second], chunks):
+            pending.append((chunk, pool.submit(fn, chunk)))
+            if len(pending) >= workers * 2:
+                chunk_done, future = pending.popleft()
+                yield chunk_done, future.result()
+        while pending:
+            chunk_done, future = pending.popleft()
+            yield chunk_done, future.result()
+    finally:
+        for _, future in pending:
+            future.cancel()
+
+def iter_featurized(smiles_iter, chunk_size=FEATURIZE_CHUNK, workers=FEATURIZE_WORKERS):
+    """Yields (smiles_chunk, FeaturizedChunk) input order mein (multi-core RDKit featurization)."""
+    return iter_chunk_results(featurize_chunk, smiles_iter, chunk_size, workers)
@@ -0,0 +1,218 @@
+# File: backend/modules/graph_store.py
+
+import os
+import json
+import threading
+import numpy as np
+
+from modules.config import GRAPH_STORE_DIR
+from modules.batching import GraphCSR
+from modules.chemistry import canonicalize_smiles
+from modules.featurizer import iter_featurized
+
+# ATOM_DICT / featurization badle to ye number barhayein, store khud rebuild ho jayega
+FEATURE_VERSION = 1
+ARRAYS = {"atoms": np.uint8, "bonds": np.uint16, "atom_ptr": np.int64, "bond_ptr": np.int64}
+
+class GraphStore:
+    """
+    Content-addressed store of featurized molecule graphs (keyed by canonical SMILES).
+    Graphs are packed CSR-style: row i ke atoms = atoms[atom_ptr[i]:atom_ptr[i+1]],
+    bonds = bonds[bond_ptr[i]:bond_ptr[i+1]]. Arrays raw .bin files hain aur mmap se load hote hain.
+
+    Saari files append-only hain (keys.txt, aliases.jsonl, invalid.jsonl bhi). index.json commit record hai:
+    rows + har file ka committed size. Refresh pehle naye bytes likh ke fsync karta hai, phir index.json
+    atomic replace - crash ke baad committed size se aage ke bytes ignore (aur agle append par truncate) hote hain.
+    """
+
+    def __init__(self, path=GRAPH_STORE_DIR):
+        self.path = path
+        self._lock = threading.Lock()
+        self._load()
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _load(self):
+        meta = None
+        if os.path.exists(self._file("index.json")):
+            with open(self._file("index.json")) as f:
+                meta = json.load(f)
+            if meta.get("version") != FEATURE_VERSION:
+                print("♻️ Graph store version changed. Rebuilding...")
+                meta = None
+
+        self._reset()
+        if meta is None: return
+        try:
+            self._load_committed(meta)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"♻️ Graph store files inconsistent ({e}). Rebuilding...")
+            self._reset()
+
+    def _reset(self):
+        self.keys, self.aliases, self.invalid = [], {}, set()
+        self.sizes = {}
+        self.arrays = {name: self._map(name, 0) for name in ARRAYS}
+        self.index = {}
+
+    def _read(self, name, size):
+        if not size: return []
+        with open(self._file(name), "rb") as f:
+            data = f.read(size)
+        if len(data) != size: raise ValueError(f"{name} is shorter than committed")
+        return data.decode("utf-8").split("\n")[:-1]
+
+    def _map(self, name, size):
+        dtype = np.dtype(ARRAYS[name])
+        if not size:
+            # Khali store: ptr arrays ka pehla 0
+            return np.zeros(1 if name.endswith("_ptr") else 0, dtype=dtype).reshape((-1, 2) if name == "bonds" else -1)
+        path = self._file(f"{name}.bin")
+        if os.path.getsize(path) < size: raise ValueError(f"{name}.bin is shorter than committed")
+        shape = (size // dtype.itemsize // 2, 2) if name == "bonds" else (size // dtype.itemsize,)
+        return np.memmap(path, dtype=dtype, mode='r', shape=shape)
+
+    def _load_committed(self, meta):
+        sizes = meta["sizes"]
+        keys = self._read("keys.txt", sizes.get("keys.txt", 0))
+        aliases = dict(json.loads(line) for line in self._read("aliases.jsonl", sizes.get("aliases.jsonl", 0)))
+        invalid = {json.loads(line) for line in self._read("invalid.jsonl", sizes.get("invalid.jsonl", 0))}
+        arrays = {name: self._map(name, sizes.get(f"{name}.bin", 0)) for name in ARRAYS}
+
+        n = meta["rows"]
+        a = arrays
+        if len(keys) != n or len(a["atom_ptr"]) != n + 1 or len(a["bond_ptr"]) != n + 1 \
+                or a["atom_ptr"][-1] != len(a["atoms"]) or a["bond_ptr"][-1] != len(a["bonds"]):
+            raise ValueError(f"row count mismatch ({len(keys)} keys, index says {n})")
+
+        self.keys, self.aliases, self.invalid, self.arrays, self.sizes = keys, aliases, invalid, arrays, dict(sizes)
+        self.index = {key: i for i, key in enumerate(keys)}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup(self, smiles, canonicalize=True):
+        """Row number for a SMILES (raw ya canonical), None agar store mein nahi."""
+        row = self.index.get(smiles)
+        if row is None: row = self.aliases.get(smiles)
+        if row is None and canonicalize and smiles not in self.invalid:
+            row = self.index.get(canonicalize_smiles(smiles))
+        return row
+
+    def get_graph(self, row):
+        a = self.arrays
+        atoms = a["atoms"][a["atom_ptr"][row]:a["atom_ptr"][row + 1]]
+        bonds = a["bonds"][a["bond_ptr"][row]:a["bond_ptr"][row + 1]]
+        return atoms, bonds
+
+    def csr(self):
+        """Poora store as GraphCSR (memmap arrays, slice/take se batches bante hain)."""
+        a = self.arrays
+        return GraphCSR(a["atoms"], a["bonds"], a["atom_ptr"], a["bond_ptr"])
+
+    def refresh(self, smiles_iter):
+        """
+        Incremental update: sirf woh SMILES featurize hote hain jo store mein nahi hain.
+        Returns number of new graphs added.
+        """
+        with self._lock:
+            new_keys, new_atoms, new_bonds, new_invalid = [], [], [], []
+            new_aliases = {}
+            pending = {}
+
+            todo = []
+            for smi in smiles_iter:
+                if smi in self.index or smi in self.aliases or smi in self.invalid: continue
+                todo.append(smi)
+
+            # ✅ RDKit parsing multi-core (modules/featurizer.py)
+            for chunk, result in iter_featurized(dict.fromkeys(todo)):
+                for i, smi in enumerate(chunk):
+                    graph = result.graph(i)
+                    if graph is None:
+                        new_invalid.append(smi)
+                        continue
+                    canon = result.canonical[i]
+                    row = self.index.get(canon, pending.get(canon))
+                    if row is None:
+                        row = len(self.keys) + len(new_keys)
+                        pending[canon] = row
+                        new_keys.append(canon)
+                        new_atoms.append(graph[0])
+                        new_bonds.append(graph[1])
+                    if smi != canon: new_aliases[smi] = row
+
+            if not new_keys and not new_aliases and not new_invalid:
+                return 0
+
+            self._commit(new_keys, new_atoms, new_bonds, new_aliases, new_invalid)
+            return len(new_keys)
+
+    def _commit(self, new_keys, new_atoms, new_bonds, new_aliases, new_invalid):
+        """Naye rows/aliases/invalids files ke end par (kaam sirf naye data jitna), phir index.json."""
+        tails = {}
+        if new_keys:
+            a = self.arrays
+            atom_counts = np.array([len(x) for x in new_atoms], dtype=np.int64)
+            bond_counts = np.array([len(x) for x in new_bonds], dtype=np.int64)
+            # Naye store ki ptr files mein pehla 0 bhi likhna hai
+            head = np.zeros(0 if self.sizes.get("atom_ptr.bin") else 1, dtype=np.int64)
+            tails["atoms.bin"] = np.concatenate(new_atoms)
+            tails["bonds.bin"] = np.concatenate(new_bonds).reshape(-1, 2)
+            tails["atom_ptr.bin"] = np.concatenate([head, a["atom_ptr"][-1] + np.cumsum(atom_counts)])
+            tails["bond_ptr.bin"] = np.concatenate([head, a["bond_ptr"][-1] + np.cumsum(bond_counts)])
+            tails = {name: arr.astype(ARRAYS[name[:-4]], copy=False).tobytes() for name, arr in tails.items()}
+            tails["keys.txt"] = "".join(f"{key}\n" for key in new_keys).encode("utf-8")
+        if new_aliases:
+            tails["aliases.jsonl"] = "".join(json.dumps([smi, row]) + "\n" for smi, row in new_aliases.items()).encode("utf-8")
+        if new_invalid:
+            tails["invalid.jsonl"] = "".join(json.dumps(smi) + "\n" for smi in new_invalid).encode("utf-8")
+
+        os.makedirs(self.path, exist_ok=True)
+        sizes = dict(self.sizes)
+        for name, data in tails.items():
+            committed = sizes.get(name, 0)
+            with open(self._file(name), "ab") as f:
+                f.truncate(committed)  # Pichle crash ka adhoora tail
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            sizes[name] = committed + len(data)
+
+        rows = len(self.keys) + len(new_keys)
+        tmp = self._file("index.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump({"version": FEATURE_VERSION, "rows": rows, "sizes": sizes}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._file("index.json"))
+
+        # Commit ho gaya - ab memory state (arrays pehle, keys baad mein: reader ko naya key mile to graph bhi ho)
+        self.sizes = sizes
+        if new_keys:
+            self.arrays = {name: self._map(name, sizes.get(f"{name}.bin", 0)) for name in ARRAYS}
+        for key in new_keys:
+            self.index[key] = len(self.keys)
+            self.keys.append(key)
+        self.aliases.update(new_aliases)
+        self.invalid.update(new_invalid)
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_graph_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = GraphStore()
+        return _store
+
+def refresh_graph_store(smiles_list):
+    store = get_graph_store()
+    added = store.refresh(smiles_list)
+    if added:
+        print(f"🧬 Graph store updated: +{added} graphs ({len(store)} total).")
+    else:
+        print(f"✅ Graph store up to date ({len(store)} graphs).")
+    return added
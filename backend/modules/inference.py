@@ -0,0 +1,155 @@
+# File: backend/modules/inference.py
+
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+import torch
+
+from modules.ai_model import DEVICE
+from modules.config import EMBEDDING_DIR
+from modules.chemistry import encode_protein
+from modules.batching import budget_ranges, collate
+from modules.graph_store import get_graph_store, FEATURE_VERSION
+
+EMBED_DIM = 128
+PROT_CACHE_SIZE = 256
+LIBRARY_CHUNK = 4096
+
+_prot_cache = OrderedDict()
+_prot_lock = threading.Lock()
+_lib_lock = threading.Lock()
+_lib_vecs = {}
+
+def get_protein_vector(model, target_id, protein_seq):
+    """Target ko ek dafa encode karke (model hash, backend, PDB ID) par cache karta hai. Returns (1, 128)."""
+    key = (model.model_hash, getattr(model, "backend", "eager"), target_id.lower().strip())
+    with _prot_lock:
+        if key in _prot_cache:
+            _prot_cache.move_to_end(key)
+            return _prot_cache[key]
+
+    with torch.inference_mode():
+        prot_vec = model.encode_protein(encode_protein(protein_seq).to(DEVICE))
+
+    with _prot_lock:
+        _prot_cache[key] = prot_vec
+        while len(_prot_cache) > PROT_CACHE_SIZE:
+            _prot_cache.popitem(last=False)
+    return prot_vec
+
+# Allocation failures ki pehchan (CPU allocator / CUDA caching allocator / MPS messages)
+OOM_MARKERS = ("out of memory", "can't allocate memory", "failed to allocate", "not enough memory")
+
+def is_out_of_memory(e):
+    """Sirf memory failures par batch split hota hai - baqi errors (shape/dtype bugs) job ko asal error se fail karein."""
+    if isinstance(e, (torch.OutOfMemoryError, MemoryError)): return True
+    return isinstance(e, RuntimeError) and any(m in str(e).lower() for m in OOM_MARKERS)
+
+def _run_split(fn, csr, width):
+    """
+    Ek budget batch chalao; out-of-memory par aadha karke retry. Akela molecule bhi OOM ho
+    to uski row NaN - caller usay unscored report karta hai, 0.0 kabhi nahi.
+    """
+    try:
+        with torch.inference_mode():
+            batch = collate(csr).to(DEVICE)
+            return fn(batch).reshape(len(csr), width).cpu().numpy()
+    except Exception as e:
+        if not is_out_of_memory(e): raise
+        if DEVICE.type == "cuda": torch.cuda.empty_cache()
+        if len(csr) == 1:
+            print(f"⚠️ Inference failed for one molecule ({csr.atom_counts()[0]} atoms): {e}")
+            return np.full((1, width), np.nan, dtype=np.float32)
+        print(f"⚠️ Batch of {len(csr)} graphs ran out of memory, splitting and retrying...")
+        mid = len(csr) // 2
+        return np.concatenate([_run_split(fn, csr.slice(0, mid), width),
+                               _run_split(fn, csr.slice(mid, len(csr)), width)])
+
+def _iter_budgeted(fn, csr, width, **budget):
+    # inference_mode sirf har _run_split ke andar: yield ke beech caller ka code normal mode mein chalta hai
+    for lo, hi in budget_ranges(csr, **budget):
+        yield _run_split(fn, csr.slice(lo, hi), width)
+
+def encode_drugs(model, csr, **budget):
+    """Drug tower only (GraphCSR input) -> (N, 128) float32 numpy matrix (failed molecules NaN)."""
+    fn = lambda b: model.encode_drug(b.x, b.edge_index, b.batch)
+    vecs = list(_iter_budgeted(fn, csr, EMBED_DIM, **budget))
+    if not vecs: return np.zeros((0, EMBED_DIM), dtype=np.float32)
+    return np.concatenate(vecs).astype(np.float32, copy=False)
+
+def score_vectors(model, drug_vecs, prot_vec, chunk=65536):
+    """Precomputed drug vectors + one prot_vec -> raw scores, sirf fc1/fc2/out head."""
+    out = []
+    with torch.inference_mode():
+        for start in range(0, len(drug_vecs), chunk):
+            d = torch.from_numpy(np.array(drug_vecs[start:start + chunk], dtype=np.float32)).to(DEVICE)
+            out.append(model.head(d, prot_vec).view(-1).cpu())
+    if not out: return np.zeros(0, dtype=np.float32)
+    return torch.cat(out).numpy()
+
+def score_panel(model, drug_vecs, prot_vecs, chunk=4096):
+    """Drug vectors (N, 128) x target vectors (T, 128) -> (N, T) raw score matrix."""
+    out = []
+    with torch.inference_mode():
+        for start in range(0, len(drug_vecs), chunk):
+            d = torch.from_numpy(np.array(drug_vecs[start:start + chunk], dtype=np.float32)).to(DEVICE)
+            out.append(model.head_panel(d, prot_vecs).cpu())
+    if not out: return np.zeros((0, len(prot_vecs)), dtype=np.float32)
+    return torch.cat(out).numpy()
+
+def iter_score_graphs(model, csr, prot_vec, **budget):
+    """
+    Ad-hoc molecules (manual / upload / store misses): drug tower + head, har budget batch ke
+    scores yield (numpy, failed molecules NaN).
+    """
+    fn = lambda b: model.head(model.encode_drug(b.x, b.edge_index, b.batch), prot_vec)
+    for scores in _iter_budgeted(fn, csr, 1, **budget):
+        yield scores.reshape(-1)
+
+def score_graphs(model, csr, prot_vec, **budget):
+    scores = list(iter_score_graphs(model, csr, prot_vec, **budget))
+    return np.concatenate(scores) if scores else np.zeros(0, dtype=np.float32)
+
+def get_library_embeddings(model):
+    """
+    Memory-mapped (len(graph store), 128) drug_vec matrix, graph store rows ke sath aligned.
+    File name model hash + inference backend se tag hai - naya model / backend aaye to matrix khud dobara banta hai.
+    Store mein naye graphs aayen to sirf unke vectors compute hote hain.
+    """
+    store = get_graph_store()
+    tag = f"drug_vec_{model.model_hash[:16]}_{getattr(model, 'backend', 'eager')}_v{FEATURE_VERSION}.npy"
+    path = os.path.join(EMBEDDING_DIR, tag)
+
+    with _lib_lock:
+        vecs = _lib_vecs.get(path)
+        if vecs is None and os.path.exists(path):
+            vecs = np.load(path, mmap_mode='r')
+        if vecs is None or len(vecs) < len(store):
+            vecs = _extend_library_embeddings(model, store, vecs, path)
+        _lib_vecs.clear()
+        _lib_vecs[path] = vecs
+        return vecs
+
+def _extend_library_embeddings(model, store, vecs, path):
+    start = 0 if vecs is None else len(vecs)
+    total = len(store)
+    print(f"🧠 Encoding library drugs {start}..{total} ...")
+
+    os.makedirs(EMBEDDING_DIR, exist_ok=True)
+    tmp = path + ".tmp"
+    out = np.lib.format.open_memmap(tmp, mode='w+', dtype=np.float32, shape=(total, EMBED_DIM))
+    if start: out[:start] = vecs
+    graphs = store.csr()
+    for lo in range(start, total, LIBRARY_CHUNK):
+        hi = min(lo + LIBRARY_CHUNK, total)
+        out[lo:hi] = encode_drugs(model, graphs.slice(lo, hi))
+    out.flush()
+    del out
+    os.replace(tmp, path)
+
+    # Purane model hashes / backends ki files hata do
+    for name in os.listdir(EMBEDDING_DIR):
+        if name.startswith("drug_vec_") and name != os.path.basename(path):
+            os.remove(os.path.join(EMBEDDING_DIR, name))
+    return np.load(path, mmap_mode='r')
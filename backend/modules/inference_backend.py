@@ -0,0 +1,142 @@
+# File: backend/modules/inference_backend.py
+
+import copy
+import time
+import numpy as np
+import torch
+import torch.nn as nn
+
+from modules.ai_model import DEVICE
+from modules.config import INFERENCE_BACKEND, PARITY_TOLERANCE
+from modules.chemistry import AMINO_DICT, featurize_smiles, encode_protein
+from modules.batching import GraphCSR, collate
+
+# Inference backends (BIOGRAPH_INFERENCE_BACKEND):
+#   eager   - model jaisa load hua
+#   fused   - BatchNorm preceding Conv1d / Linear mein fold (same math, kam ops)
+#   int8    - fused + Linear head ka int8 dynamic quantization
+#   compile - fused + torch.compile (pehli call par compile hota hai, startup slow)
+# Har backend eager model ke against parity check pass kare, warna eager hi serve hota hai.
+BACKENDS = ("eager", "fused", "int8", "compile")
+
+# Fixed validation set: chand known drugs + graph store ka evenly spaced sample, deterministic targets
+VALIDATION_SMILES = [
+    "CC(=O)Oc1ccccc1C(=O)O",                       # aspirin
+    "CN1C=NC2=C1C(=O)N(C(=O)N2C)C",                # caffeine
+    "CC(C)Cc1ccc(cc1)C(C)C(=O)O",                  # ibuprofen
+    "CC(=O)Nc1ccc(O)cc1",                          # paracetamol
+    "CN1CCC[C@H]1c1cccnc1",                        # nicotine
+    "Cc1ccc(cc1Nc1nccc(n1)-c1cccnc1)NC(=O)c1ccc(CN2CCN(C)CC2)cc1",  # imatinib
+    "COc1cc2ncnc(Nc3ccc(F)c(Cl)c3)c2cc1OCCCN1CCOCC1",               # gefitinib
+    "CS(=O)(=O)CCNCc1ccc(o1)-c1ccc2ncnc(Nc3ccc(OCc4cccc(F)c4)c(Cl)c3)c2c1",  # lapatinib
+    "OC(=O)CCCc1ccc(N(CCCl)CCCl)cc1",              # chlorambucil
+    "Cn1nnc2c(C(N)=O)ncn2c1=O",                    # temozolomide
+    "C[C@]12CC[C@H]3[C@@H](CCc4cc(O)ccc34)[C@@H]1CC[C@@H]2O",       # estradiol
+    "CN1C(=O)CN=C(c2ccccc2)c2cc(Cl)ccc21",         # diazepam
+]
+VALIDATION_STORE_SAMPLE = 256
+VALIDATION_TARGETS = 4
+VALIDATION_SEQ_LEN = 400
+
+def _fold_bn(layer, bn):
+    """Eval-mode BatchNorm ko preceding Conv1d / Linear ke weight aur bias mein merge karta hai."""
+    scale = bn.weight.detach() / torch.sqrt(bn.running_var + bn.eps)
+    shape = (-1,) + (1,) * (layer.weight.dim() - 1)
+    bias = layer.bias.detach() if layer.bias is not None else torch.zeros_like(bn.running_mean)
+    layer.weight = nn.Parameter(layer.weight.detach() * scale.view(shape))
+    layer.bias = nn.Parameter((bias - bn.running_mean) * scale + bn.bias.detach())
+
+def fold_batchnorm(model):
+    """Copy of the model with protein-tower and head BatchNorms folded (bn3 drug_vec ka hissa hai, wo rehta hai)."""
+    fused = copy.deepcopy(model)
+    for layer, bn in [("prot_conv1", "prot_bn1"), ("prot_conv2", "prot_bn2"), ("prot_conv3", "prot_bn3"),
+                      ("fc1", "fc_bn1"), ("fc2", "fc_bn2")]:
+        _fold_bn(getattr(fused, layer), getattr(fused, bn))
+        setattr(fused, bn, nn.Identity())
+    return fused.eval()
+
+def quantize_head(model):
+    # Sirf nn.Linear (fc1/fc2/out); GATConv ke andar PyG Linear hain, drug tower float hi rehta hai
+    return torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+
+def compile_model(model):
+    model.encode_drug = torch.compile(model.encode_drug, dynamic=True)
+    model.encode_protein = torch.compile(model.encode_protein, dynamic=True)
+    model.head = torch.compile(model.head, dynamic=True)
+    return model
+
+def build_backend(model, backend):
+    if backend == "eager": return model
+    candidate = fold_batchnorm(model)
+    if backend == "int8":
+        if DEVICE.type != "cpu": raise ValueError("int8 backend sirf CPU par")
+        candidate = quantize_head(candidate)
+    elif backend == "compile":
+        candidate = compile_model(candidate)
+    elif backend != "fused":
+        raise ValueError(f"Unknown inference backend '{backend}'. Options: {', '.join(BACKENDS)}")
+    return candidate
+
+def _validation_set():
+    from modules.graph_store import get_graph_store
+    graphs = [g for g in (featurize_smiles(s) for s in VALIDATION_SMILES) if g]
+    store = get_graph_store()
+    if len(store):
+        rows = np.unique(np.linspace(0, len(store) - 1, min(VALIDATION_STORE_SAMPLE, len(store))).astype(np.int64))
+        graphs += [store.get_graph(r) for r in rows]
+
+    # Deterministic synthetic targets (parity numeric hai, biology nahi)
+    rng = np.random.default_rng(0)
+    alphabet = np.array(list(AMINO_DICT))
+    proteins = torch.cat([encode_protein("".join(rng.choice(alphabet, VALIDATION_SEQ_LEN)))
+                          for _ in range(VALIDATION_TARGETS)])
+    return collate(GraphCSR.from_graphs(graphs)), proteins
+
+def _validation_scores(model, batch, proteins):
+    with torch.inference_mode():
+        batch = batch.to(DEVICE)
+        drug_vec = model.encode_drug(batch.x, batch.edge_index, batch.batch)
+        prot_vecs = model.encode_protein(proteins.to(DEVICE))
+        return torch.cat([model.head(drug_vec, prot_vecs[t:t + 1]) for t in range(len(prot_vecs))], dim=1).cpu()
+
+def parity_check(reference, candidate, tolerance=PARITY_TOLERANCE):
+    """Returns (passed, max |score drift|, reference seconds, candidate seconds) on the validation set."""
+    batch, proteins = _validation_set()
+    _validation_scores(reference, batch, proteins)
+    t0 = time.time()
+    expected = _validation_scores(reference, batch, proteins)
+    t1 = time.time()
+    _validation_scores(candidate, batch, proteins)  # warm-up (compile waghaira)
+    t2 = time.time()
+    actual = _validation_scores(candidate, batch, proteins)
+    t3 = time.time()
+    drift = float((expected - actual).abs().max())
+    return drift <= tolerance, drift, t1 - t0, t3 - t2
+
+def prepare_inference_model(model, backend=INFERENCE_BACKEND):
+    """
+    Load kiye gaye eager model se serving model banata hai. Backend parity check fail kare
+    (ya build hi na ho) to eager model wapas - scores kabhi silently drift nahi karte.
+    """
+    if model is not None and getattr(model, "backend", None) == backend:
+        return model  # Pehle se prepared (warm_up dobara chala)
+    if model is None or backend == "eager":
+        if model is not None: model.backend = "eager"
+        return model
+    try:
+        candidate = build_backend(model, backend)
+        passed, drift, ref_time, new_time = parity_check(model, candidate)
+    except Exception as e:
+        print(f"⚠️ Inference backend '{backend}' failed ({e}). Using eager model.")
+        model.backend = "eager"
+        return model
+
+    if not passed:
+        print(f"❌ Inference backend '{backend}' rejected: score drift {drift:.4f} > {PARITY_TOLERANCE}. Using eager model.")
+        model.backend = "eager"
+        return model
+
+    candidate.model_hash = model.model_hash
+    candidate.backend = backend
+    print(f"⚡ Inference backend '{backend}' active (drift {drift:.1e}, validation {ref_time:.3f}s -> {new_time:.3f}s).")
+    return candidate
@@ -0,0 +1,271 @@
+# File: backend/modules/ingest.py
+
+import os
+import sys
+import gzip
+import time
+import argparse
+import pandas as pd
+from rdkit import Chem, RDLogger
+
+from modules.config import INGEST_CHUNK
+from modules.featurizer import iter_chunk_results
+
+# Streaming library ingestion: SMILES / TSV / CSV / SDF (optionally .gz) -> drugs.db.
+#   read (stream, chunks) -> canonicalize + InChIKey (process pool) -> dedup (InChIKey index)
+#   -> batched insert (ek transaction per chunk) -> graph store / descriptors incremental refresh
+# Memory = chand chunks in-flight, file size se independent. Existing DB mein append hota hai.
+#
+#   python -m modules.ingest enamine_subset.smi.gz
+#   python -m modules.ingest zinc_tranche.sdf --chunk 5000
+
+FORMATS = ("smiles", "table", "sdf")
+SMILES_COLUMNS = ("smiles", "canonical_smiles", "smile")
+NAME_COLUMNS = ("pert_iname", "name", "idnumber", "zinc_id", "id", "compound_id", "catalog_id", "sample_id")
+
+def detect_format(path):
+    base = path[:-3] if path.endswith(".gz") else path
+    ext = os.path.splitext(base)[1].lower()
+    if ext in (".smi", ".smiles", ".ism", ".cxsmiles"): return "smiles"
+    if ext in (".sdf", ".sd", ".mol"): return "sdf"
+    if ext in (".tsv", ".txt", ".csv", ".tab"): return "table"
+    raise ValueError(f"Unknown library format '{ext}'. Use one of: .smi, .tsv/.txt/.csv, .sdf (optionally .gz)")
+
+def _open_text(path):
+    if path.endswith(".gz"): return gzip.open(path, "rt", encoding="latin1", errors="replace")
+    return open(path, "rt", encoding="latin1", errors="replace")
+
+def read_smiles_file(path):
+    """'SMILES name' per line (whitespace separated). Header / comments skip; name na ho to file:line."""
+    stem = os.path.basename(path).split(".")[0]
+    with _open_text(path) as f:
+        for lineno, line in enumerate(f, 1):
+            parts = line.split(None, 1)
+            if not parts or parts[0].startswith("#"): continue
+            if lineno == 1 and parts[0].lower() in SMILES_COLUMNS: continue
+            name = parts[1].strip() if len(parts) > 1 else ""
+            yield (name or f"{stem}:{lineno}", parts[0], "s")
+
+def _pick_column(columns, candidates):
+    lowered = {str(c).strip().lower(): c for c in columns}
+    for name in candidates:
+        if name in lowered: return lowered[name]
+    return None
+
+def read_table_file(path, chunk_size=INGEST_CHUNK):
+    """TSV / CSV (drugs.txt bhi) pandas chunks mein - poori file kabhi DataFrame mein nahi."""
+    base = path[:-3] if path.endswith(".gz") else path
+    sep = "," if base.lower().endswith(".csv") else "\t"
+    reader = pd.read_csv(path, sep=sep, comment='!', on_bad_lines='skip', encoding='latin1',
+                         dtype=str, chunksize=chunk_size)
+    stem = os.path.basename(path).split(".")[0]
+    offset = 0
+    for df in reader:
+        smiles_col = _pick_column(df.columns, SMILES_COLUMNS)
+        if smiles_col is None:
+            raise ValueError(f"No SMILES column in '{path}'. Columns: {list(df.columns)}")
+        name_col = _pick_column(df.columns, NAME_COLUMNS)
+        names = df[name_col] if name_col is not None else pd.Series([None] * len(df), index=df.index)
+        for i, (name, smi) in enumerate(zip(names, df[smiles_col]), offset):
+            if isinstance(smi, str) and smi.strip():
+                yield (name.strip() if isinstance(name, str) and name.strip() else f"{stem}:{i + 1}", smi.strip(), "s")
+        offset += len(df)
+
+def read_sdf_file(path):
+    """Raw mol blocks ('$$$$' tak) - parsing process pool mein hoti hai, yahan sirf text split."""
+    stem = os.path.basename(path).split(".")[0]
+    block, count = [], 0
+    with _open_text(path) as f:
+        for line in f:
+            if line.startswith("$$$$"):
+                count += 1
+                yield (f"{stem}:{count}", "".join(block), "b")
+                block = []
+            else:
+                block.append(line)
+    if any(l.strip() for l in block):
+        yield (f"{stem}:{count + 1}", "".join(block), "b")
+
+def read_records(path, fmt=None, chunk_size=INGEST_CHUNK):
+    fmt = fmt or detect_format(path)
+    if fmt == "smiles": return read_smiles_file(path)
+    if fmt == "table": return read_table_file(path, chunk_size)
+    if fmt == "sdf": return read_sdf_file(path)
+    raise ValueError(f"Unknown format '{fmt}'. Options: {', '.join(FORMATS)}")
+
+def _sdf_name(mol, fallback):
+    if mol.HasProp("_Name") and mol.GetProp("_Name").strip(): return mol.GetProp("_Name").strip()
+    for prop in ("idnumber", "zinc_id", "ID", "Name", "Catalog ID"):
+        if mol.HasProp(prop) and mol.GetProp(prop).strip(): return mol.GetProp(prop).strip()
+    return fallback
+
+def ingest_chunk(records):
+    """
+    Worker function (process pool): (name, SMILES ya mol block, kind) -> (rows, worker seconds).
+    Row = (name, smiles, canonical SMILES, InChIKey); invalid molecules None.
+    """
+    RDLogger.DisableLog("rdApp.*")
+    start = time.perf_counter()
+    rows = []
+    for name, text, kind in records:
+        try:
+            mol = Chem.MolFromSmiles(text) if kind == "s" else Chem.MolFromMolBlock(text)
+            if mol is None or mol.GetNumAtoms() == 0:
+                rows.append(None)
+                continue
+            canonical = Chem.MolToSmiles(mol)
+            inchikey = Chem.MolToInchiKey(mol)
+            if not inchikey:
+                rows.append(None)
+                continue
+            if kind == "b": name = _sdf_name(mol, name)
+            rows.append((name, text if kind == "s" else canonical, canonical, inchikey))
+        except Exception:
+            rows.append(None)
+    return rows, time.perf_counter() - start
+
+def inchikey_chunk(rows):
+    """Worker function: existing library rows (id, smiles) -> (InChIKey, id); invalid = '' (dobara try nahi)."""
+    RDLogger.DisableLog("rdApp.*")
+    out = []
+    for drug_id, smi in rows:
+        try:
+            mol = Chem.MolFromSmiles(smi) if smi else None
+            out.append(((Chem.MolToInchiKey(mol) or "") if mol else "", drug_id))
+        except Exception:
+            out.append(("", drug_id))
+    return out
+
+class StageStats:
+    """Per-stage records / seconds (throughput report)."""
+
+    def __init__(self):
+        self.stages = {}
+
+    def add(self, stage, records, seconds):
+        count, total = self.stages.get(stage, (0, 0.0))
+        self.stages[stage] = (count + records, total + seconds)
+
+    def report(self):
+        lines = []
+        for stage, (count, seconds) in self.stages.items():
+            rate = count / seconds if seconds > 0 else float("inf")
+            lines.append(f"   {stage:<14} {count:>10,} records  {seconds:8.2f}s  {rate:>12,.0f} rec/s")
+        return "\n".join(lines)
+
+    def as_dict(self):
+        return {stage: {"records": count, "seconds": round(seconds, 3),
+                        "records_per_sec": round(count / seconds, 1) if seconds > 0 else None}
+                for stage, (count, seconds) in self.stages.items()}
+
+def _timed(records, stats):
+    # Reader generator ka apna waqt (pool wait shamil nahi)
+    it = iter(records)
+    while True:
+        start = time.perf_counter()
+        try: item = next(it)
+        except StopIteration: return
+        stats.add("read", 1, time.perf_counter() - start)
+        yield item
+
+def _missing_inchikeys(conn, page_size):
+    after_id = 0
+    while True:
+        page = conn.execute("SELECT id, smiles FROM drugs WHERE inchikey IS NULL AND id > ? ORDER BY id LIMIT ?",
+                            (after_id, page_size)).fetchall()
+        if not page: return
+        yield from page
+        after_id = page[-1][0]
+
+def backfill_inchikeys(chunk_size=INGEST_CHUNK):
+    """Purani rows (inchikey NULL) ka InChIKey - dedup poori library ke against ho sake. Ek dafa chalta hai."""
+    from modules.database import get_connection
+    conn = get_connection()
+    if not conn.execute("SELECT 1 FROM drugs WHERE inchikey IS NULL LIMIT 1").fetchone(): return 0
+    print("⏳ Computing InChIKeys for existing drugs...")
+    done = 0
+    for _, keys in iter_chunk_results(inchikey_chunk, _missing_inchikeys(conn, chunk_size), chunk_size):
+        with conn:
+            conn.executemany("UPDATE drugs SET inchikey = ? WHERE id = ?", keys)
+        done += len(keys)
+    print(f"🔑 InChIKeys indexed for {done} drugs.")
+    return done
+
+def ingest_records(records, chunk_size=INGEST_CHUNK, refresh=True):
+    """
+    Records (name, text, kind) stream -> drugs.db. InChIKey par dedup (existing library + isi run
+    ke pichle chunks, dono DB index se - memory mein koi global seen-set nahi). Returns stats dict.
+    """
+    from modules.database import get_connection, ensure_name_index
+    ensure_name_index()
+    backfill_inchikeys(chunk_size)
+    conn = get_connection()
+    stats = StageStats()
+    counts = {"read": 0, "invalid": 0, "duplicates": 0, "inserted": 0}
+    start = time.perf_counter()
+
+    for chunk, (rows, worker_seconds) in iter_chunk_results(ingest_chunk, _timed(records, stats), chunk_size):
+        counts["read"] += len(chunk)
+        stats.add("canonicalize", len(chunk), worker_seconds)
+
+        t0 = time.perf_counter()
+        valid = [row for row in rows if row is not None]
+        counts["invalid"] += len(rows) - len(valid)
+        unique = {}
+        for row in valid:
+            unique.setdefault(row[3], row)  # chunk ke andar duplicate: pehla wala
+        keys = list(unique)
+        existing = set()
+        for lo in range(0, len(keys), 500):
+            part = keys[lo:lo + 500]
+            marks = ",".join("?" * len(part))
+            existing.update(r[0] for r in conn.execute(f"SELECT inchikey FROM drugs WHERE inchikey IN ({marks})", part))
+        fresh = [row for key, row in unique.items() if key not in existing]
+        counts["duplicates"] += len(valid) - len(fresh)
+        stats.add("dedup", len(valid), time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        with conn:  # ✅ ek transaction per chunk
+            conn.executemany("INSERT INTO drugs (name, smiles, canonical_smiles, inchikey) VALUES (?, ?, ?, ?)", fresh)
+        counts["inserted"] += len(fresh)
+        stats.add("write", len(fresh), time.perf_counter() - t0)
+
+        if counts["read"] % (chunk_size * 10) < chunk_size:
+            print(f"   ... {counts['read']:,} read, {counts['inserted']:,} new, {counts['duplicates']:,} duplicates")
+
+    if refresh and counts["inserted"]:
+        from modules.database import refresh_library_cache, refresh_descriptor_table, prerender_depictions
+        # ✅ Sirf naye molecules featurize / descriptor compute hote hain (incremental)
+        t0 = time.perf_counter()
+        refresh_library_cache()
+        stats.add("featurize", counts["inserted"], time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        refresh_descriptor_table()
+        stats.add("descriptors", counts["inserted"], time.perf_counter() - t0)
+        prerender_depictions()
+
+    elapsed = time.perf_counter() - start
+    print(f"🎉 Ingest done in {elapsed:.1f}s: {counts['inserted']:,} new, {counts['duplicates']:,} duplicates, "
+          f"{counts['invalid']:,} invalid (of {counts['read']:,}).")
+    print(stats.report())
+    return {**counts, "seconds": round(elapsed, 2), "stages": stats.as_dict()}
+
+def ingest_file(path, fmt=None, chunk_size=INGEST_CHUNK, refresh=True):
+    """SMILES / TSV / CSV / SDF file (ya .gz) ko existing drugs.db mein append karta hai."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Library file not found: {path}")
+    print(f"📂 Ingesting '{os.path.basename(path)}' ({fmt or detect_format(path)})...")
+    return ingest_records(read_records(path, fmt, chunk_size), chunk_size, refresh)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream a compound library into drugs.db (dedup by InChIKey).")
+    parser.add_argument("paths", nargs="+", help=".smi / .tsv / .txt / .csv / .sdf files, optionally .gz")
+    parser.add_argument("--format", choices=FORMATS, default=None)
+    parser.add_argument("--chunk", type=int, default=INGEST_CHUNK, help="records per chunk / transaction")
+    parser.add_argument("--no-refresh", action="store_true", help="graph store / descriptor refresh baad mein")
+    args = parser.parse_args(argv)
+    for path in args.paths:
+        ingest_file(path, args.format, args.chunk, refresh=not args.no_refresh)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+# File: backend/modules/jobs.py
+
+import time
+import uuid
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.config import SCAN_WORKERS, INTERACTIVE_WORKERS, MAX_PENDING_JOBS, JOB_RETENTION
+
+# Chhote single-molecule kaam: library / upload scans ke peeche queue nahi hote, MAX_PENDING_JOBS mein nahi gine jate
+INTERACTIVE_KINDS = {"manual", "similar", "substructure"}
+
+STREAM_END = object()
+
+class JobCancelled(Exception):
+    pass
+
+class JobQueueFull(Exception):
+    pass
+
+class Job:
+    """
+    Ek scan ka apna progress / cancel flag / result (pehle ye sab ek global SCAN_PROGRESS dict mein tha).
+    Scan code job.update(...) se progress report karta hai aur job.check_cancelled() se cancel dekhta hai.
+    """
+
+    def __init__(self, kind):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.state = "queued"     # queued | running | done | failed | cancelled
+        self.status = "Queued..."   # human-readable stage (progress bar text)
+        self.current = 0
+        self.total = 1
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.future = None
+        self.stream = None
+        self._cancel = threading.Event()
+
+    def open_stream(self, maxsize=64):
+        """Partial results ke liye bounded queue; consumer slow ho to producer ruk jata hai."""
+        self.stream = queue.Queue(maxsize=maxsize)
+
+    def emit(self, item):
+        if self.stream is None: return
+        while not self._cancel.is_set():
+            try:
+                self.stream.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def update(self, current=None, total=None, status=None):
+        if total is not None: self.total = total
+        if current is not None: self.current = current
+        if status is not None: self.status = status
+
+    def cancel(self):
+        self._cancel.set()
+        if self.future and self.future.cancel():
+            self._finish("cancelled")
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    @property
+    def finished(self):
+        return self.state in ("done", "failed", "cancelled")
+
+    def _finish(self, state, result=None, error=None):
+        self.state = state
+        self.result = result
+        self.error = error
+        self.status = {"done": "Done", "failed": "Failed", "cancelled": "Cancelled"}[state]
+        self.finished_at = time.time()
+        self.emit(STREAM_END)
+
+    def progress(self):
+        perc = int((self.current / self.total) * 100) if self.total else 0
+        if self.state == "done": perc = 100
+        return {"job_id": self.id, "kind": self.kind, "state": self.state,
+                "progress": min(perc, 100), "status": self.status, "error": self.error}
+
+class JobManager:
+    """
+    Bounded thread pool for scans + job registry with time-based retention. Interactive kinds
+    (INTERACTIVE_KINDS) ka alag pool, taake lambi auto / upload scans unhein block na karein.
+    """
+
+    def __init__(self, max_workers=SCAN_WORKERS, max_pending=MAX_PENDING_JOBS, retention=JOB_RETENTION,
+                 interactive_workers=INTERACTIVE_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scan")
+        self.interactive = ThreadPoolExecutor(max_workers=interactive_workers, thread_name_prefix="interactive")
+        self.max_pending = max_pending
+        self.retention = retention
+        self.jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind, fn, *args, stream=False, **kwargs):
+        """
+        fn(job, *args, **kwargs) background mein chalta hai; return value job.result banta hai.
+        stream=True par job.stream queue khulti hai (job.emit() wale partial results).
+        """
+        self._cleanup()
+        interactive = kind in INTERACTIVE_KINDS
+        with self._lock:
+            if not interactive:
+                pending = sum(1 for j in self.jobs.values() if not j.finished and j.kind not in INTERACTIVE_KINDS)
+                if pending >= self.max_pending:
+                    raise JobQueueFull(f"Too many scans in progress ({pending}). Please retry shortly.")
+            job = Job(kind)
+            if stream: job.open_stream()
+            self.jobs[job.id] = job
+        executor = self.interactive if interactive else self.executor
+        job.future = executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job, fn, args, kwargs):
+        if job.cancelled:
+            job._finish("cancelled")
+            return None
+        job.state = "running"
+        try:
+            job._finish("done", result=fn(job, *args, **kwargs))
+        except JobCancelled:
+            job._finish("cancelled")
+        except Exception as e:
+            print(f"❌ Job {job.kind} Error: {e}")
+            job._finish("failed", error=str(e))
+        return job.result
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.jobs.get(job_id)
+        if job: job.cancel()
+        return job
+
+    def _cleanup(self):
+        now = time.time()
+        with self._lock:
+            expired = [jid for jid, j in self.jobs.items()
+                       if j.finished and now - j.finished_at > self.retention]
+            for jid in expired:
+                del self.jobs[jid]
+
+job_manager = JobManager()
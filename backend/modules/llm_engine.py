@@ -1,33 +1,264 @@
 import os
 import json
-from groq import Groq
+import time
+import queue
+import sqlite3
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+import httpx
+from groq import AsyncGroq
+
+from modules.config import (LLM_MODEL, LLM_BASE_URL, LLM_CONCURRENCY, LLM_TIMEOUT,
+                            LLM_MAX_CONNECTIONS, LLM_CACHE_PATH, LLM_CACHE_TTL)
+
+OFFLINE_MESSAGE = "⚠️ AI Core is offline. Please check API configuration."
+OVERLOAD_MESSAGE = "⚠️ System Overload: AI is temporarily unavailable. Please retry in a moment."
+MEMORY_CACHE_SIZE = 256
+
+class GroqBackend:
+    """
+    Async Groq chat completions over one pooled HTTP client. base_url (BIOGRAPH_LLM_BASE_URL)
+    kisi bhi OpenAI/Groq-compatible server ki taraf point kar sakta hai, e.g. tests ka local stub.
+    Backend interface: async complete(system, prompt, temperature, max_tokens) -> str,
+    async stream(...) -> async iterator of text deltas, async close().
+    """
+
+    def __init__(self, api_key, model_id, base_url=None):
+        self.model_id = model_id
+        self.http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_CONNECTIONS),
+            timeout=httpx.Timeout(LLM_TIMEOUT, connect=10.0),
+        )
+        self.client = AsyncGroq(api_key=api_key, base_url=base_url, http_client=self.http, max_retries=1)
+
+    async def complete(self, system, prompt, temperature, max_tokens):
+        completion = await self.client.chat.completions.create(
+            model=self.model_id,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        return completion.choices[0].message.content
+
+    async def stream(self, system, prompt, temperature, max_tokens):
+        """Async iterator of text deltas (tokens) jaise hi server bhejta hai."""
+        chunks = await self.client.chat.completions.create(
+            model=self.model_id,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True
+        )
+        async for chunk in chunks:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    async def close(self):
+        await self.http.aclose()
+
+class JSONSectionParser:
+    """
+    Incremental parser for the top-level JSON object analyze_drug maangta hai. Text chunks feed()
+    karo; har key ki value poori hote hi (key, value) milta hai - poora JSON aane ka intezar nahi.
+    Markdown fences / leading text '{' tak ignore hote hain.
+    """
+
+    def __init__(self):
+        self.state = "seek"
+        self.buf = []
+        self.key = None
+        self.escape = False
+        self.depth = 0
+        self.in_string = False
+
+    def feed(self, text):
+        sections = []
+        for ch in text:
+            section = self._step(ch)
+            if section: sections.append(section)
+        return sections
+
+    def _step(self, ch):
+        st = self.state
+        if st == "seek":
+            if ch == "{": self.state = "key_or_end"
+        elif st in ("key_or_end", "after_value"):
+            if ch == '"' and st == "key_or_end":
+                self.state, self.buf = "key", []
+            elif ch == ",":
+                self.state = "key_or_end"
+            elif ch == "}":
+                self.state = "done"
+        elif st in ("key", "string_value"):
+            if self.escape:
+                self.escape = False
+                self.buf.append(ch)
+            elif ch == "\\":
+                self.escape = True
+                self.buf.append(ch)
+            elif ch == '"':
+                raw = json.loads('"' + "".join(self.buf) + '"')
+                if st == "key":
+                    self.key, self.state = raw, "colon"
+                else:
+                    self.state = "after_value"
+                    return self.key, raw
+            else:
+                self.buf.append(ch)
+        elif st == "colon":
+            if ch == ":": self.state = "value_start"
+        elif st == "value_start":
+            if ch == '"':
+                self.state, self.buf = "string_value", []
+            elif not ch.isspace():
+                self.state, self.buf, self.depth, self.in_string = "other_value", [ch], int(ch in "{["), False
+        elif st == "other_value":
+            # Numbers / nested objects: top-level ',' ya '}' par value khatam
+            if self.in_string:
+                if self.escape: self.escape = False
+                elif ch == "\\": self.escape = True
+                elif ch == '"': self.in_string = False
+            elif ch == '"': self.in_string = True
+            elif ch in "{[": self.depth += 1
+            elif ch in "}]" and self.depth: self.depth -= 1
+            elif ch in ",}" and not self.depth:
+                raw = "".join(self.buf).strip()
+                self.state = "key_or_end" if ch == "," else "done"
+                try: return self.key, json.loads(raw)
+                except ValueError: return self.key, raw
+            self.buf.append(ch)
+        return None
 
 class LLMEngine:
     def __init__(self):
         # ✅ Groq API Key
         self.api_key = os.getenv("GROQ_API_KEY")
-        self.client = None
-        
+        self.backend = None
+
         # ✅ Latest Llama 3.3 model for high performance
-        self.active_model_id = "llama-3.3-70b-versatile" 
-        
-        if self.api_key:
-            try:
-                self.client = Groq(api_key=self.api_key)
+        self.active_model_id = LLM_MODEL
+
+        # Saari LLM calls ek dedicated event loop thread par (ek pooled client, uvicorn loop kabhi block nahi)
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        self._semaphore = None
+        self._memory = OrderedDict()
+        self._memory_lock = threading.Lock()
+        self._started = False
+        # Backend (HTTP client) yahan nahi: llm_bot import par banta hai aur spawn workers bhi ye module import karte hain
+
+    def start(self):
+        """Backend banao (startup par / pehli call par). Dobara call ya set_backend ke baad no-op."""
+        with self._loop_lock:
+            if self._started: return
+            self._started = True
+            if self.api_key or LLM_BASE_URL:
+                # Local stub server ko real key ki zaroorat nahi
+                self.backend = GroqBackend(self.api_key or "stub", self.active_model_id, LLM_BASE_URL)
                 print(f"🚀 BioGraph Intelligence v3 (Llama-3) Activated")
-            except Exception as e:
-                print(f"⚠️ Groq Connection Error: {e}")
-        else:
-            print("⚠️ ERROR: GROQ_API_KEY is missing in .env file.")
+            else:
+                print("⚠️ ERROR: GROQ_API_KEY is missing in .env file.")
+
+    def set_backend(self, backend):
+        """Pluggable backend (koi bhi object jiska async complete(...) ho) - tests / local models."""
+        self._started = True
+        self.backend = backend
+        with self._memory_lock:
+            self._memory.clear()
+
+    # --- Event loop plumbing ---
+    def _get_loop(self):
+        self.start()
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="llm-engine", daemon=True).start()
+                self._semaphore = asyncio.Semaphore(LLM_CONCURRENCY)
+                self._loop = loop
+            return self._loop
+
+    def _submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._get_loop())
 
-    def _get_response(self, prompt, system_instruction=None):
-        if not self.client:
-            return "⚠️ AI Core is offline. Please check API configuration."
+    def run(self, coro):
+        """Sync callers (scan job threads) ke liye: engine loop par chala ke result ka wait."""
+        return self._submit(coro).result()
 
+    async def run_async(self, coro):
+        """Async routes ke liye: engine loop par chalao, caller ka loop free rehta hai."""
+        return await asyncio.wrap_future(self._submit(coro))
+
+    def spawn(self, coro):
+        """Fire-and-forget: engine loop par background task, concurrent.futures.Future return."""
+        return self._submit(coro)
+
+    # --- Response cache (content hash -> text), memory LRU + SQLite ---
+    def _cache_key(self, system_msg, prompt):
+        payload = json.dumps([self.active_model_id, system_msg, prompt])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _connect_cache(self):
+        os.makedirs(os.path.dirname(LLM_CACHE_PATH), exist_ok=True)
+        conn = sqlite3.connect(LLM_CACHE_PATH)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                content_hash TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        ''')
+        return conn
+
+    def _cache_get(self, key):
+        with self._memory_lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+        try:
+            conn = self._connect_cache()
+            try:
+                row = conn.execute("SELECT response, created_at FROM responses WHERE content_hash = ?", (key,)).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return None
+        if row and time.time() - row[1] < LLM_CACHE_TTL:
+            self._cache_remember(key, row[0])
+            return row[0]
+        return None
+
+    def _cache_put(self, key, response):
+        self._cache_remember(key, response)
+        try:
+            conn = self._connect_cache()
+            try:
+                with conn:
+                    conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?)", (key, response, time.time()))
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"⚠️ LLM Cache Error: {e}")
+
+    def _cache_remember(self, key, response):
+        with self._memory_lock:
+            self._memory[key] = response
+            self._memory.move_to_end(key)
+            while len(self._memory) > MEMORY_CACHE_SIZE:
+                self._memory.popitem(last=False)
+
+    def _system_message(self, system_instruction=None):
         # ✅ Global System Instruction (Optimized for Visualization References)
         base_instruction = """
         ROLE: You are 'BioGraph AI', a world-class medicinal chemist and research assistant.
-        
+
         STYLE:
         - Use professional, yet engaging language.
         - Use Emojis (🧪, 🧬, 💊, 🔬, 📊) to highlight points.
@@ -36,32 +267,101 @@ class LLMEngine:
             - 'Check the ADMET Radar Chart for toxicity details.'
             - 'Look at the 3D Structure Viewer to see binding poses.'
             - 'The BioGraph Score (shown on the gauge) indicates high potential.'
-        
+
         LANGUAGE:
         - If the user asks in Roman Urdu/Hindi, reply in Roman Urdu with a scientific touch.
         """
-        
-        system_msg = system_instruction if system_instruction else base_instruction
+        return system_instruction if system_instruction else base_instruction
+
+    async def _get_response(self, prompt, system_instruction=None, cache=False):
+        if not self.backend:
+            return OFFLINE_MESSAGE
+
+        system_msg = self._system_message(system_instruction)
+        key = self._cache_key(system_msg, prompt) if cache else None
+        if key:
+            cached = self._cache_get(key)
+            if cached is not None: return cached
 
         try:
-            completion = self.client.chat.completions.create(
-                model=self.active_model_id,
-                messages=[
-                    {"role": "system", "content": system_msg},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.6, # Thora precise rakhne ke liye
-                max_tokens=2500
-            )
-            return completion.choices[0].message.content
+            # ✅ Concurrency limit + per-request timeout (ek slow completion baqi sab ko nahi rokti)
+            async with self._semaphore:
+                response = await asyncio.wait_for(
+                    self.backend.complete(system_msg, prompt, temperature=0.6, max_tokens=2500),  # Thora precise rakhne ke liye
+                    timeout=LLM_TIMEOUT)
+        except asyncio.TimeoutError:
+            print(f"❌ AI Error: timed out after {LLM_TIMEOUT}s")
+            return OVERLOAD_MESSAGE
         except Exception as e:
             print(f"❌ AI Error: {e}")
-            return "⚠️ System Overload: AI is temporarily unavailable. Please retry in a moment."
+            return OVERLOAD_MESSAGE
 
-    def analyze_drug(self, drug_data, target_id):
+        if key and response: self._cache_put(key, response)
+        return response
+
+    async def _stream_response(self, prompt, system_instruction=None, cache=False):
         """
-        🔬 Scientific Deep-Dive Analysis
+        Token stream (async generator of text deltas). Cache hit par poora text ek chunk mein.
+        Timeout har agle token ke intezar par lagta hai; error par overload message aata hai.
         """
+        if not self.backend:
+            yield OFFLINE_MESSAGE
+            return
+
+        system_msg = self._system_message(system_instruction)
+        key = self._cache_key(system_msg, prompt) if cache else None
+        if key:
+            cached = self._cache_get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        parts = []
+        async with self._semaphore:
+            try:
+                tokens = self.backend.stream(system_msg, prompt, temperature=0.6, max_tokens=2500).__aiter__()
+                while True:
+                    try: token = await asyncio.wait_for(tokens.__anext__(), timeout=LLM_TIMEOUT)
+                    except StopAsyncIteration: break
+                    parts.append(token)
+                    yield token
+            except asyncio.TimeoutError:
+                print(f"❌ AI Error: stream stalled for {LLM_TIMEOUT}s")
+                if not parts: yield OVERLOAD_MESSAGE
+                return
+            except Exception as e:
+                print(f"❌ AI Error: {e}")
+                if not parts: yield OVERLOAD_MESSAGE
+                return
+
+        if key and parts: self._cache_put(key, "".join(parts))
+
+    def iter_stream(self, agen):
+        """
+        Engine loop par chalne wale async generator ko sync iterator banata hai (StreamingResponse
+        isay threadpool mein chalata hai, job threads seedha). Consumer ruk jaye to producer cancel.
+        """
+        items = queue.Queue()
+        done = object()
+
+        async def pump():
+            try:
+                async for item in agen:
+                    items.put(item)
+            finally:
+                items.put(done)
+
+        future = self._submit(pump())
+        try:
+            while True:
+                item = items.get()
+                if item is done: break
+                yield item
+        finally:
+            future.cancel()
+
+    # --- Prompts ---
+    def _analysis_prompt(self, drug_data, target_id):
         context = f"""
         ANALYZE THIS CANDIDATE:
         - Molecule: {drug_data.get('name')}
@@ -70,7 +370,7 @@ class LLMEngine:
         - BioGraph Score: {drug_data.get('score')}
         - ADMET Data: {json.dumps(drug_data.get('admet', {}))}
         """
-        
+
         task = """
         Provide a detailed scientific verdict in JSON format.
         Structure:
@@ -83,9 +383,9 @@ class LLMEngine:
         }
         RETURN ONLY VALID JSON.
         """
-        
-        response_text = self._get_response(context, task)
-        
+        return context, task
+
+    def _parse_analysis(self, response_text):
         try:
             # Cleaning Llama's markdown wrappers if any
             cleaned_text = response_text.replace("```json", "").replace("```", "").strip()
@@ -99,20 +399,65 @@ class LLMEngine:
                 "conclusion": "Parsing Error"
             }
 
-    def chat_with_drug(self, user_query, context_data):
-        """
-        🤖 Context-Aware Interactive Chat
-        """
-        context = f"""
+    def _chat_prompt(self, user_query, context_data):
+        return f"""
         CURRENT MOLECULE CONTEXT:
         Name: {context_data.get('name')}
         SMILES: {context_data.get('smiles')}
         Score: {context_data.get('score')}
         ADMET: {context_data.get('admet')}
-        
+
         USER QUESTION: "{user_query}"
         """
-        return self._get_response(context)
+
+    async def analyze_drug_async(self, drug_data, target_id):
+        """
+        🔬 Scientific Deep-Dive Analysis
+        """
+        # Prompt deterministic hai (same molecule + target + score + ADMET) -> content-hash cache
+        context, task = self._analysis_prompt(drug_data, target_id)
+        return self._parse_analysis(await self._get_response(context, task, cache=True))
+
+    async def analyze_drug_stream_async(self, drug_data, target_id):
+        """
+        Streaming analysis events: {"type": "token"}, har JSON section poora hote hi
+        {"type": "section", "key", "value"}, aakhir mein {"type": "explanation", "ai_explanation"}.
+        """
+        context, task = self._analysis_prompt(drug_data, target_id)
+        parser, parts = JSONSectionParser(), []
+        async for token in self._stream_response(context, task, cache=True):
+            parts.append(token)
+            yield {"type": "token", "text": token}
+            for key, value in parser.feed(token):
+                yield {"type": "section", "key": key, "value": value}
+        yield {"type": "explanation", "ai_explanation": self._parse_analysis("".join(parts))}
+
+    async def chat_with_drug_async(self, user_query, context_data):
+        """
+        🤖 Context-Aware Interactive Chat
+        """
+        return await self._get_response(self._chat_prompt(user_query, context_data))
+
+    async def chat_with_drug_stream_async(self, user_query, context_data):
+        """Streaming chat events: {"type": "token", "text"} ... {"type": "done", "answer"}."""
+        parts = []
+        async for token in self._stream_response(self._chat_prompt(user_query, context_data)):
+            parts.append(token)
+            yield {"type": "token", "text": token}
+        yield {"type": "done", "answer": "".join(parts)}
+
+    # --- Sync wrappers (scan jobs worker threads mein chalte hain) ---
+    def analyze_drug(self, drug_data, target_id):
+        return self.run(self.analyze_drug_async(drug_data, target_id))
+
+    def analyze_drug_stream(self, drug_data, target_id):
+        return self.iter_stream(self.analyze_drug_stream_async(drug_data, target_id))
+
+    def chat_with_drug(self, user_query, context_data):
+        return self.run(self.chat_with_drug_async(user_query, context_data))
+
+    def chat_with_drug_stream(self, user_query, context_data):
+        return self.iter_stream(self.chat_with_drug_stream_async(user_query, context_data))
 
 # Initialize global bot
-llm_bot = LLMEngine()
\ No newline at end of file
+llm_bot = LLMEngine()
@@ -0,0 +1,157 @@
+# File: backend/modules/protein_store.py
+
+import os
+import sys
+import gzip
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from modules.config import OFFLINE_MODE, PROTEIN_DB_PATH, PROTEIN_CACHE_TTL, PROTEIN_MISS_TTL
+
+MEMORY_CACHE_SIZE = 1024
+IMPORT_BATCH = 5000
+
+_memory = OrderedDict()
+_memory_lock = threading.Lock()
+
+def _connect():
+    os.makedirs(os.path.dirname(PROTEIN_DB_PATH), exist_ok=True)
+    conn = sqlite3.connect(PROTEIN_DB_PATH)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS sequences (
+            pdb_id TEXT PRIMARY KEY,
+            sequence TEXT NOT NULL,
+            source TEXT NOT NULL,
+            fetched_at REAL NOT NULL
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS misses (
+            pdb_id TEXT PRIMARY KEY,
+            checked_at REAL NOT NULL
+        )
+    ''')
+    return conn
+
+def _remember(pdb_id, sequence):
+    with _memory_lock:
+        _memory[pdb_id] = sequence
+        _memory.move_to_end(pdb_id)
+        while len(_memory) > MEMORY_CACHE_SIZE:
+            _memory.popitem(last=False)
+
+def get_sequence(pdb_id, fetch):
+    """
+    Read-through lookup: memory -> sequences.db -> fetch(pdb_id) (PDBe).
+    - 'seqres' rows (bulk import) kabhi expire nahi hote, network rows TTL ke baad refresh hote hain.
+    - Not-found IDs negative-cache hote hain (PROTEIN_MISS_TTL tak dobara network call nahi).
+    - OFFLINE_MODE mein network kabhi nahi, stale rows bhi serve hoti hain.
+    fetch() ko not-found par None return karna hai aur network failure par raise.
+    """
+    pdb_id = pdb_id.lower().strip()
+    if not pdb_id: return None
+    with _memory_lock:
+        if pdb_id in _memory:
+            _memory.move_to_end(pdb_id)
+            return _memory[pdb_id]
+
+    now = time.time()
+    conn = _connect()
+    try:
+        row = conn.execute("SELECT sequence, source, fetched_at FROM sequences WHERE pdb_id = ?", (pdb_id,)).fetchone()
+        stale = None
+        if row:
+            sequence, source, fetched_at = row
+            if source == "seqres" or OFFLINE_MODE or now - fetched_at < PROTEIN_CACHE_TTL:
+                _remember(pdb_id, sequence)
+                return sequence
+            stale = sequence
+
+        if OFFLINE_MODE:
+            return None
+
+        miss = conn.execute("SELECT checked_at FROM misses WHERE pdb_id = ?", (pdb_id,)).fetchone()
+        if miss and now - miss[0] < PROTEIN_MISS_TTL:
+            return None
+
+        try:
+            sequence = fetch(pdb_id)
+        except Exception as e:
+            print(f"⚠️ Protein Fetch Error ({pdb_id}): {e}")
+            # Network down: purana sequence behtar hai kuch na hone se
+            if stale: _remember(pdb_id, stale)
+            return stale
+
+        with conn:
+            if sequence:
+                conn.execute("INSERT OR REPLACE INTO sequences VALUES (?, ?, 'pdbe', ?)", (pdb_id, sequence, now))
+                conn.execute("DELETE FROM misses WHERE pdb_id = ?", (pdb_id,))
+            else:
+                conn.execute("INSERT OR REPLACE INTO misses VALUES (?, ?)", (pdb_id, now))
+        if sequence: _remember(pdb_id, sequence)
+        return sequence
+    finally:
+        conn.close()
+
+def _read_seqres(path):
+    """
+    Parses RCSB pdb_seqres.txt(.gz): '>101m_A mol:protein length:154  MYOGLOBIN'.
+    Har PDB entry ka pehla protein chain yield karta hai (PDBe API bhi pehli molecule deta hai).
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    seen = set()
+    header, chunks = None, []
+    with opener(path, "rt") as f:
+        for line in f:
+            line = line.strip()
+            if not line: continue
+            if line.startswith(">"):
+                if header: yield header, "".join(chunks)
+                header, chunks = None, []
+                fields = line[1:].split()
+                pdb_id = fields[0].split("_")[0].lower()
+                is_protein = len(fields) < 2 or fields[1] == "mol:protein"
+                if is_protein and pdb_id not in seen:
+                    seen.add(pdb_id)
+                    header = pdb_id
+            elif header:
+                chunks.append(line)
+        if header: yield header, "".join(chunks)
+
+def import_seqres_fasta(path):
+    """Bulk import of a PDB seqres FASTA dump into the indexed sequence store."""
+    print(f"📂 Importing protein sequences from '{path}'...")
+    conn = _connect()
+    now = time.time()
+    total = 0
+    batch = []
+    try:
+        for pdb_id, sequence in _read_seqres(path):
+            batch.append((pdb_id, sequence, now))
+            if len(batch) >= IMPORT_BATCH:
+                with conn:
+                    conn.executemany("INSERT OR REPLACE INTO sequences VALUES (?, ?, 'seqres', ?)", batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO sequences VALUES (?, ?, 'seqres', ?)", batch)
+            total += len(batch)
+        # Import ke baad purane negative entries ka koi matlab nahi
+        with conn:
+            conn.execute("DELETE FROM misses")
+    finally:
+        conn.close()
+
+    with _memory_lock:
+        _memory.clear()
+    print(f"🎉 Protein store ready: {total} sequences imported.")
+    return total
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python -m modules.protein_store pdb_seqres.txt[.gz]")
+        sys.exit(1)
+    import_seqres_fasta(sys.argv[1])
@@ -0,0 +1,211 @@
+# File: backend/modules/rendering.py
+
+import os
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from functools import partial
+
+import rdkit
+from rdkit import Chem
+from rdkit.Chem import Draw
+
+from modules.config import RENDER_CACHE_PATH, RENDER_MEMORY_ITEMS, RENDER_DISK_ITEMS
+from modules.chemistry import get_smiles_from_input
+from modules.featurizer import iter_chunk_results
+
+# Molecule depictions: key = (canonical SMILES, render options, RDKit version).
+# Memory LRU -> SQLite (cache/depictions.db, least-recently-used eviction) -> RDKit draw.
+# Wahi key ETag bhi hai, is liye browser revalidation (304) par kuch render nahi hota.
+
+DEFAULT_SIZE = 400
+MIN_SIZE, MAX_SIZE = 64, 1200
+
+def render_options(width=DEFAULT_SIZE, height=None):
+    """(width, height) clamped; height na do to square."""
+    width = max(MIN_SIZE, min(MAX_SIZE, int(width or DEFAULT_SIZE)))
+    height = max(MIN_SIZE, min(MAX_SIZE, int(height or width)))
+    return width, height
+
+def render_key(canonical, options):
+    # RDKit version bhi key mein - upgrade ke baad drawing badal sakti hai
+    payload = f"{rdkit.__version__}|{options[0]}x{options[1]}|{canonical}"
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+def draw_svg(mol, options):
+    drawer = Draw.MolDraw2DSVG(*options)
+    opts = drawer.drawOptions()
+    opts.setBackgroundColour((0,0,0,0))
+    drawer.DrawMolecule(mol)
+    drawer.FinishDrawing()
+    return drawer.GetDrawingText()
+
+def render_chunk(canonical_list, options=(DEFAULT_SIZE, DEFAULT_SIZE)):
+    """Worker function (process pool): canonical SMILES list -> SVG list (None jahan draw na ho)."""
+    out = []
+    for smi in canonical_list:
+        try:
+            mol = Chem.MolFromSmiles(smi)
+            out.append(draw_svg(mol, options) if mol else None)
+        except Exception:
+            out.append(None)
+    return out
+
+def canonicalize_input(input_str):
+    """SMILES ya drug name -> canonical SMILES (None agar structure na mile)."""
+    _, mol = get_smiles_from_input(input_str)
+    return Chem.MolToSmiles(mol) if mol else None
+
+class DepictionCache:
+    def __init__(self, path=RENDER_CACHE_PATH, memory_items=RENDER_MEMORY_ITEMS, disk_items=RENDER_DISK_ITEMS):
+        self.path = path
+        self.memory_items = memory_items
+        self.disk_items = disk_items
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS depictions (
+                render_key TEXT PRIMARY KEY,
+                svg TEXT NOT NULL,
+                rendered_at REAL NOT NULL  -- aakhri dafa use hui (render ya disk hit), eviction isi order mein
+            )
+        ''')
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_depictions_age ON depictions(rendered_at)")
+        return conn
+
+    def _remember(self, key, svg):
+        with self._lock:
+            self._memory[key] = svg
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def get_many(self, keys):
+        """render key -> SVG (sirf jo cache mein hain)."""
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+        missing = [k for k in dict.fromkeys(keys) if k not in found]
+        if not missing: return found
+        try:
+            conn = self._connect()
+            try:
+                now = time.time()
+                for lo in range(0, len(missing), 500):
+                    chunk = missing[lo:lo + 500]
+                    marks = ",".join("?" * len(chunk))
+                    hits = conn.execute(f"SELECT render_key, svg FROM depictions WHERE render_key IN ({marks})", chunk).fetchall()
+                    for key, svg in hits:
+                        found[key] = svg
+                        self._remember(key, svg)
+                    if hits:
+                        # LRU: disk hit ka waqt update, warna eviction sirf insert order (FIFO) dekhti
+                        with conn:
+                            conn.execute(f"UPDATE depictions SET rendered_at = ? WHERE render_key IN ({','.join('?' * len(hits))})",
+                                         [now, *(key for key, _ in hits)])
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"⚠️ Depiction cache read failed: {e}")
+        return found
+
+    def put_many(self, depictions, remember=True):
+        """depictions: {render key: SVG}. Disk limit se upar purani depictions evict."""
+        if not depictions: return
+        if remember:
+            for key, svg in depictions.items(): self._remember(key, svg)
+        now = time.time()
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany("INSERT OR REPLACE INTO depictions VALUES (?, ?, ?)",
+                                     [(key, svg, now) for key, svg in depictions.items()])
+                    excess = conn.execute("SELECT COUNT(*) FROM depictions").fetchone()[0] - self.disk_items
+                    if excess > 0:
+                        conn.execute('''DELETE FROM depictions WHERE render_key IN
+                                        (SELECT render_key FROM depictions ORDER BY rendered_at LIMIT ?)''', (excess,))
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"⚠️ Depiction cache write failed: {e}")
+
+    def missing(self, keys):
+        """render keys jo disk cache mein nahi - 500 keys per indexed query (SVG load nahi hote)."""
+        keys = list(dict.fromkeys(keys))
+        missing = set(keys)
+        try:
+            conn = self._connect()
+            try:
+                for lo in range(0, len(keys), 500):
+                    chunk = keys[lo:lo + 500]
+                    marks = ",".join("?" * len(chunk))
+                    missing.difference_update(row[0] for row in conn.execute(
+                        f"SELECT render_key FROM depictions WHERE render_key IN ({marks})", chunk))
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"⚠️ Depiction cache read failed: {e}")
+        return missing
+
+depiction_cache = DepictionCache()
+
+def depict(canonical_list, options):
+    """
+    canonical SMILES list -> {canonical: (render key, SVG ya None)}. Cache misses ek sath render
+    hote hain (bare batches process pool mein).
+    """
+    keys = {smi: render_key(smi, options) for smi in dict.fromkeys(canonical_list)}
+    cached = depiction_cache.get_many(list(keys.values()))
+    misses = [smi for smi, key in keys.items() if key not in cached]
+
+    rendered = {}
+    for chunk, svgs in iter_chunk_results(partial(render_chunk, options=options), misses):
+        fresh = {keys[smi]: svg for smi, svg in zip(chunk, svgs) if svg}
+        depiction_cache.put_many(fresh)
+        rendered.update(fresh)
+    return {smi: (key, cached.get(key) or rendered.get(key)) for smi, key in keys.items()}
+
+def prerender_library(options=None):
+    """
+    ✅ Ingest time par library ki default depictions (BIOGRAPH_PRERENDER_IMAGES=1). Zyada se zyada
+    disk_items molecules - us se aage pre-render apni hi pehli depictions evict karta. Canonical keys
+    pages mein aati hain (drugs.db se), har page ke sirf missing molecules render hote hain.
+    """
+    from modules.database import iter_canonical_keys
+    options = options or render_options()
+    limit = depiction_cache.disk_items
+    try:
+        seen = added = 0
+        capped = started = False
+        for keys in iter_canonical_keys():
+            if seen + len(keys) > limit:
+                keys, capped = keys[:limit - seen], True
+            seen += len(keys)
+            missing = depiction_cache.missing(render_key(smi, options) for smi in keys)
+            todo = [smi for smi in keys if render_key(smi, options) in missing]
+            if todo and not started:
+                print("⏳ Pre-rendering missing molecule depictions...")
+                started = True
+            for chunk, svgs in iter_chunk_results(partial(render_chunk, options=options), todo):
+                fresh = {render_key(smi, options): svg for smi, svg in zip(chunk, svgs) if svg}
+                depiction_cache.put_many(fresh, remember=False)
+                added += len(fresh)
+            if capped: break
+
+        if capped: print(f"ℹ️ Pre-render capped at {limit} molecules (BIOGRAPH_RENDER_DISK_ITEMS); baqi on demand render honge.")
+        if added: print(f"🧪 Depiction cache updated: +{added} molecules.")
+        else: print(f"✅ Depiction cache up to date ({seen} molecules).")
+        return added
+    except Exception as e:
+        print(f"⚠️ Pre-render Error: {e}")
+        return 0
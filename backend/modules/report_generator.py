@@ -1,27 +1,59 @@
-from io import BytesIO
+import re
+import zipfile
+from io import BytesIO, RawIOBase
+from functools import lru_cache
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, HRFlowable, Image
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, HRFlowable, Image, PageBreak
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from datetime import datetime
 from rdkit import Chem
 from rdkit.Chem import Draw
 
-def generate_pdf(data):
-    """
-    Creates a professional PDF Lab Report with Molecule Image.
-    """
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
-    elements = []
+from modules.config import REPORT_CHUNK
+from modules.featurizer import iter_chunk_results
+
+@lru_cache(maxsize=1)
+def report_styles():
+    """✅ Styles ek dafa per process (har report par getSampleStyleSheet dobara nahi)."""
     styles = getSampleStyleSheet()
+    return {
+        "title": ParagraphStyle('MainTitle', parent=styles['Heading1'], fontSize=24, textColor=colors.HexColor("#2A2A2A"), alignment=1, spaceAfter=20),
+        "subtitle": ParagraphStyle('SubTitle', parent=styles['Normal'], fontSize=12, textColor=colors.gray, alignment=1),
+        "header": ParagraphStyle('Header', parent=styles['Heading2'], fontSize=14, textColor=colors.HexColor("#0055aa"), spaceBefore=15),
+        "normal": styles['BodyText'],
+        "code": ParagraphStyle('Code', fontSize=8, fontName='Courier', textColor=colors.darkgrey),
+        "footer": ParagraphStyle('Footer', fontSize=8, textColor=colors.gray, alignment=1),
+    }
+
+@lru_cache(maxsize=1024)
+def _structure_png(canonical):
+    # RDKit se image memory mein banayi (same molecule dobara aaye to cache se)
+    img = Draw.MolToImage(Chem.MolFromSmiles(canonical), size=(400, 200)) # Width, Height
+    img_buffer = BytesIO()
+    img.save(img_buffer, format='PNG')
+    return img_buffer.getvalue()
+
+def structure_png(smiles_text):
+    """SMILES -> PNG bytes (canonical SMILES par cached); invalid par None."""
+    mol = Chem.MolFromSmiles(smiles_text) if smiles_text else None
+    return _structure_png(Chem.MolToSmiles(mol)) if mol else None
+
+def structure_chunk(smiles_list):
+    """Worker function (process pool): SMILES list -> PNG bytes list."""
+    out = []
+    for smi in smiles_list:
+        try: out.append(structure_png(smi))
+        except Exception: out.append(None)
+    return out
+
+def report_elements(data, png=None):
+    """Ek report ke flowables. png diya ho (pehle se rendered) to structure dobara draw nahi hota."""
+    elements = []
+    styles = report_styles()
+    title_style, subtitle_style = styles["title"], styles["subtitle"]
+    header_style, normal_style = styles["header"], styles["normal"]
 
-    # --- 1. Custom Styles ---
-    title_style = ParagraphStyle('MainTitle', parent=styles['Heading1'], fontSize=24, textColor=colors.HexColor("#2A2A2A"), alignment=1, spaceAfter=20)
-    subtitle_style = ParagraphStyle('SubTitle', parent=styles['Normal'], fontSize=12, textColor=colors.gray, alignment=1)
-    header_style = ParagraphStyle('Header', parent=styles['Heading2'], fontSize=14, textColor=colors.HexColor("#0055aa"), spaceBefore=15)
-    normal_style = styles['BodyText']
-    
     # --- 2. Header Section ---
     elements.append(Paragraph("BIOGRAPH ENTERPRISE", title_style))
     elements.append(Paragraph("AI-POWERED DRUG REPURPOSING REPORT", subtitle_style))
@@ -31,7 +63,7 @@ def generate_pdf(data):
 
     # --- 3. Interaction Analysis (Main Result) ---
     elements.append(Paragraph("1. INTERACTION ANALYSIS", header_style))
-    
+
     score = data.get('score', 0)
     status = "ACTIVE" if score > 7.5 else "INACTIVE"
     status_color = colors.green if score > 7.5 else colors.red
@@ -59,7 +91,7 @@ def generate_pdf(data):
     admet = data.get('admet', {})
     if admet:
         elements.append(Paragraph("2. SAFETY & MOLECULAR PROFILE (ADMET)", header_style))
-        
+
         is_safe = admet.get('is_safe', False)
         verdict = "APPROVED FOR TESTING" if is_safe else "WARNING: SAFETY RISKS DETECTED"
         verdict_color = colors.green if is_safe else colors.red
@@ -85,22 +117,15 @@ def generate_pdf(data):
 
     # --- 5. Chemical Structure (Image + Code) ---
     elements.append(Paragraph("3. CHEMICAL STRUCTURE", header_style))
-    
+
     smiles_text = data.get('smiles', '')
 
-    # ✅ GENERATE MOLECULE IMAGE
+    # ✅ GENERATE MOLECULE IMAGE (cached PNG)
     try:
-        mol = Chem.MolFromSmiles(smiles_text)
-        if mol:
-            # RDKit se image memory mein banayi
-            img = Draw.MolToImage(mol, size=(400, 200)) # Width, Height
-            
-            img_buffer = BytesIO()
-            img.save(img_buffer, format='PNG')
-            img_buffer.seek(0)
-            
+        if png is None: png = structure_png(smiles_text)
+        if png:
             # ReportLab Image Object
-            rl_image = Image(img_buffer, width=300, height=150)
+            rl_image = Image(BytesIO(png), width=300, height=150)
             elements.append(rl_image)
             elements.append(Spacer(1, 10))
     except Exception as e:
@@ -109,15 +134,103 @@ def generate_pdf(data):
 
     # Add SMILES Text below image
     if len(smiles_text) > 80: smiles_text = smiles_text[:80] + "..."
-    elements.append(Paragraph(f"SMILES Code: {smiles_text}", ParagraphStyle('Code', fontSize=8, fontName='Courier', textColor=colors.darkgrey)))
-    
+    elements.append(Paragraph(f"SMILES Code: {smiles_text}", styles["code"]))
+
     # --- 6. Footer ---
     elements.append(Spacer(1, 50))
     elements.append(HRFlowable(width="100%", thickness=1, color=colors.lightgrey))
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     footer_text = f"Report Generated: {timestamp} | BioGraph Enterprise AI | For Research Use Only"
-    elements.append(Paragraph(footer_text, ParagraphStyle('Footer', fontSize=8, textColor=colors.gray, alignment=1)))
+    elements.append(Paragraph(footer_text, styles["footer"]))
+    return elements
 
+def generate_pdf(data):
+    """
+    Creates a professional PDF Lab Report with Molecule Image.
+    """
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    doc.build(report_elements(data))
+    buffer.seek(0)
+    return buffer
+
+def report_chunk(rows):
+    """Worker function (process pool): report dicts -> PDF bytes list."""
+    return [generate_pdf(row).getvalue() for row in rows]
+
+def report_filename(rank, data):
+    safe_name = re.sub(r"[^A-Za-z0-9._-]+", "_", str(data.get('name', 'Unknown'))).strip("_")[:60] or "Unknown"
+    return f"{rank:03d}_BioGraph_Report_{safe_name}.pdf"
+
+class _StreamBuffer(RawIOBase):
+    """Write-only, non-seekable sink: zipfile jo likhe wo foran drain karke stream ho jata hai."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def iter_report_zip(rows, chunk_size=REPORT_CHUNK):
+    """
+    ✅ Bulk export: reports process pool mein render, ZIP entries ban'te hi stream
+    (poori archive memory mein nahi, pehli report foran download shuru).
+    """
+    sink = _StreamBuffer()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        rank = 0
+        for chunk, pdfs in iter_chunk_results(report_chunk, rows, chunk_size):
+            for data, pdf in zip(chunk, pdfs):
+                rank += 1
+                archive.writestr(report_filename(rank, data), pdf)
+            yield sink.drain()
+    yield sink.drain()
+
+def generate_combined_pdf(rows, chunk_size=REPORT_CHUNK):
+    """
+    Saari reports ek multi-page PDF mein (har hit naye page se). Structure images process pool
+    mein pehle render hoti hain; document ek hi build mein (ReportLab PDF merge nahi karta).
+    """
+    pngs = []
+    for _, images in iter_chunk_results(structure_chunk, [row.get('smiles', '') for row in rows], chunk_size * 4):
+        pngs.extend(images)
+
+    elements = []
+    for i, (data, png) in enumerate(zip(rows, pngs)):
+        if i: elements.append(PageBreak())
+        elements.extend(report_elements(data, png=png or False))
+
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
     doc.build(elements)
     buffer.seek(0)
-    return buffer
\ No newline at end of file
+    return buffer
+
+def bulk_report_rows(results, target_id=None, top_n=None):
+    """
+    Scan result rows (auto / upload / panel) -> report dicts. ADMET jin rows mein nahi (auto/upload hits)
+    wo descriptor table se ek read mein bhar diya jata hai. Panel rows ka 'score' ranking value hai (max/mean/
+    selectivity) - report mein best_target ka asal pKd (scores ka max, best_target = argmax) jata hai.
+    """
+    from modules.admet import lookup_admet_properties
+    rows = [row for row in results if row and row.get('smiles')][:top_n]
+    mols = [Chem.MolFromSmiles(row['smiles']) for row in rows]
+    missing = [i for i, (row, mol) in enumerate(zip(rows, mols)) if mol and not row.get('admet')]
+    admet = lookup_admet_properties([Chem.MolToSmiles(mols[i]) for i in missing], [mols[i] for i in missing])
+    filled = dict(zip(missing, admet))
+    return [{
+        "name": row.get('name', 'Unknown'),
+        "smiles": row['smiles'],
+        "score": round(max(row['scores']), 2) if row.get('scores') else row.get('score', 0),
+        "target_id": row.get('best_target') or target_id or 'Unknown',
+        "admet": row.get('admet') or filled.get(i),
+    } for i, row in enumerate(rows)]
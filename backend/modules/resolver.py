@@ -0,0 +1,77 @@
+# File: backend/modules/resolver.py
+
+import os
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from modules.config import OFFLINE_MODE, RESOLVER_DB_PATH, NAME_MISS_TTL
+from modules.database import find_smiles_by_name, name_key
+
+MEMORY_CACHE_SIZE = 2048
+
+_memory = OrderedDict()
+_memory_lock = threading.Lock()
+
+def _connect():
+    os.makedirs(os.path.dirname(RESOLVER_DB_PATH), exist_ok=True)
+    conn = sqlite3.connect(RESOLVER_DB_PATH)
+    # smiles NULL = negative entry (PubChem ko naam nahi mila)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS pubchem_cache (
+            query_key TEXT PRIMARY KEY,
+            smiles TEXT,
+            fetched_at REAL NOT NULL
+        )
+    ''')
+    return conn
+
+def _remember(key, smiles):
+    with _memory_lock:
+        _memory[key] = smiles
+        _memory.move_to_end(key)
+        while len(_memory) > MEMORY_CACHE_SIZE:
+            _memory.popitem(last=False)
+
+def resolve_name(name, fetch):
+    """
+    Drug name -> SMILES. Order: memory -> drugs.db (name + synonyms) -> PubChem answer cache -> fetch(name).
+    fetch() ko not-found par None return karna hai aur network failure par raise
+    (failures cache nahi hote, sirf true not-found NAME_MISS_TTL tak negative-cache hota hai).
+    """
+    key = name_key(name)
+    if not key: return None
+    with _memory_lock:
+        if key in _memory:
+            _memory.move_to_end(key)
+            return _memory[key]
+
+    smiles = find_smiles_by_name(key)
+    if smiles:
+        _remember(key, smiles)
+        return smiles
+
+    now = time.time()
+    conn = _connect()
+    try:
+        row = conn.execute("SELECT smiles, fetched_at FROM pubchem_cache WHERE query_key = ?", (key,)).fetchone()
+        if row and (row[0] or now - row[1] < NAME_MISS_TTL):
+            if row[0]: _remember(key, row[0])
+            return row[0]
+
+        if OFFLINE_MODE:
+            return None
+
+        try:
+            smiles = fetch(name)
+        except Exception as e:
+            print(f"❌ PubChem Lookup Failed: {e}")
+            return None
+
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO pubchem_cache VALUES (?, ?, ?)", (key, smiles, now))
+        if smiles: _remember(key, smiles)
+        return smiles
+    finally:
+        conn.close()
@@ -0,0 +1,118 @@
+# File: backend/modules/score_cache.py
+
+import os
+import re
+import time
+import sqlite3
+import threading
+import numpy as np
+
+from modules.config import SCORE_DB_PATH, SCORE_DIR
+from modules.graph_store import get_graph_store, FEATURE_VERSION
+from modules.inference import get_library_embeddings, score_vectors
+
+# Persistent raw (unclamped) scores, key = (model hash + inference backend, PDB ID, canonical SMILES).
+#  - Library: har target ka ek score vector (graph store rows ke sath aligned, .npy memmap).
+#    Library mein naye compounds aayen to sirf unki rows score hoti hain.
+#  - Ad-hoc molecules (manual / upload): SQLite table.
+# Model file ya BIOGRAPH_INFERENCE_BACKEND badle to key badal jati hai - purani entries khud invalid (aur saaf) ho jati hain.
+# (eager / fused / int8 / compile ke scores parity tolerance tak alag ho sakte hain, is liye backend bhi key mein.)
+
+_lock = threading.Lock()
+_cleaned = set()
+
+def _target_key(target_id):
+    return target_id.lower().strip()
+
+def model_key(model):
+    # Model file hash + serving backend (prepare_inference_model ne jo chuna)
+    return f"{model.model_hash}:{getattr(model, 'backend', 'eager')}"
+
+def _connect():
+    os.makedirs(os.path.dirname(SCORE_DB_PATH), exist_ok=True)
+    conn = sqlite3.connect(SCORE_DB_PATH)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS scores (
+            model_hash TEXT NOT NULL,
+            target_id TEXT NOT NULL,
+            canonical_smiles TEXT NOT NULL,
+            score REAL NOT NULL,
+            scored_at REAL NOT NULL,
+            PRIMARY KEY (model_hash, target_id, canonical_smiles)
+        ) WITHOUT ROWID
+    ''')
+    return conn
+
+def _drop_stale(conn, key):
+    # Har process mein ek dafa: doosre model keys ki rows hata do
+    if key in _cleaned: return
+    with conn:
+        conn.execute("DELETE FROM scores WHERE model_hash != ?", (key,))
+    _cleaned.add(key)
+
+def get_cached_scores(model, target_id, canonical_smiles_list):
+    """canonical SMILES -> cached raw score (sirf jo cache mein hain)."""
+    keys = list(dict.fromkeys(k for k in canonical_smiles_list if k))
+    found = {}
+    if not keys: return found
+    key = model_key(model)
+    conn = _connect()
+    try:
+        _drop_stale(conn, key)
+        for lo in range(0, len(keys), 500):
+            chunk = keys[lo:lo + 500]
+            marks = ",".join("?" * len(chunk))
+            rows = conn.execute(f'''
+                SELECT canonical_smiles, score FROM scores
+                WHERE model_hash = ? AND target_id = ? AND canonical_smiles IN ({marks})
+            ''', [key, _target_key(target_id), *chunk])
+            found.update(rows)
+    finally:
+        conn.close()
+    return found
+
+def store_scores(model, target_id, scores):
+    """scores: {canonical SMILES: raw score}. NaN (unscored) kabhi cache nahi hote."""
+    now = time.time()
+    target = _target_key(target_id)
+    mkey = model_key(model)
+    rows = [(mkey, target, key, float(s), now) for key, s in scores.items() if key and not np.isnan(s)]
+    if not rows: return
+    conn = _connect()
+    try:
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?)", rows)
+    finally:
+        conn.close()
+
+def get_library_scores(model, target_id, prot_vec):
+    """
+    Memory-mapped (len(graph store),) raw score vector for one target. Pehli dafa poori library
+    (precomputed drug_vec par sirf head), baad mein sirf naye graph store rows.
+    """
+    store = get_graph_store()
+    safe_target = re.sub(r"[^a-z0-9_-]", "_", _target_key(target_id))
+    prefix = f"score_{model.model_hash[:16]}_{getattr(model, 'backend', 'eager')}_v{FEATURE_VERSION}_"
+    path = os.path.join(SCORE_DIR, f"{prefix}{safe_target}.npy")
+
+    with _lock:
+        scores = np.load(path, mmap_mode='r') if os.path.exists(path) else None
+        if scores is not None and len(scores) >= len(store):
+            return scores
+
+        start = 0 if scores is None else len(scores)
+        lib_vecs = get_library_embeddings(model)
+        os.makedirs(SCORE_DIR, exist_ok=True)
+        tmp = path + ".tmp"
+        out = np.lib.format.open_memmap(tmp, mode='w+', dtype=np.float32, shape=(len(store),))
+        if start: out[:start] = scores
+        out[start:] = score_vectors(model, lib_vecs[start:len(store)], prot_vec)
+        out.flush()
+        del out
+        os.replace(tmp, path)
+
+        # Purane model hashes / backends ke score vectors hata do
+        for name in os.listdir(SCORE_DIR):
+            if name.startswith("score_") and not name.startswith(prefix):
+                os.remove(os.path.join(SCORE_DIR, name))
+        return np.load(path, mmap_mode='r')
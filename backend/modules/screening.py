@@ -0,0 +1,528 @@
+# File: backend/modules/screening.py
+
+import time
+import heapq
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import torch
+from rdkit import Chem
+
+from modules.chemistry import get_protein_sequence, featurize_smiles, get_smiles_from_input, get_pharmacophore_data
+from modules.batching import GraphCSR
+from modules.featurizer import iter_featurized
+from modules.config import FEATURIZE_CHUNK, STAGE_WORKERS
+from modules.graph_store import get_graph_store
+from modules.inference import (get_protein_vector, get_library_embeddings, encode_drugs, score_vectors,
+                               score_panel, score_graphs, iter_score_graphs)
+from modules.score_cache import get_cached_scores, store_scores, get_library_scores
+from modules.database import (iter_drugs, count_drugs, get_drugs_by_canonical, iter_drugs_by_canonical,
+                              count_drugs_by_canonical)
+from modules.similarity import get_fingerprint_index, pack_fingerprint
+from modules.substructure import find_substructure_matches
+from modules.admet import lookup_admet_properties
+from modules.utils import calculate_confidence
+from modules.explanations import start_explanation
+
+# Scan pipelines. Har function ek Job ke andar chalta hai (modules/jobs.py):
+# progress job.update() se, cancel job.check_cancelled() se, partial results job.emit() se.
+
+LIBRARY_SCORE_CHUNK = 1024
+
+# Manual analysis stages ke liye chhota shared thread pool (network I/O + RDKit lookups)
+_stage_pool = ThreadPoolExecutor(max_workers=STAGE_WORKERS, thread_name_prefix="stage")
+
+class ResultCollector:
+    """
+    Scored rows jama karta hai. top_k diya ho to sirf bounded min-heap (poori list sort nahi hoti);
+    keep=False (streaming without top_k) par kuch store nahi hota, sirf count.
+    None rows = molecules jo model score na kar saka (unscored mein gine jate hain, 0.0 nahi).
+    """
+
+    def __init__(self, top_k=None, keep=True):
+        self.top_k = top_k
+        self.keep = keep
+        self.count = 0
+        self.unscored = 0
+        self._heap = []
+        self._rows = []
+        self._seq = itertools.count()
+
+    def add(self, rows):
+        """Returns rows jo result set mein shamil hue (streaming ke liye)."""
+        scored = [row for row in rows if row is not None]
+        self.unscored += len(rows) - len(scored)
+        rows = scored
+        self.count += len(rows)
+        if not self.top_k:
+            if self.keep: self._rows.extend(rows)
+            return rows
+        entered = []
+        for row in rows:
+            item = (row["score"], -next(self._seq), row)
+            if len(self._heap) < self.top_k:
+                heapq.heappush(self._heap, item)
+            elif item > self._heap[0]:
+                heapq.heapreplace(self._heap, item)
+            else:
+                continue
+            entered.append(row)
+        return entered
+
+    def results(self):
+        if self.top_k:
+            return [row for _, _, row in sorted(self._heap, reverse=True)]
+        self._rows.sort(key=lambda x: x["score"], reverse=True)
+        return self._rows
+
+def _collect(job, batches, top_k):
+    stream = job.stream is not None
+    collector = ResultCollector(top_k, keep=not stream or bool(top_k))
+    for rows in batches:
+        entered = collector.add(rows)
+        if stream and entered:
+            job.emit({"type": "batch", "results": entered})
+    return collector
+
+def finish_response(response, collector):
+    if collector.unscored: response["unscored"] = collector.unscored
+    return response
+
+def clamp_score(raw):
+    return round(max(4.0, min(12.0, float(raw))), 2)
+
+def result_row(name, smiles, score):
+    return {
+        "name": name,
+        "smiles": smiles,
+        "score": score,
+        "confidence": calculate_confidence(score),
+        "status": "ACTIVE" if score > 7.5 else "INACTIVE",
+        "color": "#00f3ff" if score > 7.5 else "#ff0055"
+    }
+
+def run_manual(job, model, target_id, smiles_input, defer_explanation=True):
+    """
+    Independent stages concurrently: sequence fetch + name resolution (network), phir ADMET aur
+    pharmacophores stage pool par jab tak model inference job thread mein chalta hai.
+    AI explanation alag handle hai (modules/explanations.py): default mein result turant return hota
+    hai ai_explanation=None + explanation_id ke sath; /explanations/{id} se baad mein milta hai.
+    """
+    job.update(current=0, total=1, status="Validating...")
+    protein_future = _stage_pool.submit(get_protein_sequence, target_id)
+    structure_future = _stage_pool.submit(get_smiles_from_input, smiles_input) if smiles_input else None
+
+    real_smiles, mol = structure_future.result() if structure_future else (None, None)
+    if mol:
+        admet_future = _stage_pool.submit(lookup_admet_properties, [Chem.MolToSmiles(mol)], [mol])
+        pharmacophore_future = _stage_pool.submit(get_pharmacophore_data, mol)
+
+    protein_seq = protein_future.result()
+    if not protein_seq:
+        return {"error": f"Invalid Target ID '{target_id}' or Network Error"}
+
+    job.update(status="Processing...")
+    if not smiles_input: return {"error": "Input is missing!"}
+    if not real_smiles or not mol:
+        return {"error": f"Could not find structure for '{smiles_input}'."}
+
+    is_smiles_input = smiles_input.strip() == real_smiles or len(smiles_input) > 20
+    display_name = f"Custom Ligand {str(int(time.time()))[-4:]}" if is_smiles_input else smiles_input
+
+    score = 0.0
+    status = "UNKNOWN"
+    graph = featurize_smiles(real_smiles)
+
+    canonical = Chem.MolToSmiles(mol)
+    if model and graph:
+        prot_vec = get_protein_vector(model, target_id, protein_seq)
+        raw = cached_graph_scores(model, target_id, prot_vec, [canonical], GraphCSR.from_graphs([graph]))[0]
+        if np.isnan(raw): status = "MODEL ERROR"
+        else:
+            score = clamp_score(raw)
+            status = "ACTIVE" if score > 7.5 else "INACTIVE"
+
+    admet_data = admet_future.result()[0]
+    confidence_val = calculate_confidence(score, threshold=7.5)
+    pharmacophore_data = pharmacophore_future.result()
+
+    # ✅ FIX: Correct AI Call using the new class method
+    drug_data_for_ai = {
+        "name": display_name,
+        "smiles": real_smiles,
+        "score": score,
+        "admet": admet_data,
+        "active_sites": pharmacophore_data
+    }
+    explanation = start_explanation(drug_data_for_ai, target_id)
+    result = {
+        "name": display_name,
+        "smiles": real_smiles,
+        "score": score,
+        "status": status,
+        "confidence": confidence_val,
+        "color": "#00f3ff" if status == "ACTIVE" else "#ff0055",
+        "admet": admet_data,
+        "active_sites": pharmacophore_data,
+        "explanation_id": explanation.id,
+    }
+    job.check_cancelled()
+
+    if job.stream is not None:
+        # ✅ Streaming: score/ADMET turant, phir AI explanation token by token (+ har JSON section)
+        job.emit({"type": "result", **result})
+        for event in explanation.iter_events():
+            job.check_cancelled()
+            if event["type"] != "done": job.emit(event)
+        ai_explanation = explanation.result
+    elif defer_explanation:
+        ai_explanation = None  # ✅ Numbers ab, explanation /explanations/{explanation_id} se
+    else:
+        ai_explanation = explanation.wait()
+    job.update(current=1)
+
+    result["ai_explanation"] = ai_explanation
+    return result
+
+def run_similar(job, model, smiles_input, target_id=None, top_k=20, threshold=0.0, exclude_query=True):
+    """
+    Library compounds jo query (SMILES ya name) se milte hain: Morgan fingerprints par Tanimoto
+    (modules/similarity.py). target_id diya ho to neighbours usi call mein target par score bhi hote hain.
+    """
+    start_time = time.time()
+    job.update(current=0, total=1, status="Validating...")
+    protein_future = _stage_pool.submit(get_protein_sequence, target_id) if target_id else None
+    real_smiles, mol = get_smiles_from_input(smiles_input) if smiles_input else (None, None)
+    if not smiles_input: return {"error": "Input is missing!"}
+    if not mol: return {"error": f"Could not find structure for '{smiles_input}'."}
+
+    job.update(status="Searching...")
+    canonical = Chem.MolToSmiles(mol)
+    store = get_graph_store()
+    index = get_fingerprint_index()
+    # Query khud library mein ho to ek extra neighbour mango (baad mein nikal jata hai)
+    rows, sims = index.search(pack_fingerprint(mol), top_k + int(exclude_query), threshold)
+    keys = [store.keys[r] for r in rows]
+    drugs = get_drugs_by_canonical(keys)
+    hits = [(r, key, sim) for r, key, sim in zip(rows.tolist(), keys, sims.tolist())
+            if key in drugs and not (exclude_query and key == canonical)][:top_k]
+
+    scores = None
+    if protein_future:
+        protein_seq = protein_future.result()
+        if not protein_seq:
+            return {"error": f"Invalid Target ID '{target_id}' or Network Error"}
+        if model and hits:
+            job.update(status="Inference...")
+            prot_vec = get_protein_vector(model, target_id, protein_seq)
+            scores = cached_graph_scores(model, target_id, prot_vec, [key for _, key, _ in hits],
+                                         store.csr().take([r for r, _, _ in hits]))
+
+    results = []
+    for i, (_, key, sim) in enumerate(hits):
+        drug = drugs[key]
+        if scores is not None and not np.isnan(scores[i]):
+            item = result_row(drug["name"], drug["smiles"], clamp_score(scores[i]))
+        else:
+            item = {"name": drug["name"], "smiles": drug["smiles"]}
+        item["similarity"] = round(sim, 3)
+        results.append(item)
+
+    job.update(current=1, status="Finalizing...")
+    return {"query": real_smiles, "results": results, "count": len(results), "library_size": len(index),
+            "search_time": round(time.time() - start_time, 3)}
+
+def run_auto(job, model, target_id, top_k=None, filters=None, substructure=None, substructure_type="smarts"):
+    """
+    filters: property predicates (database.DESCRIPTOR_PREDICATES) - sirf matching molecules score hote hain.
+    substructure: SMARTS / SMILES scaffold - sirf us ko contain karne wale library molecules (modules/substructure.py).
+    """
+    start_time = time.time()
+    job.update(current=0, total=1, status="Validating...")
+    protein_seq = get_protein_sequence(target_id)
+    if not protein_seq:
+        return {"error": f"Invalid Target ID '{target_id}' or Network Error"}
+
+    job.update(status="Fetching DB...")
+    # ✅ Library drugs.db se stream hoti hai (chunk by chunk); filters descriptor join se SQL mein
+    try:
+        if substructure:
+            job.update(status="Substructure search...")
+            matches = find_substructure_matches(substructure, substructure_type)
+            library = iter_drugs_by_canonical(matches["keys"], LIBRARY_SCORE_CHUNK, filters)
+            total = count_drugs_by_canonical(matches["keys"], filters)
+        else:
+            library = iter_drugs(LIBRARY_SCORE_CHUNK, filters)
+            total = count_drugs(filters)
+    except ValueError as e: return {"error": str(e)}
+    job.update(total=total)
+
+    job.update(status="Inference...")
+    batches = _auto_batches(job, model, target_id, protein_seq, _library_chunks(job, library))
+    collector = _collect(job, batches, top_k)
+
+    job.update(current=total, status="Finalizing...")
+    response = {"results": collector.results(), "count": collector.count,
+                "scan_time": round(time.time() - start_time, 2)}
+    if filters or substructure: response["library_size"] = count_drugs()
+    if substructure: response["substructure_matches"] = total
+    return finish_response(response, collector)
+
+def run_substructure(job, model, pattern, query_type="smarts", limit=100):
+    """Library compounds jo pattern contain karte hain (pattern fingerprint prefilter + exact match)."""
+    job.update(current=0, total=1, status="Searching...")
+    try: matches = find_substructure_matches(pattern, query_type)
+    except ValueError as e: return {"error": str(e)}
+    job.check_cancelled()
+
+    keys = matches["keys"]
+    drugs = get_drugs_by_canonical(keys[:limit])
+    results = [{"name": drugs[key]["name"], "smiles": drugs[key]["smiles"]} for key in keys[:limit] if key in drugs]
+    job.update(current=1, status="Finalizing...")
+    return {"pattern": pattern, "results": results, "count": len(keys), "candidates": matches["candidates"],
+            "library_size": matches["library_size"], "search_time": matches["search_time"]}
+
+def _library_chunks(job, library):
+    """
+    Streamed drugs.db chunks -> (drugs, graph store rows, unki chunk positions, store misses ke graphs,
+    unki positions). Ek waqt mein sirf ek chunk memory mein; scoring pehle chunk se hi shuru.
+    """
+    store = get_graph_store()
+    seen = 0
+    for drugs in library:
+        rows, positions = [], []
+        miss_list, miss_positions = [], []
+        for i, drug in enumerate(drugs):
+            # ✅ Pre-featurized graph (RDKit sirf store miss par)
+            row = store.lookup(drug['smiles'], canonicalize=False)
+            if row is not None:
+                rows.append(row)
+                positions.append(i)
+            elif drug['smiles'] not in store.invalid:
+                graph = featurize_smiles(drug['smiles'])
+                if graph:
+                    miss_list.append(graph)
+                    miss_positions.append(i)
+
+        seen += len(drugs)
+        job.update(current=seen)
+        job.check_cancelled()
+        yield drugs, rows, positions, miss_list, miss_positions
+
+def _auto_batches(job, model, target_id, protein_seq, chunks):
+    if not model: return
+    # ✅ Two-tower: target ek dafa encode, library drug_vec precomputed -> sirf head
+    prot_vec = get_protein_vector(model, target_id, protein_seq)
+    # ✅ Score cache: is target ki library ranking pehle se ho to sirf gather (naye compounds hi score hote hain)
+    lib_scores, lib_vecs = None, None
+    try: lib_scores = get_library_scores(model, target_id, prot_vec)
+    except Exception as e: print(f"⚠️ Library Score Cache Error: {e}")
+    if lib_scores is None:
+        try: lib_vecs = get_library_embeddings(model)
+        except Exception as e: print(f"⚠️ Library Embedding Error: {e}")
+
+    def to_rows(drugs, positions, scores):
+        return [None if np.isnan(sc) else result_row(drugs[i]["name"], drugs[i]["smiles"], clamp_score(sc))
+                for i, sc in zip(positions, scores)]
+
+    library = get_graph_store().csr()
+    for drugs, rows, positions, miss_list, miss_positions in chunks:
+        if rows:
+            chunk = np.asarray(rows, dtype=np.int64)
+            if lib_scores is not None and chunk.max() < len(lib_scores): scores = lib_scores[chunk]
+            else:
+                vecs = lib_vecs[chunk] if lib_vecs is not None and chunk.max() < len(lib_vecs) else encode_drugs(model, library.take(chunk))
+                scores = score_vectors(model, vecs, prot_vec)
+            yield to_rows(drugs, positions, scores)
+
+        done = 0
+        for scores in iter_score_graphs(model, GraphCSR.from_graphs(miss_list), prot_vec) if miss_list else ():
+            job.check_cancelled()
+            yield to_rows(drugs, miss_positions[done:done + len(scores)], scores)
+            done += len(scores)
+
+def run_panel(job, model, target_ids, top_k=None, filters=None, rank_by="max"):
+    """
+    Multi-target (selectivity panel) scan: library ka har drug ek dafa encode, phir saare
+    targets ke against ek (N, T) score matrix. rank_by: "max", "mean" ya panel ka koi target
+    ID (selectivity = us target ka score - baqi targets ka max).
+    """
+    start_time = time.time()
+    # PDB IDs case-insensitive hain: duplicates ek hi dafa
+    unique = {}
+    for t in target_ids:
+        if t and t.strip(): unique.setdefault(t.strip().lower(), t.strip())
+    targets = list(unique.values())
+    if not targets: return {"error": "No target IDs given."}
+    if rank_by not in ("max", "mean"):
+        rank_by = unique.get(str(rank_by).strip().lower(), rank_by)
+    if rank_by not in ("max", "mean") and rank_by not in targets:
+        return {"error": "rank_by must be 'max', 'mean' or one of the panel targets."}
+
+    job.update(current=0, total=len(targets), status="Validating targets...")
+    sequences, invalid_targets = {}, []
+    for i, target_id in enumerate(targets):
+        job.check_cancelled()
+        protein_seq = get_protein_sequence(target_id)
+        if protein_seq: sequences[target_id] = protein_seq
+        else: invalid_targets.append(target_id)
+        job.update(current=i + 1)
+    if not sequences:
+        return {"error": f"Invalid Target IDs {invalid_targets} or Network Error"}
+    if rank_by in invalid_targets:
+        return {"error": f"Invalid Target ID '{rank_by}' or Network Error"}
+
+    job.update(current=0, status="Fetching DB...")
+    try: library = iter_drugs(LIBRARY_SCORE_CHUNK, filters)
+    except ValueError as e: return {"error": str(e)}
+    total = count_drugs(filters)
+    job.update(total=total)
+
+    job.update(status="Inference...")
+    valid_targets = list(sequences)
+    batches = _panel_batches(job, model, valid_targets, sequences, _library_chunks(job, library), rank_by)
+    collector = _collect(job, batches, top_k)
+
+    job.update(current=total, status="Finalizing...")
+    response = {"targets": valid_targets, "invalid_targets": invalid_targets, "rank_by": rank_by,
+                "results": collector.results(), "count": collector.count,
+                "scan_time": round(time.time() - start_time, 2)}
+    if filters: response["library_size"] = count_drugs()
+    return finish_response(response, collector)
+
+def panel_row(name, smiles, scores, targets, rank_by):
+    """Ek drug ki panel row; "score" ranking value hai (max / mean / selectivity)."""
+    best = int(np.argmax(scores))
+    if rank_by == "max": rank_score = scores[best]
+    elif rank_by == "mean": rank_score = float(np.mean(scores))
+    else:
+        t = targets.index(rank_by)
+        others = np.delete(scores, t)
+        rank_score = scores[t] - (others.max() if len(others) else 0.0)
+    return {
+        "name": name,
+        "smiles": smiles,
+        "scores": [float(x) for x in scores],
+        "best_target": targets[best],
+        "score": round(float(rank_score), 2),
+    }
+
+def _panel_batches(job, model, targets, sequences, chunks, rank_by):
+    if not model: return
+    # ✅ Har target ek dafa encode, har drug ek dafa encode - sirf head (N x T) chalta hai
+    prot_vecs = torch.cat([get_protein_vector(model, t, sequences[t]) for t in targets])
+
+    try: lib_vecs = get_library_embeddings(model)
+    except Exception as e:
+        print(f"⚠️ Library Embedding Error: {e}")
+        lib_vecs = None
+
+    def to_rows(drugs, positions, matrix):
+        failed = np.isnan(matrix).any(axis=1)
+        matrix = np.round(np.clip(matrix.astype(np.float64), 4.0, 12.0), 2)
+        return [None if bad else panel_row(drugs[i]["name"], drugs[i]["smiles"], scores, targets, rank_by)
+                for i, scores, bad in zip(positions, matrix, failed)]
+
+    library = get_graph_store().csr()
+    for drugs, rows, positions, miss_list, miss_positions in chunks:
+        if rows:
+            chunk = np.asarray(rows, dtype=np.int64)
+            vecs = lib_vecs[chunk] if lib_vecs is not None and chunk.max() < len(lib_vecs) else encode_drugs(model, library.take(chunk))
+            yield to_rows(drugs, positions, score_panel(model, vecs, prot_vecs))
+
+        if miss_list:
+            job.check_cancelled()
+            yield to_rows(drugs, miss_positions, score_panel(model, encode_drugs(model, GraphCSR.from_graphs(miss_list)), prot_vecs))
+
+def run_upload(job, model, target_id, source, top_k=None):
+    """
+    source: UploadSource (modules/uploads.py - file chunks mein parse hoti hai) ya {'name', 'smiles'} rows ki list.
+    Har chunk aate hi featurize + score hota hai; poori file kabhi memory mein nahi.
+    """
+    start_time = time.time()
+    try:
+        job.update(current=0, total=1, status="Validating...")
+        protein_seq = get_protein_sequence(target_id)
+        if not protein_seq: return {"error": "Invalid Target ID"}
+
+        job.update(total=0, status="Analyzing Batch...")
+        prot_vec = get_protein_vector(model, target_id, protein_seq) if model else None
+        batches = _upload_batches(job, model, target_id, prot_vec, source)
+        collector = _collect(job, batches, top_k)
+        if not collector.count: return {"error": "No valid molecules found."}
+
+        job.update(status="Finalizing...")
+        # job_id: hits ke ADMET / pharmacophores page by page GET /jobs/{job_id}/hits se
+        return finish_response({"results": collector.results(), "count": collector.count, "job_id": job.id,
+                                "scan_time": round(time.time() - start_time, 2)}, collector)
+    finally:
+        if hasattr(source, "close"): source.close()
+
+def _iter_upload_graphs(drugs_data):
+    """
+    Yields (row indices, canonical SMILES, GraphCSR, rows consumed) per chunk. Graph store hits seedha store se
+    (vectorized gather), baqi process pool mein featurize (workers compact arrays return karte hain).
+    """
+    store = get_graph_store()
+    library = store.csr()
+    hits, misses = {}, []
+    for i, row in enumerate(drugs_data):
+        graph_row = store.lookup(str(row['smiles']), canonicalize=False)
+        if graph_row is not None: hits[i] = graph_row
+        else: misses.append(i)
+
+    hit_indices = list(hits)
+    for lo in range(0, len(hit_indices), FEATURIZE_CHUNK):
+        chunk = hit_indices[lo:lo + FEATURIZE_CHUNK]
+        graph_rows = [hits[i] for i in chunk]
+        yield chunk, [store.keys[r] for r in graph_rows], library.take(graph_rows), len(chunk)
+
+    miss_smiles = (str(drugs_data[i]['smiles']) for i in misses)
+    done = 0
+    for chunk, result in iter_featurized(miss_smiles):
+        valid = result.valid_rows()
+        indices = [misses[done + j] for j in valid]
+        done += len(chunk)
+        yield indices, [result.canonical[j] for j in valid], result.valid_csr(), len(chunk)
+
+def cached_graph_scores(model, target_id, prot_vec, keys, graphs):
+    """
+    Raw scores for graphs (keys = canonical SMILES) via the persistent score cache: sirf cache
+    misses score hote hain, aur duplicate SMILES (same chunk mein) bhi ek hi dafa.
+    """
+    cached = get_cached_scores(model, target_id, keys)
+    first_seen = {}
+    for j, key in enumerate(keys):
+        if key not in cached and key not in first_seen: first_seen[key] = j
+    if first_seen:
+        fresh = score_graphs(model, graphs.take(list(first_seen.values())), prot_vec)
+        fresh = dict(zip(first_seen, fresh.tolist()))
+        store_scores(model, target_id, fresh)
+        cached.update(fresh)
+    return np.array([cached[key] for key in keys], dtype=np.float64)
+
+def _upload_batches(job, model, target_id, prot_vec, source):
+    chunks = [source] if isinstance(source, list) else source
+    processed = 0
+    for drugs_data in chunks:
+        for indices, keys, graphs, consumed in _iter_upload_graphs(drugs_data):
+            job.check_cancelled()
+            if model: scores = cached_graph_scores(model, target_id, prot_vec, keys, graphs)
+            else: scores = np.zeros(len(graphs))
+
+            # ✅ Sirf scores; ADMET / pharmacophores jab user hits dekhe (modules/enrichment.py, /jobs/{id}/hits)
+            batch_rows = []
+            for idx, score_val in zip(indices, scores):
+                if np.isnan(score_val):
+                    batch_rows.append(None)
+                    continue
+                row = drugs_data[idx]
+                batch_rows.append(result_row(str(row['name']), str(row['smiles']), clamp_score(score_val)))
+
+            processed += consumed
+            yield batch_rows
+
+        # Progress: UploadSource bytes (gz par compressed) / Parquet rows; list par rows
+        if hasattr(source, "progress"): done, total = source.progress()
+        else: done, total = processed, len(source)
+        job.update(current=done, total=total)
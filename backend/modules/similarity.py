@@ -0,0 +1,215 @@
+# File: backend/modules/similarity.py
+
+import os
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+import numpy as np
+from rdkit import Chem, DataStructs
+from rdkit.Chem import rdFingerprintGenerator
+
+from modules.config import FINGERPRINT_DIR, PATTERN_FP_DIR, FP_RADIUS, FP_BITS, PATTERN_FP_BITS, FP_BLOCK, FP_WORKERS
+from modules.featurizer import iter_chunk_results
+
+# Fingerprint indexes: row i = graph store row i (keys[i] canonical SMILES).
+# fps.npy (N, bits/64) uint64 bit-packed + counts.npy (set bits, float32) - dono mmap se load.
+#   morgan  -> similarity search. Tanimoto = |A&B| / (|A| + |B| - |A&B|): sirf |A&B| query par compute.
+#   pattern -> substructure prefilter (RDKit PatternFingerprint): query ke saare bits molecule mein na hon
+#              to match possible hi nahi, exact HasSubstructMatch sirf survivors par (modules/substructure.py).
+
+FP_VERSION = 1
+
+_search_pool = ThreadPoolExecutor(max_workers=FP_WORKERS, thread_name_prefix="fp-search")
+
+@lru_cache(maxsize=4)
+def _generator(radius, bits):
+    return rdFingerprintGenerator.GetMorganGenerator(radius=radius, fpSize=bits)
+
+def pack_fingerprint(mol, radius=FP_RADIUS, bits=FP_BITS):
+    """Mol -> (FP_BITS/64,) uint64 bit-packed fingerprint."""
+    bitvec = _generator(radius, bits).GetFingerprintAsNumPy(mol).astype(np.uint8, copy=False)
+    return np.packbits(bitvec).view(np.uint64)
+
+def pack_pattern_fingerprint(mol, bits=PATTERN_FP_BITS):
+    """Mol ya SMARTS query mol -> bit-packed PatternFingerprint."""
+    bitvec = np.zeros(bits, dtype=np.uint8)
+    DataStructs.ConvertToNumpyArray(Chem.PatternFingerprint(mol, fpSize=bits), bitvec)
+    return np.packbits(bitvec).view(np.uint64)
+
+def fingerprint_chunk(smiles_list, kind="morgan", radius=FP_RADIUS, bits=FP_BITS):
+    """Worker function (process pool): canonical SMILES list -> (n, words) uint64 (invalid = all zero)."""
+    out = np.zeros((len(smiles_list), bits // 64), dtype=np.uint64)
+    for i, smi in enumerate(smiles_list):
+        mol = Chem.MolFromSmiles(smi)
+        if not mol: continue
+        out[i] = pack_pattern_fingerprint(mol, bits) if kind == "pattern" else pack_fingerprint(mol, radius, bits)
+    return out
+
+def popcount(packed):
+    return np.bitwise_count(packed).sum(axis=-1, dtype=np.uint32)
+
+def _segment_top(fps, counts, q, q_count, lo, hi, top_k, threshold, block):
+    """
+    Rows [lo, hi) ka top_k. Loop sirf blocks par (molecules par nahi), buffers reuse: AND -> np.bitwise_count
+    seedha float32 mein -> row sums ek BLAS matvec (uint8 axis-sum se tez).
+    """
+    words = fps.shape[1]
+    anded = np.empty((block, words), dtype=np.uint64)
+    bits = np.empty((block, words), dtype=np.float32)
+    ones = np.ones(words, dtype=np.float32)
+    common = np.empty(block, dtype=np.float32)
+
+    best_rows, best_sims = [], []
+    for start in range(lo, hi, block):
+        n = min(block, hi - start)
+        np.bitwise_and(fps[start:start + n], q, out=anded[:n])
+        np.bitwise_count(anded[:n], out=bits[:n], casting="unsafe")
+        c = np.matmul(bits[:n], ones, out=common[:n])
+        union = counts[start:start + n] + np.float32(q_count) - c
+        sims = np.divide(c, union, out=np.zeros_like(c), where=union > 0)
+        idx = np.flatnonzero(sims >= threshold)
+        if len(idx) > top_k: idx = idx[np.argpartition(sims[idx], -top_k)[-top_k:]]
+        best_rows.append(idx + start)
+        best_sims.append(sims[idx])
+    return best_rows, best_sims
+
+def _segment_screen(fps, q, lo, hi, block):
+    anded = np.empty((block, fps.shape[1]), dtype=np.uint64)
+    rows = []
+    for start in range(lo, hi, block):
+        n = min(block, hi - start)
+        np.bitwise_and(fps[start:start + n], q, out=anded[:n])
+        rows.append(np.flatnonzero((anded[:n] == q).all(axis=1)) + start)
+    return np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+
+class FingerprintIndex:
+    def __init__(self, path=FINGERPRINT_DIR, radius=FP_RADIUS, bits=FP_BITS, kind="morgan"):
+        self.path = path
+        self.kind = kind
+        self.radius = radius
+        self.bits = bits
+        self._lock = threading.Lock()
+        self._load()
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _params(self):
+        return {"version": FP_VERSION, "kind": self.kind, "radius": self.radius, "bits": self.bits}
+
+    def _load(self):
+        meta = None
+        if os.path.exists(self._file("meta.json")):
+            with open(self._file("meta.json")) as f:
+                meta = json.load(f)
+            if any(meta.get(k) != v for k, v in self._params().items()):
+                print("♻️ Fingerprint settings changed. Rebuilding...")
+                meta = None
+
+        if meta is None:
+            self.last_key = None
+            self.fps = np.zeros((0, self.bits // 64), dtype=np.uint64)
+            self.counts = np.zeros(0, dtype=np.float32)
+        else:
+            self.last_key = meta["last_key"]
+            self.fps = np.load(self._file("fps.npy"), mmap_mode='r')
+            self.counts = np.load(self._file("counts.npy"), mmap_mode='r')
+
+    def __len__(self):
+        return len(self.counts)
+
+    def refresh(self, keys):
+        """
+        keys = graph store keys (append-only). Sirf nayi rows ke fingerprints compute hote hain;
+        store rebuild hua ho (rows kam / last key badli) to poora index dobara.
+        """
+        with self._lock:
+            n = len(self)
+            if n > len(keys) or (n and keys[n - 1] != self.last_key):
+                print("♻️ Graph store changed. Rebuilding fingerprints...")
+                n = 0
+            if n == len(keys) and n == len(self): return 0
+
+            todo = keys[n:]
+            parts = [np.asarray(self.fps[:n])]
+            for _, packed in iter_chunk_results(partial(fingerprint_chunk, kind=self.kind, radius=self.radius, bits=self.bits), todo):
+                parts.append(packed)
+            fps = np.concatenate(parts)
+            self._save(fps, popcount(fps).astype(np.float32), keys[-1] if keys else None)
+            return len(todo)
+
+    def _save(self, fps, counts, last_key):
+        os.makedirs(self.path, exist_ok=True)
+        for name, arr in (("fps", fps), ("counts", counts)):
+            tmp = self._file(f"{name}.tmp.npy")
+            np.save(tmp, arr)
+            os.replace(tmp, self._file(f"{name}.npy"))
+        tmp = self._file("meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump({**self._params(), "last_key": last_key, "rows": len(counts)}, f)
+        os.replace(tmp, self._file("meta.json"))
+        self.fps = np.load(self._file("fps.npy"), mmap_mode='r')
+        self.counts = np.load(self._file("counts.npy"), mmap_mode='r')
+        self.last_key = last_key
+
+    def _segments(self, block):
+        # Library FP_WORKERS segments mein (numpy ufuncs GIL chhor dete hain), har segment block-aligned
+        n = len(self.counts)
+        step = -(-n // FP_WORKERS) if n else 1
+        step = -(-step // block) * block
+        return [(lo, min(lo + step, n)) for lo in range(0, n, step)]
+
+    def _map_segments(self, fn, block):
+        segments = self._segments(block)
+        if len(segments) > 1: return list(_search_pool.map(lambda seg: fn(*seg), segments))
+        return [fn(*seg) for seg in segments]
+
+    def search(self, query, top_k=20, threshold=0.0, block=FP_BLOCK):
+        """
+        query: packed fingerprint. Returns (rows, similarities) best-first, similarity >= threshold.
+        Har segment ka top_k, phir merge.
+        """
+        fps, counts = self.fps, self.counts
+        q = np.asarray(query, dtype=np.uint64)
+        q_count = int(popcount(q))
+        parts = self._map_segments(lambda lo, hi: _segment_top(fps, counts, q, q_count, lo, hi, top_k, threshold, block), block)
+
+        best_rows = [r for rows, _ in parts for r in rows]
+        best_sims = [s for _, sims in parts for s in sims]
+        rows = np.concatenate(best_rows) if best_rows else np.zeros(0, dtype=np.int64)
+        sims = np.concatenate(best_sims) if best_sims else np.zeros(0, dtype=np.float32)
+        order = np.lexsort((rows, -sims))[:top_k]
+        return rows[order], sims[order]
+
+    def screen(self, query, block=FP_BLOCK):
+        """Rows jin mein query ke saare bits set hain (fps & q == q), ascending. Pattern index ka prefilter."""
+        fps = self.fps
+        q = np.asarray(query, dtype=np.uint64)
+        parts = self._map_segments(lambda lo, hi: _segment_screen(fps, q, lo, hi, block), block)
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+_indexes = {}
+_index_lock = threading.Lock()
+
+def get_fingerprint_index(kind="morgan"):
+    with _index_lock:
+        if kind not in _indexes:
+            if kind == "pattern": _indexes[kind] = FingerprintIndex(PATTERN_FP_DIR, bits=PATTERN_FP_BITS, kind="pattern")
+            else: _indexes[kind] = FingerprintIndex()
+        return _indexes[kind]
+
+def refresh_fingerprint_index():
+    from modules.graph_store import get_graph_store
+    keys = get_graph_store().keys
+    added = 0
+    for kind, label in (("morgan", "Fingerprint"), ("pattern", "Substructure")):
+        try:
+            index = get_fingerprint_index(kind)
+            new = index.refresh(keys)
+            if new: print(f"🧬 {label} index updated: +{new} molecules ({len(index)} total).")
+            else: print(f"✅ {label} index up to date ({len(index)} molecules).")
+            added += new
+        except Exception as e:
+            print(f"⚠️ {label} Index Refresh Error: {e}")
+    return added
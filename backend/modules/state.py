@@ -1,6 +0,0 @@
-# Shared State for Progress Bar
-SCAN_PROGRESS = {
-    "current": 0, 
-    "total": 0, 
-    "status": "Idle"
-}
\ No newline at end of file
@@ -0,0 +1,61 @@
+# File: backend/modules/substructure.py
+
+import time
+from functools import lru_cache, partial
+from rdkit import Chem
+
+from modules.featurizer import iter_chunk_results
+from modules.graph_store import get_graph_store
+from modules.similarity import get_fingerprint_index, pack_pattern_fingerprint
+
+# Scaffold / SMARTS search: pattern fingerprint index (bitwise prefilter, poori library vectorized)
+# -> exact HasSubstructMatch sirf survivors par, process pool mein. Cost matches ke hisaab se, library ke nahi.
+
+QUERY_TYPES = ("smarts", "smiles")
+
+@lru_cache(maxsize=32)
+def parse_query(pattern, query_type="smarts"):
+    """SMARTS (default) ya SMILES scaffold -> query mol. Ghalat pattern par ValueError."""
+    if query_type not in QUERY_TYPES:
+        raise ValueError(f"Unknown query type '{query_type}'. Use 'smarts' or 'smiles'.")
+    query = Chem.MolFromSmarts(pattern) if query_type == "smarts" else Chem.MolFromSmiles(pattern)
+    if query is None: raise ValueError(f"Invalid {query_type.upper()} pattern '{pattern}'.")
+    query.UpdatePropertyCache(strict=False)
+    return query
+
+def trusted_mol(canonical):
+    """
+    Graph store keys RDKit ke apne canonical SMILES hain (pehle sanitize ho chuke): poora sanitize dobara nahi,
+    sirf valences + SSSR ring info (ring-size SMARTS ke liye) - MolFromSmiles se ~2.5x tez.
+    """
+    mol = Chem.MolFromSmiles(canonical, sanitize=False)
+    if mol is None: return None
+    mol.UpdatePropertyCache(strict=False)
+    Chem.SanitizeMol(mol, Chem.SanitizeFlags.SANITIZE_SYMMRINGS, catchErrors=True)
+    return mol
+
+def substructure_chunk(smiles_list, pattern, query_type="smarts"):
+    """Worker function (process pool): canonical SMILES list -> match flags (exact RDKit match)."""
+    query = parse_query(pattern, query_type)
+    out = []
+    for smi in smiles_list:
+        mol = trusted_mol(smi)
+        out.append(bool(mol) and mol.HasSubstructMatch(query))
+    return out
+
+def find_substructure_matches(pattern, query_type="smarts"):
+    """
+    Returns {"keys": matching canonical SMILES (graph store order), "candidates", "library_size", "search_time"}.
+    Pattern fingerprint screen ke survivors hi RDKit tak jate hain.
+    """
+    start_time = time.time()
+    query = parse_query(pattern, query_type)
+    store = get_graph_store()
+    index = get_fingerprint_index("pattern")
+    candidates = [store.keys[r] for r in index.screen(pack_pattern_fingerprint(query)).tolist()]
+
+    keys = []
+    for chunk, flags in iter_chunk_results(partial(substructure_chunk, pattern=pattern, query_type=query_type), candidates):
+        keys.extend(smi for smi, hit in zip(chunk, flags) if hit)
+    return {"keys": keys, "candidates": len(candidates), "library_size": len(index),
+            "search_time": round(time.time() - start_time, 3)}
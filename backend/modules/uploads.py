@@ -0,0 +1,108 @@
+# File: backend/modules/uploads.py
+
+import os
+import gzip
+import shutil
+import tempfile
+import pandas as pd
+
+from modules.config import UPLOAD_CHUNK
+
+# /upload files: disk par spool, phir chunks mein parse (CSV / TSV, .gz stream-decompress, Parquet).
+# Scan pehle chunk se shuru hota hai; poori file kabhi DataFrame / list of dicts nahi banti.
+
+UPLOAD_FORMATS = {".csv": ",", ".txt": "\t", ".tsv": "\t"}
+
+def upload_format(filename):
+    """filename -> (kind, separator, gzipped). Unknown extension par ValueError."""
+    name = (filename or "").lower()
+    gzipped = name.endswith(".gz")
+    if gzipped: name = name[:-3]
+    if name.endswith(".parquet") and not gzipped: return "parquet", None, False
+    ext = os.path.splitext(name)[1]
+    if ext in UPLOAD_FORMATS: return "table", UPLOAD_FORMATS[ext], gzipped
+    raise ValueError("Invalid format. Only .csv, .txt, .tsv (optionally .gz) or .parquet allowed.")
+
+class UploadSource:
+    """
+    Uploaded file (temp copy) -> chunks of {'name', 'smiles'} rows. Header pehle hi validate hota hai
+    (open_upload) taake ghalat file par job shuru hi na ho. close() temp file hata deta hai.
+    """
+
+    def __init__(self, path, filename, chunk_size=UPLOAD_CHUNK):
+        self.path = path
+        self.filename = filename
+        self.chunk_size = chunk_size
+        self.kind, self.sep, self.gzipped = upload_format(filename)
+        self.total = os.path.getsize(path)
+        self.done = 0
+        self.rows = 0
+        self._raw = None
+        self.smiles_col, self.name_col = self._columns()
+
+    def _columns(self):
+        if self.kind == "parquet": names = self._parquet().schema_arrow.names
+        else:
+            names = list(pd.read_csv(self._open(), sep=self.sep, nrows=0).columns)
+            self._raw.close()
+        lowered = {str(c).lower().strip(): c for c in names}
+        if "smiles" not in lowered: raise ValueError("Column 'smiles' not found!")
+        return lowered["smiles"], lowered.get("name")
+
+    def _open(self):
+        if self._raw: self._raw.close()
+        self._raw = open(self.path, "rb")
+        return gzip.GzipFile(fileobj=self._raw) if self.gzipped else self._raw
+
+    def _parquet(self):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Parquet uploads need the 'pyarrow' package on the server.")
+        return pq.ParquetFile(self.path)
+
+    def _frames(self):
+        columns = [c for c in (self.smiles_col, self.name_col) if c is not None]
+        if self.kind == "parquet":
+            parquet = self._parquet()
+            self.total = parquet.metadata.num_rows
+            for batch in parquet.iter_batches(batch_size=self.chunk_size, columns=columns):
+                self.done += batch.num_rows
+                yield batch.to_pandas()
+            return
+        reader = pd.read_csv(self._open(), sep=self.sep, usecols=columns, chunksize=self.chunk_size)
+        for df in reader:
+            self.done = self._raw.tell()  # compressed bytes bhi (gz)
+            yield df
+
+    def __iter__(self):
+        for df in self._frames():
+            n = len(df)
+            smiles = df[self.smiles_col].astype(str).tolist()
+            if self.name_col is not None: names = df[self.name_col].astype(str).tolist()
+            else: names = [f"Drug_{i}" for i in range(self.rows, self.rows + n)]
+            self.rows += n
+            yield [{"name": name, "smiles": smi} for name, smi in zip(names, smiles)]
+
+    def progress(self):
+        return self.done, self.total
+
+    def close(self):
+        if self._raw: self._raw.close()
+        if os.path.exists(self.path): os.remove(self.path)
+
+def open_upload(upload_file, chunk_size=UPLOAD_CHUNK):
+    """
+    UploadFile -> UploadSource. Request khatam hone par UploadFile band ho jata hai (background jobs),
+    is liye pehle temp file mein copy (fixed-size buffers, memory flat).
+    """
+    upload_format(upload_file.filename)
+    suffix = os.path.basename(upload_file.filename or "")[-40:]
+    fd, path = tempfile.mkstemp(prefix="biograph_upload_", suffix=f"_{suffix}")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            shutil.copyfileobj(upload_file.file, out, 1024 * 1024)
+        return UploadSource(path, upload_file.filename, chunk_size)
+    except Exception:
+        os.remove(path)
+        raise
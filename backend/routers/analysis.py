@@ -1,235 +1,207 @@
-import time
-import torch
-import io
-import pandas as pd
+import json
+import queue
 from fastapi import APIRouter, UploadFile, File, Form
+from fastapi.responses import StreamingResponse, JSONResponse
 from pydantic import BaseModel
-from typing import Optional
-from torch_geometric.loader import DataLoader
-from torch_geometric.data import Batch
-from rdkit import Chem
+from typing import Optional, List
 
 # Modules
-from modules.ai_model import load_ai_model, DEVICE
-from modules.chemistry import get_protein_sequence, process_data_object, get_smiles_from_input, get_pharmacophore_data
-from modules.database import get_all_drugs
-from modules.admet import calculate_admet_properties
-from modules.utils import calculate_confidence
-from modules.state import SCAN_PROGRESS 
+from modules.ai_model import load_ai_model
+from modules.inference_backend import prepare_inference_model
+from modules.inference import get_library_embeddings
+from modules.jobs import job_manager, JobQueueFull, STREAM_END
+from modules.screening import run_manual, run_auto, run_panel, run_upload, run_similar, run_substructure
+from modules.config import SIMILAR_MAX_K, SUBSTRUCTURE_MAX_RESULTS, ENRICH_PAGE_MAX
+from modules.explanations import get_explanation
+from modules.uploads import open_upload
+from modules.enrichment import enrich_smiles
 # ✅ FIX: Import correct instance
 from modules.llm_engine import llm_bot 
 
 router = APIRouter()
-model = load_ai_model("drug_model_v4.pt")
+# Model startup par load hota hai, import par nahi: featurizer ke spawn workers main.py (aur ye router) dobara import karte hain
+model = None
+
+def warm_up():
+    global model
+    llm_bot.start()
+    # ✅ Optimized backend (parity check ke baad), phir library drug_vec matrix ready (pehla scan fast rahe)
+    if model is None: model = prepare_inference_model(load_ai_model("drug_model_v4.pt"))
+    if model:
+        try: get_library_embeddings(model)
+        except Exception as e: print(f"⚠️ Embedding Warm-up Error: {e}")
+
+class PropertyFilters(BaseModel):
+    # Auto scan sirf in properties wale library molecules score karega (descriptor table se)
+    mw_min: Optional[float] = None
+    mw_max: Optional[float] = None
+    logp_min: Optional[float] = None
+    logp_max: Optional[float] = None
+    tpsa_min: Optional[float] = None
+    tpsa_max: Optional[float] = None
+    qed_min: Optional[float] = None
+    qed_max: Optional[float] = None
+    max_violations: Optional[int] = None
+    is_safe: Optional[bool] = None
 
 class DrugAnalysisRequest(BaseModel):
     target_id: str
     smiles: Optional[str] = None
     mode: str
+    background: bool = False  # True -> turant job_id, result /jobs/{job_id}/result se
+    top_k: Optional[int] = None  # Sirf best K hits (bounded heap, poori list sort nahi)
+    stream: Optional[str] = None  # "ndjson" | "sse" -> auto: har batch ke results, manual: AI explanation tokens
+    filters: Optional[PropertyFilters] = None  # Auto mode: property-filtered screening
+    defer_explanation: bool = True  # Manual: numbers turant, ai_explanation /explanations/{explanation_id} se
+    substructure: Optional[str] = None  # Auto mode: sirf is SMARTS / scaffold wale molecules score hon
+    substructure_type: str = "smarts"   # "smarts" | "smiles"
+
+STREAM_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+
+def _encode_event(payload, fmt):
+    data = json.dumps(payload)
+    if fmt == "sse": return f"event: {payload['type']}\ndata: {data}\n\n"
+    return data + "\n"
+
+def stream_job(job, fmt):
+    """Job ke partial results NDJSON lines / SSE events ki shakal mein; client chala jaye to job cancel."""
+    try:
+        yield _encode_event({"type": "job", "job_id": job.id}, fmt)
+        while True:
+            try:
+                item = job.stream.get(timeout=0.5)
+            except queue.Empty:
+                if job.finished and job.stream.empty(): break
+                continue
+            if item is STREAM_END: break
+            yield _encode_event(item, fmt)
+
+        result = job.result or {}
+        if job.state != "done" or "error" in result:
+            yield _encode_event({"type": "error", "error": result.get("error") or job.error or f"Job {job.state}."}, fmt)
+        else:
+            yield _encode_event({"type": "done", **result}, fmt)
+    finally:
+        if not job.finished: job.cancel()
+
+def submit_scan(kind, fn, background, *args, error_prefix=None, stream=None, **kwargs):
+    """
+    Scan ko job ke taur par chalata hai. background=True par job_id turant return,
+    stream par partial results ka StreamingResponse, warna request job khatam hone tak
+    wait karti hai (purana response format).
+    """
+    if stream and stream not in STREAM_MEDIA_TYPES:
+        return {"error": f"Unknown stream format '{stream}'. Use 'ndjson' or 'sse'."}
+    try:
+        job = job_manager.submit(kind, fn, model, *args, stream=bool(stream), **kwargs)
+    except JobQueueFull as e:
+        return {"error": str(e)}
+
+    if stream:
+        return StreamingResponse(stream_job(job, stream), media_type=STREAM_MEDIA_TYPES[stream])
+    if background:
+        return {"job_id": job.id, "status": job.status}
+
+    job.future.result()
+    if job.state == "failed":
+        return {"error": f"{error_prefix}: {job.error}" if error_prefix else job.error}
+    if job.state == "cancelled":
+        return {"error": "Scan was cancelled."}
+    return job.result
 
 # --- 1. ANALYZE ENDPOINT ---
 @router.post("/analyze")
 def analyze_drug(request: DrugAnalysisRequest):
-    SCAN_PROGRESS["current"] = 0
-    SCAN_PROGRESS["total"] = 1
-    SCAN_PROGRESS["status"] = "Validating..."
-    
-    start_time = time.time()
-    protein_seq = get_protein_sequence(request.target_id)
-    
-    if not protein_seq:
-        return {"error": f"Invalid Target ID '{request.target_id}' or Network Error"}
-
-    # --- MANUAL MODE ---
     if request.mode == 'manual':
-        SCAN_PROGRESS["status"] = "Processing..."
-        if not request.smiles: return {"error": "Input is missing!"}
-        
-        real_smiles, mol = get_smiles_from_input(request.smiles)
-        if not real_smiles or not mol:
-            return {"error": f"Could not find structure for '{request.smiles}'."}
-
-        is_smiles_input = request.smiles.strip() == real_smiles or len(request.smiles) > 20
-        display_name = f"Custom Ligand {str(int(time.time()))[-4:]}" if is_smiles_input else request.smiles
-
-        score = 0.0
-        status = "UNKNOWN"
-        data = process_data_object(real_smiles, protein_seq)
-        
-        if model and data:
-            try:
-                batch = Batch.from_data_list([data])
-                with torch.no_grad():
-                    raw = model(batch.to(DEVICE)).item()
-                    score = round(max(4.0, min(12.0, raw)), 2)
-                    status = "ACTIVE" if score > 7.5 else "INACTIVE"
-            except: status = "MODEL ERROR"
-        
-        admet_data = calculate_admet_properties(mol)
-        confidence_val = calculate_confidence(score, threshold=7.5)
-        pharmacophore_data = get_pharmacophore_data(mol)
-
-        # ✅ FIX: Correct AI Call using the new class method
-        drug_data_for_ai = {
-            "name": display_name,
-            "smiles": real_smiles,
-            "score": score,
-            "admet": admet_data,
-            "active_sites": pharmacophore_data
-        }
-        ai_explanation = llm_bot.analyze_drug(drug_data_for_ai, request.target_id)
-
-        SCAN_PROGRESS["current"] = 1
-        SCAN_PROGRESS["status"] = "Done"
-
-        return {
-            "name": display_name,
-            "smiles": real_smiles,
-            "score": score,
-            "status": status,
-            "confidence": confidence_val,
-            "color": "#00f3ff" if status == "ACTIVE" else "#ff0055",
-            "admet": admet_data,
-            "active_sites": pharmacophore_data,
-            "ai_explanation": ai_explanation
-        }
-
-    # --- AUTO MODE ---
+        return submit_scan("manual", run_manual, request.background, request.target_id, request.smiles,
+                           stream=request.stream, defer_explanation=request.defer_explanation)
     elif request.mode == 'auto':
-        SCAN_PROGRESS["status"] = "Fetching DB..."
-        all_drugs = get_all_drugs()
-        SCAN_PROGRESS["total"] = len(all_drugs)
-        
-        data_list = []
-        valid_indices = []
-        
-        SCAN_PROGRESS["status"] = "Analyzing..."
-        for i, drug in enumerate(all_drugs):
-            d_obj = process_data_object(drug['smiles'], protein_seq)
-            if d_obj:
-                data_list.append(d_obj)
-                valid_indices.append(i)
-            
-            if i % 50 == 0:
-                SCAN_PROGRESS["current"] = i
-
-        results = []
-        all_scores = []
-        
-        SCAN_PROGRESS["status"] = "Inference..."
-        if model and data_list:
-            loader = DataLoader(data_list, batch_size=64, shuffle=False)
-            with torch.no_grad():
-                for batch in loader:
-                    try:
-                        all_scores.extend(model(batch.to(DEVICE)).view(-1).tolist())
-                    except: all_scores.extend([0.0]*batch.num_graphs)
-        
-        SCAN_PROGRESS["current"] = len(all_drugs)
-        SCAN_PROGRESS["status"] = "Finalizing..."
-
-        for idx, score_val in zip(valid_indices, all_scores):
-            final_score = round(max(4.0, min(12.0, score_val)), 2)
-            results.append({
-                "name": all_drugs[idx]["name"],
-                "smiles": all_drugs[idx]["smiles"],
-                "score": final_score,
-                "confidence": calculate_confidence(final_score),
-                "status": "ACTIVE" if final_score > 7.5 else "INACTIVE",
-                "color": "#00f3ff" if final_score > 7.5 else "#ff0055"
-            })
-            
-        results.sort(key=lambda x: x["score"], reverse=True)
-        SCAN_PROGRESS["status"] = "Done"
-        return {"results": results, "scan_time": round(time.time() - start_time, 2)}
+        filters = request.filters.dict(exclude_none=True) if request.filters else None
+        return submit_scan("auto", run_auto, request.background, request.target_id,
+                           top_k=request.top_k, stream=request.stream, filters=filters,
+                           substructure=request.substructure, substructure_type=request.substructure_type)
+    return {"error": f"Unknown mode '{request.mode}'"}
+
+
+class PanelRequest(BaseModel):
+    target_ids: List[str]   # e.g. kinase selectivity panel
+    rank_by: str = "max"    # "max" | "mean" | panel ka target ID (selectivity)
+    top_k: Optional[int] = None
+    filters: Optional[PropertyFilters] = None
+    background: bool = False
+    stream: Optional[str] = None
+
+# --- 1b. PANEL ENDPOINT (drug x target score matrix) ---
+@router.post("/panel")
+def panel_screen(request: PanelRequest):
+    filters = request.filters.dict(exclude_none=True) if request.filters else None
+    return submit_scan("panel", run_panel, request.background, request.target_ids,
+                       top_k=request.top_k, stream=request.stream, filters=filters, rank_by=request.rank_by)
+
+
+class SimilarRequest(BaseModel):
+    smiles: str                         # SMILES ya drug name (e.g. /analyze ka hit)
+    top_k: int = 20
+    threshold: float = 0.0              # minimum Tanimoto similarity (0-1)
+    target_id: Optional[str] = None     # diya ho to neighbours isi target par score bhi
+    exclude_query: bool = True
+    background: bool = False
+
+# --- 1c. SIMILARITY SEARCH (Morgan fingerprints, Tanimoto) ---
+@router.post("/similar")
+def similar_compounds(request: SimilarRequest):
+    if not 1 <= request.top_k <= SIMILAR_MAX_K:
+        return {"error": f"top_k must be between 1 and {SIMILAR_MAX_K}."}
+    if not 0.0 <= request.threshold <= 1.0:
+        return {"error": "threshold must be between 0 and 1."}
+    return submit_scan("similar", run_similar, request.background, request.smiles, request.target_id,
+                       top_k=request.top_k, threshold=request.threshold, exclude_query=request.exclude_query)
+
+
+class SubstructureRequest(BaseModel):
+    pattern: str                        # SMARTS (e.g. "c1ccccc1S(=O)(=O)N") ya SMILES scaffold
+    query_type: str = "smarts"          # "smarts" | "smiles"
+    limit: int = 100                    # kitne matching compounds list mein (count hamesha poora)
+    background: bool = False
+
+# --- 1d. SUBSTRUCTURE SEARCH (pattern fingerprint prefilter + exact match) ---
+@router.post("/substructure")
+def substructure_search(request: SubstructureRequest):
+    if not 1 <= request.limit <= SUBSTRUCTURE_MAX_RESULTS:
+        return {"error": f"limit must be between 1 and {SUBSTRUCTURE_MAX_RESULTS}."}
+    return submit_scan("substructure", run_substructure, request.background, request.pattern,
+                       query_type=request.query_type, limit=request.limit)
 
 
 # --- 2. UPLOAD ENDPOINT ---
 @router.post("/upload")
-def upload_file(target_id: str = Form(...), file: UploadFile = File(...)):
-    SCAN_PROGRESS["current"] = 0
-    SCAN_PROGRESS["total"] = 1
-    SCAN_PROGRESS["status"] = "Reading File..."
-    
-    protein_seq = get_protein_sequence(target_id)
-    if not protein_seq: return {"error": "Invalid Target ID"}
-
-    start_time = time.time()
-    results = []
-
+def upload_file(target_id: str = Form(...), file: UploadFile = File(...), background: bool = Form(False),
+                top_k: Optional[int] = Form(None), stream: Optional[str] = Form(None)):
+    # File disk par spool hoti hai aur job usay chunks mein parse karta hai (.gz stream-decompress, Parquet bhi)
     try:
-        contents = file.file.read()
-        if file.filename.endswith('.csv'):
-            df = pd.read_csv(io.BytesIO(contents))
-        elif file.filename.endswith('.txt'):
-            df = pd.read_csv(io.BytesIO(contents), sep='\t')
-        else:
-            return {"error": "Invalid format. Only .csv or .txt allowed."}
-
-        df.columns = [c.lower().strip() for c in df.columns]
-        if 'smiles' not in df.columns: return {"error": "Column 'smiles' not found!"}
-        if 'name' not in df.columns: df['name'] = [f"Drug_{i}" for i in range(len(df))]
-
-        drugs_data = df.to_dict(orient='records')
-        SCAN_PROGRESS["total"] = len(drugs_data)
-        SCAN_PROGRESS["status"] = "Analyzing Batch..."
-        
-        data_list = []
-        valid_indices = []
-
-        for i, row in enumerate(drugs_data):
-            d_obj = process_data_object(row['smiles'], protein_seq)
-            if d_obj:
-                data_list.append(d_obj)
-                valid_indices.append(i)
-            if i % 10 == 0:
-                SCAN_PROGRESS["current"] = i
-
-        if not data_list: return {"error": "No valid molecules found."}
-
-        all_scores = []
-        if model and data_list:
-            loader = DataLoader(data_list, batch_size=64, shuffle=False)
-            with torch.no_grad():
-                for batch in loader:
-                    try:
-                        all_scores.extend(model(batch.to(DEVICE)).view(-1).tolist())
-                    except: all_scores.extend([0.0]*batch.num_graphs)
-        else: all_scores = [0.0] * len(data_list)
-
-        SCAN_PROGRESS["current"] = len(drugs_data)
-        SCAN_PROGRESS["status"] = "Done"
-
-        for idx, score_val in zip(valid_indices, all_scores):
-            final_score = round(max(4.0, min(12.0, score_val)), 2)
-            row = drugs_data[idx]
-            
-            admet_data = {}
-            active_sites = [] 
-
-            if final_score > 7.5:
-                mol = Chem.MolFromSmiles(row['smiles'])
-                admet_data = calculate_admet_properties(mol)
-                active_sites = get_pharmacophore_data(mol)
-
-            results.append({
-                "name": str(row['name']),
-                "smiles": str(row['smiles']),
-                "score": final_score,
-                "confidence": calculate_confidence(final_score),
-                "status": "ACTIVE" if final_score > 7.5 else "INACTIVE",
-                "color": "#00f3ff" if final_score > 7.5 else "#ff0055",
-                "admet": admet_data,
-                "active_sites": active_sites 
-            })
-
-        results.sort(key=lambda x: x["score"], reverse=True)
-        return {"results": results, "scan_time": round(time.time() - start_time, 2)}
-
+        source = open_upload(file)
+    except ValueError as e:
+        return {"error": str(e)}
     except Exception as e:
         print(f"❌ Upload Error: {e}")
         return {"error": f"Failed to process file: {str(e)}"}
 
+    response = submit_scan("upload", run_upload, background, target_id, source,
+                           error_prefix="Failed to process file", top_k=top_k, stream=stream)
+    if isinstance(response, dict) and "error" in response: source.close()
+    return response
+
+
+class EnrichRequest(BaseModel):
+    smiles: List[str]   # jo hits user dekh raha hai (e.g. stream mode ka current page)
+
+# --- 2b. HIT ENRICHMENT (ADMET + pharmacophores on demand, memoized per canonical SMILES) ---
+@router.post("/enrich")
+def enrich_hits(request: EnrichRequest):
+    if len(request.smiles) > ENRICH_PAGE_MAX:
+        return {"error": f"At most {ENRICH_PAGE_MAX} molecules per request."}
+    return {"results": [{"smiles": smi, **detail} for smi, detail in zip(request.smiles, enrich_smiles(request.smiles))]}
+
 
 class ChatRequest(BaseModel):
     question: str
@@ -237,6 +209,33 @@ class ChatRequest(BaseModel):
 
 @router.post("/chat_drug")
 async def chat_drug(request: ChatRequest):
-    # ✅ FIX: Call instance method
-    answer = llm_bot.chat_with_drug(request.question, request.drug_context)
-    return {"answer": answer}
\ No newline at end of file
+    # ✅ Engine ke apne event loop par (uvicorn loop completion ke dauran free rehta hai)
+    answer = await llm_bot.run_async(llm_bot.chat_with_drug_async(request.question, request.drug_context))
+    return {"answer": answer}
+
+@router.post("/chat_drug/stream")
+def chat_drug_stream(request: ChatRequest):
+    # Server-sent events: "token" har naye text chunk par, "done" poore answer ke sath
+    events = llm_bot.chat_with_drug_stream(request.question, request.drug_context)
+    return StreamingResponse((_encode_event(event, "sse") for event in events),
+                             media_type=STREAM_MEDIA_TYPES["sse"])
+
+
+# --- DEFERRED AI EXPLANATION (manual /analyze ka explanation_id) ---
+@router.get("/explanations/{explanation_id}")
+def explanation_status(explanation_id: str):
+    explanation = get_explanation(explanation_id)
+    if not explanation:
+        return JSONResponse(status_code=404, content={"error": f"Explanation '{explanation_id}' not found."})
+    if not explanation.done:
+        return JSONResponse(status_code=202, content=explanation.status())
+    return explanation.status()
+
+@router.get("/explanations/{explanation_id}/stream")
+def explanation_stream(explanation_id: str):
+    # SSE: ab tak ke token/section events replay, phir live, aakhir mein "done"
+    explanation = get_explanation(explanation_id)
+    if not explanation:
+        return JSONResponse(status_code=404, content={"error": f"Explanation '{explanation_id}' not found."})
+    return StreamingResponse((_encode_event(event, "sse") for event in explanation.iter_events()),
+                             media_type=STREAM_MEDIA_TYPES["sse"])
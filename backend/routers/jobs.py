@@ -0,0 +1,49 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from modules.jobs import job_manager
+from modules.enrichment import enrich_page
+from modules.config import ENRICH_PAGE_MAX
+
+router = APIRouter()
+
+def _not_found(job_id):
+    return JSONResponse(status_code=404, content={"error": f"Job '{job_id}' not found or expired."})
+
+@router.get("/jobs")
+def list_jobs():
+    return {"jobs": [job.progress() for job in list(job_manager.jobs.values())]}
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if not job: return _not_found(job_id)
+    return job.progress()
+
+@router.get("/jobs/{job_id}/result")
+def get_job_result(job_id: str):
+    job = job_manager.get(job_id)
+    if not job: return _not_found(job_id)
+    if not job.finished:
+        return JSONResponse(status_code=202, content=job.progress())
+    if job.state != "done":
+        return {"error": job.error or f"Job {job.state}."}
+    return job.result
+
+@router.get("/jobs/{job_id}/hits")
+def get_job_hits(job_id: str, page: int = 0, page_size: int = 20):
+    """Finished scan ke results ka ek page, ADMET + pharmacophores ke sath (sirf isi page ke liye compute, memoized)."""
+    job = job_manager.get(job_id)
+    if not job: return _not_found(job_id)
+    if not job.finished:
+        return JSONResponse(status_code=202, content=job.progress())
+    if job.state != "done" or "error" in (job.result or {}):
+        return {"error": job.error or (job.result or {}).get("error") or f"Job {job.state}."}
+    if page < 0 or not 1 <= page_size <= ENRICH_PAGE_MAX:
+        return {"error": f"page must be >= 0 and page_size between 1 and {ENRICH_PAGE_MAX}."}
+    return {"job_id": job_id, **enrich_page(job.result.get("results") or [], page, page_size)}
+
+@router.delete("/jobs/{job_id}")
+def cancel_job(job_id: str):
+    job = job_manager.cancel(job_id)
+    if not job: return _not_found(job_id)
+    return job.progress()
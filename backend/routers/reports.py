@@ -1,7 +1,10 @@
 from fastapi import APIRouter, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
-from modules.report_generator import generate_pdf
+from typing import Optional, Dict, Any, List
+from modules.report_generator import generate_pdf, generate_combined_pdf, iter_report_zip, bulk_report_rows
+from modules.jobs import job_manager
+from modules.config import REPORT_MAX
 
 router = APIRouter()
 
@@ -21,4 +24,43 @@ def download_pdf(report_data: ReportRequest):
         content=pdf_buffer.getvalue(),
         media_type="application/pdf",
         headers={"Content-Disposition": f"attachment; filename=BioGraph_Report_{data_dict['name']}.pdf"}
-    )
\ No newline at end of file
+    )
+
+class BulkReportRequest(BaseModel):
+    target_id: Optional[str] = None  # Panel results mein har row ka best_target use hota hai
+    job_id: Optional[str] = None  # Finished scan job ka result set...
+    results: Optional[List[Dict[str, Any]]] = None  # ...ya seedha result rows (frontend ke paas jo hain)
+    top_n: int = 100
+    format: str = "zip"  # "zip" (ek PDF per hit) | "pdf" (ek combined multi-page PDF)
+
+@router.post("/download_reports")
+def download_reports(request: BulkReportRequest):
+    # ✅ Top-N hits ki reports ek request mein (process pool, streamed response)
+    if request.format not in ("zip", "pdf"):
+        return {"error": f"Unknown format '{request.format}'. Use 'zip' or 'pdf'."}
+
+    results = request.results
+    if request.job_id:
+        job = job_manager.get(request.job_id)
+        if not job: return {"error": f"Job '{request.job_id}' not found or expired."}
+        if not job.finished: return {"error": "Scan is still running."}
+        results = (job.result or {}).get("results") if job.state == "done" else None
+    if not results:
+        return {"error": "No results to export."}
+
+    rows = bulk_report_rows(results, request.target_id, max(1, min(request.top_n, REPORT_MAX)))
+    if not rows:
+        return {"error": "No results to export."}
+
+    if request.format == "pdf":
+        pdf_buffer = generate_combined_pdf(rows)
+        return StreamingResponse(
+            iter(lambda: pdf_buffer.read(64 * 1024), b""),
+            media_type="application/pdf",
+            headers={"Content-Disposition": f"attachment; filename=BioGraph_Reports_Top{len(rows)}.pdf"}
+        )
+    return StreamingResponse(
+        iter_report_zip(rows),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename=BioGraph_Reports_Top{len(rows)}.zip"}
+    )
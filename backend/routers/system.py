@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Response
-from rdkit.Chem import Draw
+from fastapi import APIRouter, Response, Header
+from pydantic import BaseModel
 from urllib.parse import unquote
-from modules.chemistry import get_smiles_from_input
-from modules.state import SCAN_PROGRESS # ✅ IMPORTED SHARED STATE
+from modules.rendering import DEFAULT_SIZE, render_options, render_key, canonicalize_input, depict
+from modules.config import RENDER_MAX_AGE, RENDER_BATCH_LIMIT
+from typing import Optional, List
+from modules.jobs import job_manager # ✅ Per-job progress
+from modules.database import get_drugs_page, count_drugs
 
 router = APIRouter()
 
@@ -11,27 +14,64 @@ def read_root():
     return {"status": "online", "message": "BioGraph Engine is Modular & Ready"}
 
 @router.get("/progress")
-def get_progress():
-    # ✅ Ab ye wahi progress dikhayega jo analysis.py update karega
-    if SCAN_PROGRESS["total"] == 0:
+def get_progress(job_id: Optional[str] = None):
+    # ✅ Sirf diye gaye job_id ka progress; "sab se recent scan" kisi aur user ka bhi ho sakta hai
+    job = job_manager.get(job_id) if job_id else None
+    if not job:
         return {"progress": 0, "status": "Idle"}
-    
-    perc = int((SCAN_PROGRESS["current"] / SCAN_PROGRESS["total"]) * 100)
-    return {"progress": perc, "status": SCAN_PROGRESS["status"]}
+    return job.progress()
+
+def _etag_matches(if_none_match, etag):
+    if not if_none_match: return False
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return "*" in tags or f'"{etag}"' in tags
+
+@router.get("/library")
+def list_library(after_id: int = 0, limit: int = 100):
+    # ✅ Keyset pagination: next_after_id agle page ke liye bhejo (None = aakhri page)
+    limit = max(1, min(limit, 1000))
+    drugs, next_after_id = get_drugs_page(after_id, limit)
+    return {"drugs": drugs, "next_after_id": next_after_id, "total": count_drugs()}
 
 @router.get("/molecule_image")
-def get_molecule_image(smiles: str):
+def get_molecule_image(smiles: str, width: int = DEFAULT_SIZE, height: Optional[int] = None,
+                       if_none_match: Optional[str] = Header(None)):
+    # ✅ Cached SVG (canonical SMILES + size); ETag = render key, repeat requests 304 (render nahi)
     try:
         decoded_smiles = unquote(smiles).strip()
-        real_smiles, mol = get_smiles_from_input(decoded_smiles)
+        canonical = canonicalize_input(decoded_smiles)
         
-        if not mol: return Response(content="Invalid SMILES", status_code=400)
+        if not canonical: return Response(content="Invalid SMILES", status_code=400)
         
-        drawer = Draw.MolDraw2DSVG(400, 400)
-        opts = drawer.drawOptions()
-        opts.setBackgroundColour((0,0,0,0))
-        drawer.DrawMolecule(mol)
-        drawer.FinishDrawing()
-        return Response(content=drawer.GetDrawingText(), media_type="image/svg+xml")
+        options = render_options(width, height)
+        etag = render_key(canonical, options)
+        headers = {"ETag": f'"{etag}"', "Cache-Control": f"public, max-age={RENDER_MAX_AGE}"}
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+
+        _, svg = depict([canonical], options)[canonical]
+        if not svg: return Response(content="Could not render molecule", status_code=400)
+        return Response(content=svg, media_type="image/svg+xml", headers=headers)
     except Exception as e:
-        return Response(content=str(e), status_code=400)
\ No newline at end of file
+        return Response(content=str(e), status_code=400)
+
+class MoleculeImagesRequest(BaseModel):
+    smiles: List[str]
+    width: int = DEFAULT_SIZE
+    height: Optional[int] = None
+
+@router.post("/molecule_images")
+def get_molecule_images(request: MoleculeImagesRequest):
+    """Results table ke liye: bohat si depictions ek response mein (input order), misses ek batch mein render."""
+    if len(request.smiles) > RENDER_BATCH_LIMIT:
+        return {"error": f"Too many molecules ({len(request.smiles)}). Limit is {RENDER_BATCH_LIMIT} per request."}
+    options = render_options(request.width, request.height)
+    canonical = [canonicalize_input(s) if s and s.strip() else None for s in request.smiles]
+    rendered = depict([c for c in canonical if c], options)
+
+    images = []
+    for raw, key in zip(request.smiles, canonical):
+        etag, svg = rendered.get(key, (None, None))
+        if svg: images.append({"input": raw, "smiles": key, "etag": etag, "svg": svg})
+        else: images.append({"input": raw, "error": "Invalid SMILES"})
+    return {"images": images, "width": options[0], "height": options[1]}
\ No newline at end of file
@@ -0,0 +1,71 @@
+# File: backend/tests/conftest.py
+
+import os
+import sys
+import tempfile
+
+# Cache (graph store, scores, depictions...) test ke liye alag folder - modules.config import se pehle
+os.environ.setdefault("BIOGRAPH_CACHE_DIR", tempfile.mkdtemp(prefix="biograph-test-cache-"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+# Chhota drug-like set: rings, hetero atoms, charges, stereo, salts (multi-fragment) sab shamil
+SMILES = [
+    "CC(=O)Oc1ccccc1C(=O)O",               # aspirin
+    "CC(=O)Nc1ccc(O)cc1",                  # paracetamol
+    "CN1C=NC2=C1C(=O)N(C(=O)N2C)C",        # caffeine
+    "CC(C)Cc1ccc(cc1)C(C)C(=O)O",          # ibuprofen
+    "CN(C)C(=N)N=C(N)N",                   # metformin
+    "O=C(O)c1ccccc1O",                     # salicylic acid
+    "c1ccc2c(c1)ccc1ccccc12",              # phenanthrene
+    "C1CCCCC1",
+    "c1ccncc1",
+    "OCC",
+    "CCO",
+    "C[C@H](N)C(=O)O",                     # L-alanine
+    "C[C@@H](N)C(=O)O",                    # D-alanine
+    "Nc1ccc(cc1)S(=O)(=O)Nc1ncccn1",       # sulfadiazine
+    "CC12CCC3C(CCC4=CC(=O)CCC34C)C1CCC2O", # testosterone
+    "O=C1NC(=O)C(N1)(c1ccccc1)c1ccccc1",   # phenytoin
+    "CN1CCC[C@H]1c1cccnc1",                # nicotine
+    "Clc1ccc(cc1)C(c1ccccc1)N1CCN(CC1)C",  # chlorcyclizine
+    "[Na+].[O-]C(=O)c1ccccc1",             # sodium benzoate
+    "OC(=O)CC(O)(CC(O)=O)C(O)=O",          # citric acid
+    "FC(F)(F)c1ccc(Oc2ccc(cc2)[N+](=O)[O-])cc1",
+    "Brc1ccc(cc1)C(=O)O",
+    "Ic1ccccc1",
+    "P(=O)(O)(O)OC",
+    "C#N",
+    "CC(C)(C)c1ccc(O)cc1",
+    "COc1ccc2[nH]cc(CCN(C)C)c2c1",
+    "NC(=O)c1cccnc1",                      # nicotinamide
+    "OC[C@H]1OC(O)[C@H](O)[C@@H](O)[C@@H]1O",  # glucose
+    "C1=CC=C(C=C1)C2=CC=CC=C2",            # biphenyl
+]
+
+@pytest.fixture
+def smiles():
+    return list(SMILES)
+
+@pytest.fixture
+def drug_db(tmp_path, monkeypatch):
+    """Khali drugs.db (temp folder) - asal library ko koi test nahi chhoota."""
+    import modules.database as database
+    database.close_connection()
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "drugs.db"))
+    monkeypatch.setattr(database, "TXT_PATH", str(tmp_path / "drugs.txt"))  # synonyms seed skip
+    conn = database.get_connection()
+    with conn:
+        conn.execute('''
+            CREATE TABLE drugs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                smiles TEXT NOT NULL,
+                canonical_smiles TEXT,
+                inchikey TEXT
+            )
+        ''')
+    database.ensure_name_index()
+    yield database
+    database.close_connection()
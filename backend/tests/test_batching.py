@@ -0,0 +1,46 @@
+# File: backend/tests/test_batching.py
+
+import numpy as np
+import torch
+from rdkit import Chem
+from torch_geometric.data import Batch, Data
+
+from modules.batching import GraphCSR, collate
+from modules.chemistry import ATOM_DICT, featurize_smiles
+
+def reference_data(smiles):
+    # Purana per-molecule path (process_data_object): x = atom type ids, har bond i->j phir j->i
+    mol = Chem.MolFromSmiles(smiles)
+    x = torch.tensor([ATOM_DICT.get(atom.GetSymbol(), 9) for atom in mol.GetAtoms()], dtype=torch.long)
+    src, dst = [], []
+    for bond in mol.GetBonds():
+        i, j = bond.GetBeginAtomIdx(), bond.GetEndAtomIdx()
+        src += [i, j]; dst += [j, i]
+    return Data(x=x, edge_index=torch.tensor([src, dst], dtype=torch.long).reshape(2, -1))
+
+def test_collate_matches_pyg_batch(smiles):
+    csr = GraphCSR.from_graphs([featurize_smiles(s) for s in smiles])
+    ours = collate(csr)
+    ref = Batch.from_data_list([reference_data(s) for s in smiles])
+
+    assert ours.num_graphs == ref.num_graphs
+    assert torch.equal(ours.x, ref.x)
+    assert torch.equal(ours.edge_index, ref.edge_index)  # edge order bhi same (GAT sums order-sensitive)
+    assert torch.equal(ours.batch, ref.batch)
+
+def test_collate_after_take_and_slice_matches_pyg(smiles):
+    csr = GraphCSR.from_graphs([featurize_smiles(s) for s in smiles])
+    rows = [5, 0, 17, 17, 3, 29]
+    for part, picked in ((csr.take(rows), [smiles[r] for r in rows]), (csr.slice(4, 11), smiles[4:11])):
+        ref = Batch.from_data_list([reference_data(s) for s in picked])
+        ours = collate(part)
+        assert torch.equal(ours.x, ref.x)
+        assert torch.equal(ours.edge_index, ref.edge_index)
+        assert torch.equal(ours.batch, ref.batch)
+
+def test_collate_handles_bondless_graphs():
+    csr = GraphCSR.from_graphs([featurize_smiles(s) for s in ("[Na+]", "CCO", "C")])
+    ours = collate(csr)
+    ref = Batch.from_data_list([reference_data(s) for s in ("[Na+]", "CCO", "C")])
+    assert torch.equal(ours.edge_index, ref.edge_index)
+    assert np.array_equal(ours.batch.numpy(), [0, 1, 1, 1, 2])
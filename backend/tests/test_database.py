@@ -0,0 +1,94 @@
+# File: backend/tests/test_database.py
+
+import pytest
+from rdkit import Chem
+from rdkit.Chem import Descriptors, Lipinski, QED
+
+from modules.ingest import ingest_records
+
+FILTERS = [
+    {"mw_max": 200},
+    {"mw_min": 150, "logp_max": 2.5},
+    {"tpsa_min": 40, "tpsa_max": 90, "qed_min": 0.5},
+    {"is_safe": True},
+    {"is_safe": False, "mw_min": None},
+    {"max_violations": 0, "logp_min": 1.0},
+    {"qed_max": 0.3},
+]
+
+# filter key -> (raw RDKit value, predicate); reference poori tarah Python mein
+PREDICATES = {
+    "mw_min": (Descriptors.MolWt, lambda v, x: v >= x), "mw_max": (Descriptors.MolWt, lambda v, x: v <= x),
+    "logp_min": (Descriptors.MolLogP, lambda v, x: v >= x), "logp_max": (Descriptors.MolLogP, lambda v, x: v <= x),
+    "tpsa_min": (Descriptors.TPSA, lambda v, x: v >= x), "tpsa_max": (Descriptors.TPSA, lambda v, x: v <= x),
+    "qed_min": (QED.qed, lambda v, x: v >= x), "qed_max": (QED.qed, lambda v, x: v <= x),
+}
+
+def violations(mol):
+    return sum([Descriptors.MolWt(mol) > 500, Descriptors.MolLogP(mol) > 5,
+                Lipinski.NumHDonors(mol) > 5, Lipinski.NumHAcceptors(mol) > 10])
+
+def reference_match(smiles, filters):
+    mol = Chem.MolFromSmiles(smiles)
+    for key, value in filters.items():
+        if value is None: continue
+        if key == "max_violations": ok = violations(mol) <= value
+        elif key == "is_safe": ok = (violations(mol) <= 1 and QED.qed(mol) > 0.4) == value
+        else:
+            fn, pred = PREDICATES[key]
+            ok = pred(fn(mol), value)
+        if not ok: return False
+    return True
+
+def all_rows(database):
+    return [{"id": r[0], "name": r[1], "smiles": r[2]}
+            for r in database.get_connection().execute("SELECT id, name, smiles FROM drugs ORDER BY id")]
+
+@pytest.fixture
+def library(drug_db, smiles):
+    ingest_records([(f"drug_{i}", smi, "s") for i, smi in enumerate(smiles)], refresh=False)
+    conn = drug_db.get_connection()
+    with conn:
+        # id gaps (deleted rows) + ek invalid molecule ('' canonical: descriptor join se bahar)
+        conn.execute("DELETE FROM drugs WHERE id IN (3, 4, 11)")
+        conn.execute("INSERT INTO drugs (name, smiles, canonical_smiles) VALUES ('broken', 'C1CC', '')")
+    drug_db.refresh_descriptor_table()
+    return drug_db
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 1000])
+def test_keyset_pages_cover_table_in_id_order(library, chunk_size):
+    pages = list(library.iter_drugs(chunk_size=chunk_size))
+    assert all(0 < len(page) <= chunk_size for page in pages)
+    assert [d for page in pages for d in page] == all_rows(library)
+
+def test_get_drugs_page_cursor(library):
+    rows = all_rows(library)
+    page, cursor = library.get_drugs_page(after_id=0, limit=5)
+    assert page == rows[:5] and cursor == rows[4]["id"]
+    page, cursor = library.get_drugs_page(after_id=rows[-3]["id"], limit=5)
+    assert page == rows[-2:] and cursor is None
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_filtered_scan_matches_python_reference(library, filters):
+    expected = [d for d in all_rows(library) if d["name"] != "broken" and reference_match(d["smiles"], filters)]
+    got = [d for page in library.iter_drugs(chunk_size=4, filters=filters) for d in page]
+    assert got == expected
+    assert library.count_drugs(filters) == len(expected)
+
+    # Sirf kuch canonical keys (substructure hits jaisa) + wahi filters
+    keys = [Chem.MolToSmiles(Chem.MolFromSmiles(d["smiles"])) for d in all_rows(library)[::2] if d["name"] != "broken"]
+    subset = [d for d in expected if Chem.MolToSmiles(Chem.MolFromSmiles(d["smiles"])) in keys]
+    assert [d for page in library.iter_drugs_by_canonical(keys, chunk_size=3, filters=filters) for d in page] == subset
+    assert library.count_drugs_by_canonical(keys, filters) == len(subset)
+
+def test_filter_clause_is_parameterized(library):
+    where, params = library.filter_clause({"mw_min": 100, "is_safe": True, "qed_max": None})
+    assert where == "mw >= ? AND is_safe = ?" and params == [100, 1]
+    assert library.filter_clause(None) == ("1", [])
+
+def test_unknown_filter_fails_before_scan(library):
+    with pytest.raises(ValueError, match="Unknown filter"):
+        library.iter_drugs(filters={"mw_min; DROP TABLE drugs": 1})
+    with pytest.raises(ValueError, match="Unknown filter"):
+        library.iter_drugs_by_canonical(["CCO"], filters={"color": "red"})
+    assert library.count_drugs() == len(all_rows(library))
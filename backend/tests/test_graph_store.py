@@ -0,0 +1,64 @@
+# File: backend/tests/test_graph_store.py
+
+import numpy as np
+
+from modules.featurizer import featurize_chunk
+from modules.graph_store import GraphStore
+
+def signature(atoms, bonds):
+    # Atom order pehle dekhe gaye SMILES jaisa hota hai ("OCC" vs "CCO") - order-independent compare
+    atoms = np.asarray(atoms)
+    return sorted(atoms.tolist()), sorted(tuple(sorted(atoms[list(b)].tolist())) for b in np.asarray(bonds))
+
+def assert_graph(store, smiles):
+    row = store.lookup(smiles)
+    assert row is not None
+    assert signature(*store.get_graph(row)) == signature(*featurize_chunk([smiles]).graph(0))
+
+def test_refresh_lookup_and_reload(tmp_path, smiles):
+    store = GraphStore(str(tmp_path))
+    added = store.refresh(smiles + ["not_a_smiles"])
+    assert added == len(smiles) - 1  # "OCC" aur "CCO" ek hi canonical key
+    assert store.lookup("OCC") == store.lookup("CCO")
+    assert "not_a_smiles" in store.invalid
+
+    reloaded = GraphStore(str(tmp_path))
+    assert reloaded.keys == store.keys and reloaded.aliases == store.aliases and reloaded.invalid == store.invalid
+    for smi in smiles: assert_graph(reloaded, smi)
+    assert reloaded.refresh(smiles) == 0
+
+def test_incremental_refresh_appends_rows(tmp_path, smiles):
+    store = GraphStore(str(tmp_path))
+    store.refresh(smiles[:10])
+    first = list(store.keys)
+    store.refresh(smiles)
+    assert store.keys[:len(first)] == first  # row order stable (embeddings / fingerprints aligned rehte hain)
+    reloaded = GraphStore(str(tmp_path))
+    for smi in smiles: assert_graph(reloaded, smi)
+
+def test_torn_append_is_ignored_and_truncated(tmp_path, smiles):
+    store = GraphStore(str(tmp_path))
+    store.refresh(smiles[:10])
+    committed = list(store.keys)
+    # Crash: data files mein naye bytes likhe gaye, lekin index.json replace nahi hua
+    for name in ("atoms.bin", "bonds.bin", "atom_ptr.bin", "bond_ptr.bin", "keys.txt", "aliases.jsonl"):
+        with open(tmp_path / name, "ab") as f: f.write(b"\x07" * 37)
+
+    recovered = GraphStore(str(tmp_path))
+    assert recovered.keys == committed
+    assert len(recovered.arrays["atom_ptr"]) == len(committed) + 1
+
+    recovered.refresh(smiles)
+    reloaded = GraphStore(str(tmp_path))
+    assert reloaded.keys == recovered.keys
+    for smi in smiles: assert_graph(reloaded, smi)
+
+def test_inconsistent_files_trigger_rebuild(tmp_path, smiles):
+    GraphStore(str(tmp_path)).refresh(smiles[:5])
+    with open(tmp_path / "keys.txt", "r+b") as f: f.truncate(10)
+    rebuilt = GraphStore(str(tmp_path))
+    assert len(rebuilt) == 0
+    rebuilt.refresh(smiles[:3])
+    reloaded = GraphStore(str(tmp_path))
+    assert len(reloaded) == 3
+    for smi in smiles[:3]: assert_graph(reloaded, smi)
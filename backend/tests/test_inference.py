@@ -0,0 +1,74 @@
+# File: backend/tests/test_inference.py
+
+import numpy as np
+import pytest
+import torch
+
+from modules.batching import GraphCSR, budget_ranges
+from modules.chemistry import featurize_smiles
+from modules.inference import _iter_budgeted
+
+def reference_ranges(atoms, bonds, max_nodes, max_edges, max_graphs):
+    # Greedy, ek ek graph: budget (nodes, 2*bonds, graphs) poora hone tak add karo; akela bada graph bhi apna batch
+    ranges, lo = [], 0
+    while lo < len(atoms):
+        hi, n, e = lo, 0, 0
+        while hi < len(atoms) and (hi == lo or (n + atoms[hi] <= max_nodes and e + 2 * bonds[hi] <= max_edges
+                                                and hi - lo < max_graphs)):
+            n += atoms[hi]; e += 2 * bonds[hi]; hi += 1
+        ranges.append((lo, hi))
+        lo = hi
+    return ranges
+
+@pytest.mark.parametrize("budget", [(1, 1, 1), (30, 40, 64), (60, 200, 4), (10_000, 16, 64), (1000, 1000, 1000)])
+def test_budget_ranges_match_greedy_reference(budget):
+    rng = np.random.default_rng(7)
+    atoms = rng.integers(1, 40, size=200)
+    bonds = rng.integers(0, 45, size=200)
+    csr = GraphCSR(np.zeros(atoms.sum(), dtype=np.uint8), np.zeros((bonds.sum(), 2), dtype=np.uint16),
+                   np.concatenate([[0], np.cumsum(atoms)]), np.concatenate([[0], np.cumsum(bonds)]))
+    assert list(budget_ranges(csr, *budget)) == reference_ranges(atoms, bonds, *budget)
+
+def _csr(smiles):
+    return GraphCSR.from_graphs([featurize_smiles(s) for s in smiles])
+
+def test_oom_splits_batch_until_it_fits(smiles):
+    sizes = []
+    def fn(batch):
+        sizes.append(batch.num_graphs)
+        if batch.num_graphs > 4: raise torch.OutOfMemoryError("CUDA out of memory. Tried to allocate 2.00 GiB")
+        return torch.arange(batch.num_graphs, dtype=torch.float32)
+    out = np.concatenate(list(_iter_budgeted(fn, _csr(smiles[:10]), 1, max_graphs=10)))
+    assert out.shape == (10, 1) and not np.isnan(out).any()
+    assert max(s for s in sizes[1:]) <= 5
+
+def test_cpu_allocator_failure_on_single_molecule_is_nan(smiles):
+    def fn(batch):
+        raise RuntimeError("DefaultCPUAllocator: can't allocate memory: you tried to allocate 8589934592 bytes")
+    out = np.concatenate(list(_iter_budgeted(fn, _csr(smiles[:3]), 1)))
+    assert np.isnan(out).all()
+
+def test_real_errors_are_not_split_or_hidden(smiles):
+    calls = []
+    def fn(batch):
+        calls.append(batch.num_graphs)
+        raise RuntimeError("mat1 and mat2 shapes cannot be multiplied (12x128 and 64x1)")
+    with pytest.raises(RuntimeError, match="shapes cannot be multiplied"):
+        list(_iter_budgeted(fn, _csr(smiles), 1))
+    assert calls == [len(smiles)]  # ek hi forward call, koi split / retry nahi
+
+def test_inference_mode_does_not_leak_between_batches(smiles):
+    seen = []
+    def fn(batch):
+        seen.append(torch.is_inference_mode_enabled())
+        return torch.zeros(batch.num_graphs)
+    batches = _iter_budgeted(fn, _csr(smiles[:6]), 1, max_graphs=2)
+    for _ in batches:
+        # Consumer ka code (yield ke beech) normal mode mein: is ke tensors inference tensors nahi bante
+        assert not torch.is_inference_mode_enabled()
+        assert not torch.ones(1).is_inference()
+    assert seen == [True, True, True]
+
+    abandoned = _iter_budgeted(fn, _csr(smiles[:6]), 1, max_graphs=2)
+    next(abandoned)  # cancelled job: generator beech mein chhor diya
+    assert not torch.is_inference_mode_enabled()
@@ -0,0 +1,65 @@
+# File: backend/tests/test_ingest.py
+
+from rdkit import Chem
+
+from modules.ingest import ingest_records
+
+def records(smiles, prefix="drug"):
+    return [(f"{prefix}_{i}", smi, "s") for i, smi in enumerate(smiles)]
+
+def reference_unique(smiles):
+    # Pehla record har InChIKey ka (RDKit seedha, koi chunking nahi)
+    first = {}
+    for i, smi in enumerate(smiles):
+        mol = Chem.MolFromSmiles(smi)
+        if mol is not None: first.setdefault(Chem.MolToInchiKey(mol), (f"drug_{i}", smi))
+    return first
+
+def stored(database):
+    return {key: (name, smi) for name, smi, key in
+            database.get_connection().execute("SELECT name, smiles, inchikey FROM drugs ORDER BY id")}
+
+def test_dedup_within_and_across_chunks(drug_db, smiles):
+    # "OCC" / "CCO" aur salts ke duplicates alag chunks mein bhi
+    batch = smiles + ["C(C)O", "OC(=O)c1ccccc1O", "not_a_smiles", "[Na+].[O-]C(=O)c1ccccc1"]
+    stats = ingest_records(records(batch), chunk_size=4, refresh=False)
+    expected = reference_unique(batch)
+    assert stored(drug_db) == expected
+    assert stats["inserted"] == len(expected)
+    assert stats["invalid"] == 1
+    assert stats["duplicates"] == len(batch) - 1 - len(expected)
+
+def test_dedup_against_existing_library(drug_db, smiles):
+    ingest_records(records(smiles[:15]), chunk_size=8, refresh=False)
+    again = ingest_records(records(smiles, prefix="vendor"), chunk_size=8, refresh=False)
+    expected = reference_unique(smiles)
+    assert {key for key in stored(drug_db)} == set(expected)
+    assert again["inserted"] == len(expected) - len(reference_unique(smiles[:15]))
+    assert all(name.startswith("drug_") for name, _ in
+               (stored(drug_db)[k] for k in reference_unique(smiles[:15])))  # pehle wale rows nahi badle
+
+def test_old_rows_are_backfilled_before_dedup(drug_db, smiles):
+    conn = drug_db.get_connection()
+    with conn:  # purani library: inchikey column khali
+        conn.executemany("INSERT INTO drugs (name, smiles) VALUES (?, ?)", [("old_ethanol", "CCO"), ("old_bad", "C1CC")])
+    stats = ingest_records(records(["OCC", "c1ccncc1"]), refresh=False)
+    assert stats["inserted"] == 1 and stats["duplicates"] == 1
+    keys = dict(conn.execute("SELECT name, inchikey FROM drugs"))
+    assert keys["old_ethanol"] == Chem.MolToInchiKey(Chem.MolFromSmiles("CCO")) and keys["old_bad"] == ""
+
+def test_descriptor_refresh_only_computes_missing_keys(drug_db, smiles):
+    ingest_records(records(smiles[:12]), refresh=False)
+    assert drug_db.refresh_descriptor_table() == len({Chem.MolToSmiles(Chem.MolFromSmiles(s)) for s in smiles[:12]})
+    assert drug_db.refresh_descriptor_table() == 0
+
+    ingest_records(records(smiles, prefix="more"), refresh=False)
+    conn = drug_db.get_connection()
+    library = {r[0] for r in conn.execute("SELECT canonical_smiles FROM drugs")}
+    have = {r[0] for r in conn.execute("SELECT canonical_smiles FROM drug_descriptors")}
+    missing = sorted(library - have)
+    assert [k for page in drug_db.iter_canonical_keys(chunk_size=3, without_descriptors=True) for k in page] == missing
+    assert drug_db.count_canonical_keys(without_descriptors=True) == len(missing)
+
+    assert drug_db.refresh_descriptor_table() == len(missing)
+    assert {r[0] for r in conn.execute("SELECT canonical_smiles FROM drug_descriptors")} == library
+    assert [k for page in drug_db.iter_canonical_keys(chunk_size=5) for k in page] == sorted(library)
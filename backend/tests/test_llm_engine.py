@@ -0,0 +1,46 @@
+# File: backend/tests/test_llm_engine.py
+
+import json
+import random
+
+import pytest
+
+from modules.llm_engine import JSONSectionParser
+
+REPORT = {
+    "mechanism": "Binds the ATP pocket {hinge} and blocks \"EGFR\" signalling.\nSecond line\t(tab).",
+    "toxicity": "Hepatotoxic at >1 g/day \\ monitor ALT, unicode: Δ pKd ≥ 7 😀",
+    "score": 7.25,
+    "approved": True,
+    "notes": None,
+    "targets": ["EGFR", "HER2", {"name": "KDR", "weight": [0.5, "a,b}"]}],
+    "kinetics": {"half_life": "6h", "routes": {"oral": True, "iv": False}, "empty": {}},
+    "count": -3,
+    "key with \"quotes\"": "",
+}
+
+def feed_in_chunks(text, rng):
+    parser, sections, pos = JSONSectionParser(), [], 0
+    while pos < len(text):
+        step = rng.randint(1, 12)
+        sections.extend(parser.feed(text[pos:pos + step]))
+        pos += step
+    return sections
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("indent,ensure_ascii,wrap", [
+    (None, True, "{}"), (2, False, "```json\n{}\n```"), (4, True, "Here is the analysis:\n{}\nHope this helps."),
+])
+def test_sections_match_json_loads(seed, indent, ensure_ascii, wrap):
+    rng = random.Random(seed)
+    items = list(REPORT.items())
+    rng.shuffle(items)
+    body = json.dumps(dict(items), indent=indent, ensure_ascii=ensure_ascii)
+    assert feed_in_chunks(wrap.format(body), rng) == list(json.loads(body).items())
+
+def test_section_is_emitted_as_soon_as_value_closes():
+    parser = JSONSectionParser()
+    assert parser.feed('{"mechanism": "Kinase inhib') == []
+    assert parser.feed('itor", "score": 8') == [("mechanism", "Kinase inhibitor")]
+    assert parser.feed('.5') == []
+    assert parser.feed('}trailing {"ignored": 1}') == [("score", 8.5)]
@@ -0,0 +1,73 @@
+# File: backend/tests/test_rendering.py
+
+import random
+from collections import OrderedDict
+
+import pytest
+from rdkit import Chem
+
+import modules.rendering as rendering
+from modules.ingest import ingest_records
+from modules.rendering import DepictionCache, render_key, render_options
+
+class Clock:
+    # Har call par naya waqt: rendered_at ties kabhi nahi
+    def __init__(self): self.now = 1000.0
+    def time(self):
+        self.now += 1
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rendering, "time", clock)
+    return clock
+
+def test_disk_eviction_is_least_recently_used(tmp_path, clock):
+    cache = DepictionCache(str(tmp_path / "depictions.db"), memory_items=0, disk_items=4)
+    reference = OrderedDict()  # sirf disk tier ka LRU model
+    rng = random.Random(3)
+    for _ in range(300):
+        key = f"k{rng.randrange(10)}"
+        if rng.random() < 0.5:
+            hit = cache.get_many([key])
+            assert hit == ({key: f"<svg {key}>"} if key in reference else {})
+            if key in reference: reference.move_to_end(key)
+        else:
+            cache.put_many({key: f"<svg {key}>"})
+            reference[key] = f"<svg {key}>"
+            reference.move_to_end(key)
+            while len(reference) > 4: reference.popitem(last=False)
+        assert cache.missing(f"k{i}" for i in range(10)) == {f"k{i}" for i in range(10)} - set(reference)
+
+def test_memory_tier_serves_recent_items(tmp_path, clock):
+    cache = DepictionCache(str(tmp_path / "depictions.db"), memory_items=2, disk_items=10)
+    cache.put_many({"a": "A", "b": "B", "c": "C"})
+    assert list(cache._memory) == ["b", "c"]
+    assert cache.get_many(["a", "c", "zz"]) == {"a": "A", "c": "C"}
+    assert list(cache._memory) == ["c", "a"]
+
+def test_depict_matches_direct_rdkit_drawing(tmp_path, monkeypatch, smiles):
+    monkeypatch.setattr(rendering, "depiction_cache", DepictionCache(str(tmp_path / "depictions.db")))
+    options = render_options(120)
+    keys = [Chem.MolToSmiles(Chem.MolFromSmiles(s)) for s in smiles[:6]]
+    first = rendering.depict(keys, options)
+    again = rendering.depict(keys, options)  # ab cache se
+    for smi in keys:
+        expected = rendering.draw_svg(Chem.MolFromSmiles(smi), options)
+        assert first[smi] == again[smi] == (render_key(smi, options), expected)
+
+def test_prerender_is_capped_and_incremental(drug_db, tmp_path, monkeypatch, smiles):
+    ingest_records([(f"drug_{i}", smi, "s") for i, smi in enumerate(smiles)], refresh=False)
+    cache = DepictionCache(str(tmp_path / "depictions.db"), disk_items=7)
+    monkeypatch.setattr(rendering, "depiction_cache", cache)
+    options = render_options()
+    library = [k for page in drug_db.iter_canonical_keys() for k in page]
+
+    assert rendering.prerender_library() == 7
+    assert cache.missing(render_key(k, options) for k in library[:7]) == set()
+    assert rendering.prerender_library() == 0  # cap ke andar sab cached: dobara render nahi
+
+    cache.disk_items = 1000
+    assert rendering.prerender_library() == len(library) - 7
+    assert cache.missing(render_key(k, options) for k in library) == set()
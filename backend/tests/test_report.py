@@ -0,0 +1,28 @@
+# File: backend/tests/test_report.py
+
+from rdkit import Chem
+
+from modules.admet import calculate_admet_properties
+from modules.report_generator import bulk_report_rows
+
+ADMET = {"mw": 180.16, "qed": 0.55, "is_safe": True}
+
+def test_panel_rows_report_best_target_pkd():
+    rows = [
+        # Panel (selectivity ranking): 'score' = best - mean of others, report mein asal pKd chahiye
+        {"name": "Aspirin", "smiles": "CC(=O)Oc1ccccc1C(=O)O", "score": 1.37, "scores": [6.1, 8.456, 7.0],
+         "targets": ["1M17", "3ERT", "2HYY"], "best_target": "3ERT", "admet": ADMET},
+        {"name": "Caffeine", "smiles": "CN1C=NC2=C1C(=O)N(C(=O)N2C)C", "score": 5.5, "admet": ADMET},
+    ]
+    report = bulk_report_rows(rows, target_id="1M17")
+    assert report[0]["score"] == 8.46 and report[0]["target_id"] == "3ERT"
+    assert report[1]["score"] == 5.5 and report[1]["target_id"] == "1M17"
+    assert all(r["admet"] is ADMET for r in report)
+
+def test_missing_admet_is_filled_and_rows_are_trimmed(drug_db):
+    rows = [None, {"smiles": ""}, {"name": "Paracetamol", "smiles": "CC(=O)Nc1ccc(O)cc1", "score": 6.2},
+            {"name": "Ethanol", "smiles": "OCC", "score": 4.0}, {"name": "Extra", "smiles": "C", "score": 1.0}]
+    report = bulk_report_rows(rows, target_id="1M17", top_n=2)
+    assert [r["name"] for r in report] == ["Paracetamol", "Ethanol"]
+    for r in report:
+        assert r["admet"] == calculate_admet_properties(Chem.MolFromSmiles(r["smiles"]))
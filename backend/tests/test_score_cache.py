@@ -0,0 +1,57 @@
+# File: backend/tests/test_score_cache.py
+
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import modules.score_cache as score_cache
+
+def model(model_hash="a" * 64, backend="eager"):
+    return SimpleNamespace(model_hash=model_hash, backend=backend)
+
+@pytest.fixture(autouse=True)
+def fresh_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(score_cache, "SCORE_DB_PATH", str(tmp_path / "scores.db"))
+    monkeypatch.setattr(score_cache, "SCORE_DIR", str(tmp_path / "scores"))
+    score_cache._cleaned.clear()
+
+def test_scores_round_trip_per_target():
+    m = model()
+    score_cache.store_scores(m, "1M17", {"CCO": 6.5, "c1ccccc1": 7.25, "bad": float("nan")})
+    assert score_cache.get_cached_scores(m, " 1m17 ", ["CCO", "c1ccccc1", "bad", "CCN"]) == {"CCO": 6.5, "c1ccccc1": 7.25}
+    assert score_cache.get_cached_scores(m, "2XYZ", ["CCO"]) == {}
+
+def test_backend_switch_invalidates_scores():
+    score_cache.store_scores(model(backend="eager"), "1M17", {"CCO": 6.5})
+    assert score_cache.get_cached_scores(model(backend="fused"), "1M17", ["CCO"]) == {}
+    # Naye backend ne purani rows saaf kar di
+    assert score_cache.get_cached_scores(model(backend="eager"), "1M17", ["CCO"]) == {}
+
+def test_model_change_invalidates_scores():
+    score_cache.store_scores(model("a" * 64), "1M17", {"CCO": 6.5})
+    assert score_cache.get_cached_scores(model("b" * 64), "1M17", ["CCO"]) == {}
+
+def test_library_vectors_extend_and_follow_backend(monkeypatch):
+    rows = {"n": 4}
+    class Store:
+        def __len__(self): return rows["n"]
+    monkeypatch.setattr(score_cache, "get_graph_store", Store)
+    monkeypatch.setattr(score_cache, "get_library_embeddings", lambda m: np.arange(10, dtype=np.float32)[:, None])
+    scored = []
+    def fake_scores(m, vecs, prot_vec):
+        scored.append(len(vecs))
+        return np.asarray(vecs, dtype=np.float32).reshape(-1) + (100 if m.backend == "fused" else 0)
+    monkeypatch.setattr(score_cache, "score_vectors", fake_scores)
+
+    eager = model(backend="eager")
+    assert score_cache.get_library_scores(eager, "1M17", None).tolist() == [0, 1, 2, 3]
+    rows["n"] = 6
+    assert score_cache.get_library_scores(eager, "1M17", None).tolist() == [0, 1, 2, 3, 4, 5]
+    assert scored == [4, 2]  # sirf nayi rows score hui
+
+    fused = model(backend="fused")
+    assert score_cache.get_library_scores(fused, "1M17", None).tolist() == [100, 101, 102, 103, 104, 105]
+    files = os.listdir(score_cache.SCORE_DIR)
+    assert len(files) == 1 and "_fused_" in files[0]
@@ -0,0 +1,59 @@
+# File: backend/tests/test_similarity.py
+
+import numpy as np
+import pytest
+from rdkit import Chem, DataStructs
+from rdkit.Chem import rdFingerprintGenerator
+
+import modules.similarity as similarity
+from modules.chemistry import canonicalize_smiles
+from modules.similarity import FingerprintIndex, pack_fingerprint
+
+def library(smiles):
+    return list(dict.fromkeys(canonicalize_smiles(s) for s in smiles))
+
+def reference_top(keys, query, top_k, threshold):
+    # RDKit ka apna Tanimoto, seedha ExplicitBitVect par
+    gen = rdFingerprintGenerator.GetMorganGenerator(radius=similarity.FP_RADIUS, fpSize=similarity.FP_BITS)
+    fps = [gen.GetFingerprint(Chem.MolFromSmiles(k)) for k in keys]
+    sims = DataStructs.BulkTanimotoSimilarity(gen.GetFingerprint(Chem.MolFromSmiles(query)), fps)
+    ranked = sorted((-s, row) for row, s in enumerate(sims) if s >= threshold)[:top_k]
+    return sims, [-s for s, _ in ranked]
+
+@pytest.mark.parametrize("workers,block", [(1, 8192), (3, 4)])
+@pytest.mark.parametrize("top_k,threshold", [(5, 0.0), (30, 0.0), (10, 0.3)])
+def test_search_matches_bulk_tanimoto(tmp_path, monkeypatch, smiles, workers, block, top_k, threshold):
+    monkeypatch.setattr(similarity, "FP_WORKERS", workers)
+    keys = library(smiles)
+    index = FingerprintIndex(str(tmp_path))
+    assert index.refresh(keys) == len(keys)
+
+    for query in ("CC(=O)Oc1ccccc1C(=O)O", "c1ccccc1O", "CCN(CC)CC"):
+        rows, sims = index.search(pack_fingerprint(Chem.MolFromSmiles(query)), top_k=top_k, threshold=threshold, block=block)
+        all_sims, ref_sims = reference_top(keys, query, top_k, threshold)
+        np.testing.assert_allclose(sims, ref_sims, rtol=1e-6)
+        # top_k cutoff par barabar similarity wali rows mein se koi bhi aa sakti hai - har row ki apni similarity sahi ho
+        assert len(set(rows.tolist())) == len(rows)
+        np.testing.assert_allclose([all_sims[r] for r in rows], sims, rtol=1e-6)
+
+def test_incremental_refresh_equals_full_build(tmp_path, smiles):
+    keys = library(smiles)
+    grown = FingerprintIndex(str(tmp_path / "grown"))
+    grown.refresh(keys[:12])
+    assert grown.refresh(keys) == len(keys) - 12
+    assert grown.refresh(keys) == 0
+
+    full = FingerprintIndex(str(tmp_path / "full"))
+    full.refresh(keys)
+    reloaded = FingerprintIndex(str(tmp_path / "grown"))
+    assert np.array_equal(reloaded.fps, full.fps) and np.array_equal(reloaded.counts, full.counts)
+
+def test_rebuilt_store_rebuilds_index(tmp_path, smiles):
+    keys = library(smiles)
+    index = FingerprintIndex(str(tmp_path))
+    index.refresh(keys[:10])
+    # Graph store dobara bana (row order badla): purani rows par bharosa nahi
+    assert index.refresh(keys[::-1]) == len(keys)
+    full = FingerprintIndex(str(tmp_path / "full"))
+    full.refresh(keys[::-1])
+    assert np.array_equal(index.fps, full.fps)
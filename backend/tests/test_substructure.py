@@ -0,0 +1,47 @@
+# File: backend/tests/test_substructure.py
+
+import pytest
+from rdkit import Chem
+
+import modules.substructure as substructure
+from modules.graph_store import GraphStore
+from modules.similarity import FingerprintIndex
+
+PATTERNS = [
+    ("c1ccccc1", "smarts"),
+    ("[OX2H][CX3]=O", "smarts"),            # carboxylic acid
+    ("[#7;R]", "smarts"),                   # ring nitrogen
+    ("[r6]~[r5]", "smarts"),                # fused 6-5 ring junction (ring info chahiye)
+    ("[N+](=O)[O-]", "smarts"),
+    ("[Cl,Br,I]c", "smarts"),
+    ("C(=O)N", "smiles"),
+    ("c1ccncc1", "smiles"),
+    ("[Na+]", "smiles"),
+    ("[C@H](N)C(=O)O", "smarts"),
+]
+
+@pytest.fixture
+def library(tmp_path, monkeypatch, smiles):
+    store = GraphStore(str(tmp_path / "graphs"))
+    store.refresh(smiles)
+    index = FingerprintIndex(str(tmp_path / "pattern"), bits=2048, kind="pattern")
+    index.refresh(store.keys)
+    monkeypatch.setattr(substructure, "get_graph_store", lambda: store)
+    monkeypatch.setattr(substructure, "get_fingerprint_index", lambda kind: index)
+    return store.keys
+
+@pytest.mark.parametrize("pattern,query_type", PATTERNS)
+def test_matches_brute_force_rdkit(library, pattern, query_type):
+    query = Chem.MolFromSmarts(pattern) if query_type == "smarts" else Chem.MolFromSmiles(pattern)
+    # Reference: har molecule poora sanitize karke seedha HasSubstructMatch (koi prefilter nahi)
+    expected = [k for k in library if Chem.MolFromSmiles(k).HasSubstructMatch(query)]
+    result = substructure.find_substructure_matches(pattern, query_type)
+    assert result["keys"] == expected
+    assert result["library_size"] == len(library)
+    assert len(expected) <= result["candidates"] <= len(library)
+
+def test_invalid_patterns_raise_value_error():
+    with pytest.raises(ValueError, match="Invalid SMARTS"):
+        substructure.parse_query("[C", "smarts")
+    with pytest.raises(ValueError, match="Unknown query type"):
+        substructure.parse_query("CCO", "inchi")
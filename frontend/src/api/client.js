@@ -25,11 +25,12 @@ export const apiClient = {
   },
 
   // 2. Upload File
-  upload: async (file, targetId) => {
+  upload: async (file, targetId, { background = false } = {}) => {
     try {
       const formData = new FormData();
       formData.append('file', file);
       formData.append('target_id', targetId);
+      if (background) formData.append('background', 'true');
 
       const response = await fetch(`${BASE_URL}/upload`, {
         method: 'POST',
@@ -59,18 +60,117 @@ export const apiClient = {
     }
   },
   
+  // 5. Deferred AI Explanation (manual analyze ka explanation_id)
+  getExplanation: async (explanationId) => {
+    try {
+      const response = await fetch(`${BASE_URL}/explanations/${explanationId}`);
+      return await response.json(); // 202 -> { status: 'pending' }, 200 -> { status: 'done', ai_explanation }
+    } catch (e) {
+      return { status: 'pending' };
+    }
+  },
+
+  // Similar library compounds (Tanimoto); targetId diya ho to neighbours ka score bhi
+  findSimilar: async (smiles, { topK = 20, threshold = 0, targetId = null } = {}) => {
+    try {
+      const response = await fetch(`${BASE_URL}/similar`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ smiles, top_k: topK, threshold, target_id: targetId })
+      });
+      return await handleResponse(response);
+    } catch (error) {
+      console.error("Similarity Search Error:", error);
+      return { error: error.message || "Similarity search failed." };
+    }
+  },
+
+  // Substructure (SMARTS / scaffold) search; auto scan ke liye analyze payload mein `substructure` bhejein
+  findSubstructure: async (pattern, { queryType = 'smarts', limit = 100 } = {}) => {
+    try {
+      const response = await fetch(`${BASE_URL}/substructure`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ pattern, query_type: queryType, limit })
+      });
+      return await handleResponse(response);
+    } catch (error) {
+      console.error("Substructure Search Error:", error);
+      return { error: error.message || "Substructure search failed." };
+    }
+  },
+
+  // Hits ka ADMET + pharmacophores on demand (jo rows user dekh raha hai)
+  enrichHits: async (smilesList) => {
+    try {
+      const response = await fetch(`${BASE_URL}/enrich`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ smiles: smilesList })
+      });
+      return await handleResponse(response);
+    } catch (error) {
+      console.error("Enrichment Error:", error);
+      return { results: [] };
+    }
+  },
+
+  getJobHits: async (jobId, page = 0, pageSize = 20) => {
+    try {
+      const response = await fetch(`${BASE_URL}/jobs/${jobId}/hits?page=${page}&page_size=${pageSize}`);
+      return await handleResponse(response);
+    } catch (error) {
+      console.error("Job Hits Error:", error);
+      return { results: [] };
+    }
+  },
+
   // ... (getImageUrl waghaira same rahega)
 
-  // 3. Get Progress
-  getProgress: async () => {
+  // 3. Get Progress (sirf apne scan ka - job_id ke baghair server 'Idle' deta hai)
+  getProgress: async (jobId) => {
     try {
-      const response = await fetch(`${BASE_URL}/progress`);
+      const response = await fetch(`${BASE_URL}/progress?job_id=${encodeURIComponent(jobId)}`);
       return await response.json();
     } catch (e) {
       return { progress: 0, status: 'Connecting...' };
     }
   },
 
+  // Background scan jobs: state / progress, phir result
+  getJob: async (jobId) => {
+    try {
+      const response = await fetch(`${BASE_URL}/jobs/${jobId}`);
+      return await handleResponse(response);
+    } catch (error) {
+      return { error: error.message || "Lost connection to scan job." };
+    }
+  },
+
+  getJobResult: async (jobId) => {
+    try {
+      const response = await fetch(`${BASE_URL}/jobs/${jobId}/result`);
+      return await handleResponse(response);
+    } catch (error) {
+      return { error: error.message || "Failed to fetch scan result." };
+    }
+  },
+
+  // 6. Batch depictions (results tables): ek request, { images: [{ input, smiles, svg } | { input, error }] }
+  getImages: async (smilesList, width = 400) => {
+    try {
+      const response = await fetch(`${BASE_URL}/molecule_images`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ smiles: smilesList, width })
+      });
+      return await handleResponse(response);
+    } catch (error) {
+      console.error("Image Batch Error:", error);
+      return { images: [] };
+    }
+  },
+
   // 4. Get Image URL Helper
   getImageUrl: (smiles) => {
     if (!smiles) return "https://via.placeholder.com/400x400.png?text=No+Structure";
@@ -1,12 +1,20 @@
 import React from 'react';
 
-export default function BatchResultList({ results, aiThreshold, onItemClick }) {
+export default function BatchResultList({ results, aiThreshold, onItemClick, onExport, exporting }) {
   return (
     <div className="scan-results-list" style={{ width: '100%', height: '100%', overflowY: 'auto', background: 'rgba(0,0,0,0.2)' }}>
        
        {/* Sticky Header */}
        <div className="list-header" style={{ position: 'sticky', top: 0, background: 'rgba(5, 5, 10, 0.95)', borderBottom: '1px solid #00f3ff', padding: '15px 20px', display: 'flex', justifyContent: 'space-between', color: '#00f3ff', fontWeight: 'bold' }}>
-          <div>DRUG NAME</div><div>SCORE</div>
+          <div>DRUG NAME</div>
+          <div style={{ display: 'flex', gap: '15px', alignItems: 'center' }}>
+            {onExport && (
+              <button onClick={onExport} disabled={exporting} style={{ background: 'transparent', border: '1px solid #00f3ff', color: '#00f3ff', borderRadius: '6px', padding: '4px 10px', cursor: exporting ? 'wait' : 'pointer', fontSize: '0.75rem' }}>
+                {exporting ? 'EXPORTING...' : `EXPORT TOP ${Math.min(results.length, 100)}`}
+              </button>
+            )}
+            <div>SCORE</div>
+          </div>
        </div>
        
        {/* List Items */}
@@ -59,7 +59,7 @@ export default function UploadMode({ target, setTarget, fileInputRef, handleFile
           ref={fileInputRef} 
           onChange={handleFileSelect} 
           style={{ display: 'none' }} 
-          accept=".csv,.txt"
+          accept=".csv,.txt,.tsv,.gz,.parquet"
         />
         <FileText size={40} color="#00f3ff" style={{ marginBottom: '10px' }} />
         
@@ -92,7 +92,7 @@ export default function UploadMode({ target, setTarget, fileInputRef, handleFile
         )}
 
         <div style={{ fontSize: '11px', color: '#888', marginTop: '5px' }}>
-          Supports: .CSV, .TXT (Tab Separated)
+          Supports: .CSV, .TXT (Tab Separated), .GZ, .PARQUET
         </div>
       </div>
 
@@ -107,7 +107,7 @@ export default function UploadMode({ target, setTarget, fileInputRef, handleFile
           <AlertCircle size={14} /> FILE REQUIREMENTS
         </div>
         <ul style={{ margin: 0, paddingLeft: '20px', color: '#ccc', fontSize: '11px', lineHeight: '1.6' }}>
-          <li>Format: <b>CSV</b> (Comma) or <b>TXT</b> (Tab).</li>
+          <li>Format: <b>CSV</b> (Comma), <b>TXT</b> (Tab) or <b>Parquet</b>; <b>.gz</b> bhi chalega.</li>
           <li>Must contain a column named <b>"smiles"</b>.</li>
           <li>Optional column: <b>"name"</b>.</li>
         </ul>
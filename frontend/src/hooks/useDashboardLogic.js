@@ -56,6 +56,27 @@ export const useDashboardLogic = (showToast, historyLoadData) => {
     } catch (e) { console.error("History Save Error", e); }
   };
 
+  // ✅ AI explanation baad mein aati hai: poll karo, phir result + history entry update
+  const pollExplanation = async (explanationId) => {
+    for (let attempt = 0; attempt < 120; attempt++) {
+      await new Promise(resolve => setTimeout(resolve, 1000));
+      const data = await apiClient.getExplanation(explanationId);
+      if (data.error) return;
+      if (data.status !== 'done') continue;
+
+      setResult(prev => (prev && prev.explanation_id === explanationId)
+        ? { ...prev, ai_explanation: data.ai_explanation } : prev);
+      try {
+        const existing = JSON.parse(localStorage.getItem('biograph_history') || '[]');
+        const updated = existing.map(item => item.explanation_id === explanationId
+          ? { ...item, ai_explanation: data.ai_explanation } : item);
+        localStorage.setItem('biograph_history', JSON.stringify(updated));
+        window.dispatchEvent(new Event('historyUpdated'));
+      } catch (e) { console.error("History Update Error", e); }
+      return;
+    }
+  };
+
   // --- 4. HANDLERS ---
   const handleTabChange = (tabName) => {
     setActiveTab(tabName); 
@@ -88,6 +109,28 @@ export const useDashboardLogic = (showToast, historyLoadData) => {
     setResult(newResult);
     if (drug.smiles) setSmiles(drug.smiles);
     saveToHistory(newResult);
+    if (!drug.admet && drug.smiles) enrichDrug(newResult);
+  };
+
+  // ✅ Batch hits ka ADMET / pharmacophores scan ke sath nahi aata: click par sirf isi molecule ka
+  const enrichDrug = async (drugResult) => {
+    const data = await apiClient.enrichHits([drugResult.smiles]);
+    const detail = data.results && data.results[0];
+    if (!detail || !detail.admet) return;
+    setResult(prev => (prev && prev.smiles === drugResult.smiles && prev.name === drugResult.name)
+      ? { ...prev, admet: detail.admet, active_sites: detail.active_sites } : prev);
+  };
+
+  // ✅ Auto / upload scans background jobs hain: apne hi job_id ka progress poll (doosre users ke scans ka nahi), phir result
+  const waitForJob = async (submitted) => {
+    if (!submitted || submitted.error || !submitted.job_id) return submitted;
+    while (true) {
+      await new Promise(resolve => setTimeout(resolve, 500));
+      const job = await apiClient.getJob(submitted.job_id);
+      if (job.error) return job;
+      setProgress(job.progress || 0);
+      if (['done', 'failed', 'cancelled'].includes(job.state)) return apiClient.getJobResult(submitted.job_id);
+    }
   };
 
   const handleScan = async () => {
@@ -105,19 +148,12 @@ export const useDashboardLogic = (showToast, historyLoadData) => {
     setSelectedId(null);
     setChatHistory([]); // ✅ Clear chat on new scan start
     
-    let progressInterval = null;
-
     try {
-      if (activeTab === 'auto') {
-        progressInterval = setInterval(async () => {
-          const data = await apiClient.getProgress();
-          if (data) setProgress(data.progress);
-        }, 500);
-      }
-
       let data;
       if (activeTab === 'upload') {
-        data = await apiClient.upload(selectedFile, safeTarget);
+        data = await waitForJob(await apiClient.upload(selectedFile, safeTarget, { background: true }));
+      } else if (activeTab === 'auto') {
+        data = await waitForJob(await apiClient.analyze({ target_id: safeTarget, mode: 'auto', background: true }));
       } else {
         data = await apiClient.analyze({
           target_id: safeTarget,
@@ -145,13 +181,13 @@ export const useDashboardLogic = (showToast, historyLoadData) => {
         setResult(finalData);
         showToast("Analysis Complete", "success");
         saveToHistory(finalData);
+        if (!data.ai_explanation && data.explanation_id) pollExplanation(data.explanation_id);
       }
 
     } catch (error) {
       console.error(error);
       showToast("Server Error or Network Issue", "error");
     } finally {
-      if (progressInterval) clearInterval(progressInterval);
       setProgress(100); setLoading(false);
     }
   };
@@ -77,6 +77,37 @@ const Dashboard = ({ showToast, historyLoadData }) => {
     setDownloading(false);
   };
 
+  // ✅ Bulk Export: top-100 hits ki reports ek ZIP mein (server process pool mein banata hai)
+  const downloadBatchReports = async () => {
+    if (batchResults.length === 0) return;
+    setDownloading(true);
+    try {
+      const response = await fetch('http://localhost:8000/download_reports', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ results: batchResults, target_id: target || "6LU7", top_n: 100, format: 'zip' })
+      });
+
+      if (response.ok && response.headers.get('content-type') === 'application/zip') {
+        const blob = await response.blob();
+        const url = window.URL.createObjectURL(blob);
+        const a = document.createElement('a');
+        a.href = url;
+        a.download = `BioGraph_Reports_Top${Math.min(batchResults.length, 100)}.zip`;
+        document.body.appendChild(a);
+        a.click();
+        document.body.removeChild(a);
+        showToast("Reports Downloaded!", "success");
+      } else {
+        showToast("Failed to generate reports.", "error");
+      }
+    } catch (error) {
+      console.error("Bulk Download Error:", error);
+      showToast("Server error while downloading.", "error");
+    }
+    setDownloading(false);
+  };
+
   return (
     <div className="page-section" style={{ position: 'relative' }}>
       <div className="main-layout">
@@ -109,7 +140,8 @@ const Dashboard = ({ showToast, historyLoadData }) => {
             ) : result ? (
                <SingleResultDisplay result={result} chatHistory={chatHistory} />
             ) : (
-               <BatchResultList results={batchResults} aiThreshold={aiThreshold} onItemClick={handleDrugClick} />
+               <BatchResultList results={batchResults} aiThreshold={aiThreshold} onItemClick={handleDrugClick}
+                                onExport={downloadBatchReports} exporting={downloading} />
             )}
           </div>
         </div>